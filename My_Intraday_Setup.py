@@ -1,280 +1,165 @@
 import streamlit as st
 import datetime
 import pytz
-import yfinance as yf
 import pandas as pd
-import time
-import urllib.request
-import xml.etree.ElementTree as ET
-from concurrent.futures import ThreadPoolExecutor
+import market_data
+import bar_store
+import market_snapshot
+import scheduler
+import shared_cache
+import metrics
+import backtest
+import sweep
+import universe
+import engine
+import html_tables
+import tick_stream
+import news
+import risk
+import os
 
 # --- 1. Page Configuration ---
 st.set_page_config(layout="wide", page_title="Haridas Master Terminal", initial_sidebar_state="expanded")
 
 # --- 2. Live Market Data Dictionary ---
-FNO_SECTORS = {
-    "MIXED WATCHLIST": ["HINDALCO.NS", "NTPC.NS", "WIPRO.NS", "RELIANCE.NS", "HDFCBANK.NS", "TCS.NS", "INFY.NS", "ITC.NS", "SBIN.NS", "BHARTIARTL.NS"],
-    "NIFTY METAL": ["HINDALCO.NS", "TATASTEEL.NS", "VEDL.NS", "JSWSTEEL.NS", "NMDC.NS", "COALINDIA.NS"],
-    "NIFTY BANK": ["HDFCBANK.NS", "ICICIBANK.NS", "SBIN.NS", "AXISBANK.NS", "KOTAKBANK.NS", "INDUSINDBK.NS"],
-    "NIFTY IT": ["TCS.NS", "INFY.NS", "WIPRO.NS", "HCLTECH.NS", "TECHM.NS", "LTIM.NS"],
-    "NIFTY ENERGY": ["RELIANCE.NS", "NTPC.NS", "ONGC.NS", "POWERGRID.NS", "TATAPOWER.NS"],
-    "NIFTY AUTO": ["MARUTI.NS", "TATAMOTORS.NS", "M&M.NS", "BAJAJ-AUTO.NS", "HEROMOTOCO.NS"],
-    "NIFTY PHARMA": ["SUNPHARMA.NS", "DRREDDY.NS", "CIPLA.NS", "DIVISLAB.NS"],
-    "NIFTY FMCG": ["ITC.NS", "HUL.NS", "NESTLEIND.NS", "BRITANNIA.NS"],
-    "NIFTY INFRA": ["LT.NS", "LICI.NS", "ULTRACEMCO.NS"],
-    "NIFTY REALTY": ["DLF.NS", "GODREJPROP.NS", "MACROTECH.NS"],
-    "NIFTY PSU BANK": ["SBIN.NS", "PNB.NS", "BOB.NS", "CANBK.NS"]
-}
-
-NIFTY_50 = ["ADANIENT.NS", "ADANIPORTS.NS", "APOLLOHOSP.NS", "ASIANPAINT.NS", "AXISBANK.NS", "BAJAJ-AUTO.NS", "BAJFINANCE.NS", "BAJAJFINSV.NS", "BPCL.NS", "BHARTIARTL.NS", "BRITANNIA.NS", "CIPLA.NS", "COALINDIA.NS", "DIVISLAB.NS", "DRREDDY.NS", "EICHERMOT.NS", "GRASIM.NS", "HCLTECH.NS", "HDFCBANK.NS", "HDFCLIFE.NS", "HEROMOTOCO.NS", "HINDALCO.NS", "HINDUNILVR.NS", "ICICIBANK.NS", "ITC.NS", "INDUSINDBK.NS", "INFY.NS", "JSWSTEEL.NS", "KOTAKBANK.NS", "LT.NS", "LTIM.NS", "M&M.NS", "MARUTI.NS", "NTPC.NS", "NESTLEIND.NS", "ONGC.NS", "POWERGRID.NS", "RELIANCE.NS", "SBILIFE.NS", "SBIN.NS", "SUNPHARMA.NS", "TCS.NS", "TATACONSUM.NS", "TATAMOTORS.NS", "TATASTEEL.NS", "TECHM.NS", "TITAN.NS", "ULTRACEMCO.NS", "UPL.NS", "WIPRO.NS"]
-NIFTY_NEXT_50 = ["ABB.NS", "ADANIENSOL.NS", "ADANIGREEN.NS", "AMBUJACEM.NS", "DMART.NS", "BAJAJHLDNG.NS", "BANKBARODA.NS", "BEL.NS", "BOSCHLTD.NS", "CANBK.NS", "CHOLAFIN.NS", "CGPOWER.NS", "COLPAL.NS", "DLF.NS", "DABUR.NS", "GAIL.NS", "GODREJCP.NS", "HAL.NS", "HAVELLS.NS", "HEROMOTOCO.NS", "HINDALCO.NS", "ICICIGI.NS", "ICICIPRULI.NS", "IDBI.NS", "INDIGO.NS", "IOC.NS", "IRFC.NS", "JINDALSTEL.NS", "JIOFIN.NS", "LODHA.NS", "MARICO.NS", "MUTHOOTFIN.NS", "NAUKRI.NS", "PIDILITIND.NS", "PFC.NS", "PNB.NS", "RECLTD.NS", "SRF.NS", "MOTHERSON.NS", "SHREECEM.NS", "SIEMENS.NS", "TVSMOTOR.NS", "TORNTPHARM.NS", "TRENT.NS", "UBL.NS", "MCDOWELL-N.NS", "VBL.NS", "VEDL.NS", "ZOMATO.NS", "ZYDUSLIFE.NS"]
-ALL_STOCKS = list(set([stock for slist in FNO_SECTORS.values() for stock in slist] + NIFTY_50 + NIFTY_NEXT_50))
-
-CRYPTO_SECTORS = {
-    "ALL COINDCX FUTURES": [
-        "BTC-USD", "ETH-USD", "SOL-USD", "BNB-USD", "XRP-USD", "DOGE-USD", "ADA-USD", "AVAX-USD",
-        "LINK-USD", "DOT-USD", "TRX-USD", "MATIC-USD", "AGLD-USD", "BEL-USD", "SNX-USD", "AAVE-USD",
-        "UNI-USD", "NEAR-USD", "APT-USD", "LDO-USD", "CRV-USD", "MKR-USD", "SHIB-USD", "PEPE-USD",
-        "WIF-USD", "FLOKI-USD", "BONK-USD", "LTC-USD", "BCH-USD", "XLM-USD", "ATOM-USD", "HBAR-USD",
-        "ETC-USD", "FIL-USD", "INJ-USD", "OP-USD", "RNDR-USD", "IMX-USD", "STX-USD", "GRT-USD",
-        "VET-USD", "THETA-USD", "SAND-USD", "MANA-USD", "AXS-USD", "APE-USD", "GALA-USD", "FTM-USD",
-        "DYDX-USD", "SUI-USD", "SEI-USD", "TIA-USD", "ORDI-USD", "FET-USD", "RUNE-USD", "AR-USD",
-        "COMP-USD", "CHZ-USD", "EGLD-USD", "ALGO-USD", "ICP-USD", "QNT-USD", "ROSE-USD", "ARDR-USD"
-    ],
-    "TOP WATCHLIST": ["BTC-USD", "ETH-USD", "BNB-USD", "SOL-USD", "XRP-USD", "DOGE-USD"],
-    "LAYER 1": ["BTC-USD", "ETH-USD", "SOL-USD", "ADA-USD", "AVAX-USD", "DOT-USD", "NEAR-USD"],
-    "MEME COINS": ["DOGE-USD", "SHIB-USD", "PEPE-USD", "WIF-USD", "FLOKI-USD", "BONK-USD"],
-    "DEFI & WEB3": ["LINK-USD", "UNI-USD", "AAVE-USD", "CRV-USD", "MKR-USD", "LDO-USD", "AGLD-USD", "BEL-USD"],
-    "ALTCOINS": ["XRP-USD", "TRX-USD", "MATIC-USD", "LTC-USD", "BCH-USD", "XLM-USD", "APT-USD", "SNX-USD"]
-}
-ALL_CRYPTO = list(set([coin for clist in CRYPTO_SECTORS.values() for coin in clist]))
+# 🚨 FILE-DRIVEN UNIVERSES: universes/nse.csv + crypto.csv, deduplicated and indexed once per file change 🚨
+NSE_UNIVERSE = universe.load_universe("nse")
+CRYPTO_UNIVERSE = universe.load_universe("crypto")
+FNO_SECTORS, ALL_STOCKS = NSE_UNIVERSE.watchlists, NSE_UNIVERSE.symbols
+CRYPTO_SECTORS, ALL_CRYPTO = CRYPTO_UNIVERSE.watchlists, CRYPTO_UNIVERSE.symbols
+
+NSE_INDEX_STRIP = [("Sensex", "^BSESN"), ("Nifty", "^NSEI"), ("USDINR", "INR=X"), ("Nifty Bank", "^NSEBANK"), ("Nifty Mid100", "^CRSMY"), ("Nifty Small100", "^CRSLDX")]
+CRYPTO_INDEX_STRIP = [("BITCOIN", "BTC-USD"), ("ETHEREUM", "ETH-USD"), ("SOLANA", "SOL-USD"), ("BINANCE COIN", "BNB-USD"), ("RIPPLE", "XRP-USD"), ("DOGECOIN", "DOGE-USD")]
+NSE_SNAPSHOT_SYMBOLS = list(dict.fromkeys(ALL_STOCKS + [sym for _, sym in NSE_INDEX_STRIP]))
+CRYPTO_SNAPSHOT_SYMBOLS = list(dict.fromkeys(ALL_CRYPTO + [sym for _, sym in CRYPTO_INDEX_STRIP]))
+# both markets share one snapshot and one daily panel, so the market toggle only re-filters cached results
+SNAPSHOT_SYMBOLS = list(dict.fromkeys(NSE_SNAPSHOT_SYMBOLS + CRYPTO_SNAPSHOT_SYMBOLS))
+
+# Fragment refresh cadence (secs) for the quote panels; signals and gainers/losers follow the sidebar interval
+PANEL_REFRESH_SECONDS = {"indices": 30, "breadth": 60}
+# with a tick feed (HARIDAS_TICK_FEED) prices come from memory, so the live panels follow it every second
+STREAM_REFRESH_SECONDS = 1
 
 # 🚨 SMART FORMATTER FOR ALL PRICES 🚨
-def fmt_price(val):
-    if pd.isna(val): return "0.00"
-    if val < 0.01: return f"{val:.6f}"
-    elif val < 1: return f"{val:.4f}"
-    else: return f"{val:,.2f}"
+fmt_price = html_tables.fmt_price
 
 # --- 3. HELPER FUNCTIONS ---
-@st.cache_data(ttl=30)
-def get_live_data(ticker_symbol):
-    try:
-        stock = yf.Ticker(ticker_symbol)
-        df = stock.history(period='5d')
-        if not df.empty:
-            ltp = df['Close'].iloc[-1]
-            try: prev_close = stock.fast_info.previous_close
-            except: prev_close = df['Close'].iloc[-2] if len(df) > 1 else ltp
-            
-            if pd.isna(ltp) or pd.isna(prev_close) or prev_close == 0: return 0.0, 0.0, 0.0
-            
-            change = ltp - prev_close
-            pct_change = (change / prev_close) * 100
-            return float(ltp), float(change), float(pct_change)
-        return 0.0, 0.0, 0.0
-    except: return 0.0, 0.0, 0.0
-
-@st.cache_data(ttl=300)
+# 🚨 BATCHED FETCH LAYER: one bulk request per (interval, period) chunk instead of one per symbol 🚨
+@st.cache_resource
+def get_bar_store():
+    return bar_store.BarStore()
+
+# 🚨 SHARED CACHE: one upstream fetch per symbol+interval across sessions and worker processes 🚨
+@st.cache_resource
+def get_shared_cache():
+    return shared_cache.SharedCache()
+
+# 🚨 INSTRUMENTED CACHE: latency histogram + hit/miss per cached function (see ⚙️ Scanner Settings) 🚨
+def instrumented_cache(name, ttl, shared=False):
+    return metrics.instrument_cache(name, (st.cache_resource if shared else st.cache_data)(ttl=ttl))
+
+# 🚨 COLUMNAR BARS: one read-only float32 panel per request, shared by every session without per-rerun copies 🚨
+@instrumented_cache("get_bars", ttl=60, shared=True)
+def get_bars(symbols, period, interval, ttl=60):
+    panel = get_engine().fetch(symbols, period, interval, ttl=ttl)
+    metrics.REGISTRY.set("haridas_bar_panel_bytes", panel.nbytes, help_text="Bytes held by the latest bar panel per interval", interval=interval)
+    return panel
+
+# version: tick-buffer version when a feed is running, so cached results follow the feed rather than their TTL
+@instrumented_cache("get_live_quotes", ttl=30)
+def get_live_quotes(symbols, version=None):
+    return get_engine().quotes(symbols)
+
+# 🚨 ONE SNAPSHOT PER REFRESH: every unique symbol fetched once, all quote panels derived from it 🚨
+@instrumented_cache("get_market_snapshot", ttl=30)
+def get_market_snapshot(symbols, version=None):
+    return market_snapshot.MarketSnapshot.from_quotes(get_live_quotes(symbols, version))
+
+# 🚨 NEWS: every feed in HARIDAS_NEWS_FEEDS polled concurrently (304s when unchanged), headlines indexed by the symbols they name 🚨
+@st.cache_resource
+def get_news_feed():
+    return news.NewsFeed(symbols=ALL_STOCKS + ALL_CRYPTO)
+
 def get_market_news():
-    try:
-        url = "https://economictimes.indiatimes.com/markets/rssfeeds/2146842.cms"
-        req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-        with urllib.request.urlopen(req, timeout=5) as response: xml_data = response.read()
-        root = ET.fromstring(xml_data)
-        headlines = [item.find('title').text.strip() for item in root.findall('.//item')[:5] if item.find('title') is not None]
-        if headlines: return "📰 LIVE MARKET NEWS: " + " 🔹 ".join(headlines) + " 🔹"
-    except: pass
+    feed = get_news_feed()
+    feed.refresh_async()  # the scheduler normally keeps it fresh; never wait on the network here
+    headlines = [title for title, *_ in feed.headlines(5)]
+    if headlines: return "📰 LIVE MARKET NEWS: " + " 🔹 ".join(headlines) + " 🔹"
     return "📰 LIVE MARKET NEWS: Fetching latest feeds... 🔹"
 
-@st.cache_data(ttl=60)
-def get_real_sector_performance(sector_dict, ignore_keys=["MIXED WATCHLIST", "TOP WATCHLIST", "ALL COINDCX FUTURES"]):
-    results = []
-    for sector, items in sector_dict.items():
-        if sector in ignore_keys: continue
-        total_pct = 0
-        valid = 0
-        for ticker in items:
-            _, _, pct = get_live_data(ticker)
-            if pct != 0.0:
-                total_pct += pct
-                valid += 1
-        if valid > 0:
-            avg_pct = round(total_pct / valid, 2)
-            bw = min(abs(avg_pct) * 20, 100) 
-            results.append({"Sector": sector, "Pct": avg_pct, "Width": max(bw, 5)})
-    return sorted(results, key=lambda x: x['Pct'], reverse=True)
-
-@st.cache_data(ttl=60)
-def get_adv_dec(item_list):
-    adv, dec = 0, 0
-    def fetch_chg(ticker):
-        _, change, _ = get_live_data(ticker)
-        return change
-    with ThreadPoolExecutor(max_workers=30) as executor:
-        results = list(executor.map(fetch_chg, item_list))
-    for change in results:
-        if change > 0: adv += 1
-        elif change < 0: dec += 1
-    return adv, dec
-
-@st.cache_data(ttl=120)
-def get_dynamic_market_data(item_list):
-    gainers, losers, trends = [], [], []
-    for ticker in item_list:
-        try:
-            df = yf.Ticker(ticker).history(period="10d")
-            if len(df) >= 3:
-                c1, o1 = df['Close'].iloc[-1], df['Open'].iloc[-1]
-                c2, o2 = df['Close'].iloc[-2], df['Open'].iloc[-2]
-                c3, o3 = df['Close'].iloc[-3], df['Open'].iloc[-3]
-                
-                if c2 == 0 or pd.isna(c1): continue
-                
-                pct_chg = ((c1 - c2) / c2) * 100
-                obj = {"Stock": ticker, "LTP": float(c1), "Pct": round(pct_chg, 2)}
-                
-                if pct_chg > 0: gainers.append(obj)
-                elif pct_chg < 0: losers.append(obj)
-                if c1 > o1 and c2 > o2 and c3 > o3: trends.append({"Stock": ticker, "Status": "৩ দিন উত্থান", "Color": "green"})
-                elif c1 < o1 and c2 < o2 and c3 < o3: trends.append({"Stock": ticker, "Status": "৩ দিন পতন", "Color": "red"})
-        except: pass
-    return sorted(gainers, key=lambda x: x['Pct'], reverse=True)[:5], sorted(losers, key=lambda x: x['Pct'])[:5], trends
-
-@st.cache_data(ttl=60)
-def get_oi_simulation(item_list):
-    setups = []
-    for ticker in item_list:
-        try:
-            df = yf.Ticker(ticker).history(period="2d", interval="15m")
-            if len(df) >= 3:
-                c1, v1 = df['Close'].iloc[-1], df['Volume'].iloc[-1]
-                c2, v2 = df['Close'].iloc[-2], df['Volume'].iloc[-2]
-                c3 = df['Close'].iloc[-3]
-                if v1 > (v2 * 1.5):
-                    oi_status = "🔥 High (Spike)"
-                    if c1 > c2:
-                        signal = "Short Covering 🚀" if c2 < c3 else "Long Buildup 📈"
-                        color = "green"
-                    else:
-                        signal = "Long Unwinding ⚠️" if c2 > c3 else "Short Buildup 📉"
-                        color = "red"
-                    setups.append({"Stock": ticker, "Signal": signal, "OI": oi_status, "Color": color})
-        except: pass
-    return setups
-
-@st.cache_data(ttl=60)
-def exhaustion_scanner(stock_list, market_sentiment="BULLISH"):
-    signals = []
-    for stock_symbol in stock_list:
-        try:
-            df = yf.Ticker(stock_symbol).history(period="5d", interval="5m") 
-            if df.empty or len(df) < 15: continue
-            df['EMA10'] = df['Close'].ewm(span=10, adjust=False).mean()
-            today_date = df.index[-1].date()
-            df_today = df[df.index.date == today_date].copy()
-            if len(df_today) < 5: continue
-            
-            completed_idx = len(df_today) - 2
-            completed_candle = df_today.iloc[completed_idx]
-            if completed_idx < 3: continue 
-                
-            df_upto_completed = df_today.iloc[:completed_idx+1]
-            min_vol_so_far = df_upto_completed['Volume'].min()
-            
-            is_lowest_vol = (completed_candle['Volume'] <= min_vol_so_far)
-            is_green = completed_candle['Close'] > completed_candle['Open']
-            is_red = completed_candle['Close'] < completed_candle['Open']
-            
-            signal = None
-            entry = sl = 0.0
-            
-            if market_sentiment == "BULLISH" and is_red and is_lowest_vol:
-                signal = "BUY"
-                entry = completed_candle['High'] + 0.50
-                sl = completed_candle['Low'] - 0.50
-            elif market_sentiment == "BEARISH" and is_green and is_lowest_vol:
-                signal = "SHORT"
-                entry = completed_candle['Low'] - 0.50
-                sl = completed_candle['High'] + 0.50
-                
-            if signal:
-                risk = abs(entry - sl)
-                if risk > 0:
-                    signals.append({
-                        "Stock": stock_symbol, "Entry": float(entry), "LTP": float(completed_candle['Close']),
-                        "Signal": signal, "SL": float(sl), "T1": float(entry + (risk*2) if signal=="BUY" else entry - (risk*2)), 
-                        "T2(1:3)": float(entry + (risk*3) if signal=="BUY" else entry - (risk*3)),
-                        "EMA_10": float(completed_candle['EMA10']), "Action": "Book 50% @ 1:3", "Time": completed_candle.name.strftime('%H:%M:%S')
-                    })
-        except: continue
-    return signals
-
-@st.cache_data(ttl=60)
-def crypto_ha_bb_strategy(crypto_list):
-    signals = []
-    def scan_coin(coin):
-        try:
-            df = yf.Ticker(coin).history(period="15d", interval="1h") 
-            if df.empty or len(df) < 25: return None
-            
-            df['SMA_20'] = df['Close'].rolling(window=20).mean()
-            df['STD_20'] = df['Close'].rolling(window=20).std()
-            df['Upper_BB'] = df['SMA_20'] + (2 * df['STD_20'])
-            df['Lower_BB'] = df['SMA_20'] - (2 * df['STD_20'])
-            
-            df['HA_Close'] = (df['Open'] + df['High'] + df['Low'] + df['Close']) / 4
-            ha_open = [df['Open'].iloc[0]]
-            for i in range(1, len(df)): ha_open.append((ha_open[i-1] + df['HA_Close'].iloc[i-1]) / 2)
-            df['HA_Open'] = ha_open
-            df['HA_High'] = df[['High', 'HA_Open', 'HA_Close']].max(axis=1)
-            df['HA_Low'] = df[['Low', 'HA_Open', 'HA_Close']].min(axis=1)
-            
-            df = df.dropna()
-            if len(df) < 3: return None
-            
-            completed_idx = len(df) - 2
-            if completed_idx < 1: return None
-            
-            alert_candle = df.iloc[completed_idx]
-            prev_candle = df.iloc[completed_idx - 1]
-            current_ltp = df['Close'].iloc[-1]
-            
-            signal = None
-            entry = sl = target_bb = 0.0
-            buffer = alert_candle['Close'] * 0.001 
-            
-            if (prev_candle['HA_High'] >= prev_candle['Upper_BB']) and (alert_candle['HA_High'] < alert_candle['Upper_BB']):
-                signal, entry, sl, target_bb = "SHORT", alert_candle['Low'] - buffer, alert_candle['High'] + buffer, alert_candle['Lower_BB']
-            elif (prev_candle['HA_Low'] <= prev_candle['Lower_BB']) and (alert_candle['HA_Low'] > alert_candle['Lower_BB']):
-                signal, entry, sl, target_bb = "BUY", alert_candle['High'] + buffer, alert_candle['Low'] - buffer, alert_candle['Upper_BB']
-                
-            if signal:
-                risk = abs(entry - sl)
-                if risk > 0:
-                    return {
-                        "Coin": coin, "Signal": signal, "Entry": float(entry), "LTP": float(current_ltp),
-                        "SL": float(sl), "Target(BB)": float(target_bb), "Target(1:3)": float(entry - (risk*3) if signal=="SHORT" else entry + (risk*3)),
-                        "Time": alert_candle.name.strftime('%d %b, %H:%M')
-                    }
-        except: return None
-        return None
-
-    with ThreadPoolExecutor(max_workers=30) as executor:
-        results = list(executor.map(scan_coin, crypto_list))
-        
-    for res in results:
-        if res is not None: signals.append(res)
-    return signals
-
-@st.cache_data(ttl=60)
-def get_opening_movers(stock_list):
-    movers = []
-    for ticker in stock_list:
-        ltp, _, pct = get_live_data(ticker)
-        if abs(pct) >= 2.0:
-            movers.append({"Stock": ticker, "LTP": ltp, "Pct": pct})
-    return sorted(movers, key=lambda x: abs(x['Pct']), reverse=True)
+def with_news(rows):
+    feed = get_news_feed()
+    feed.refresh_async()
+    return [{**r, "News": feed.related(engine.row_symbol(r), 1)} for r in rows]
+
+# 🚨 SESSION FEATURES: prev close + candle colours built once per session (00:00 IST / UTC), movers and trends only join live LTPs 🚨
+@instrumented_cache("get_dynamic_market_data", ttl=120)
+def get_dynamic_market_data(item_list, version=None):
+    return get_engine().daily_movers(item_list)
+
+@instrumented_cache("get_oi_simulation", ttl=60)
+def get_oi_simulation(version=None):
+    return get_engine().oi_proxy()
+
+# 🚨 WORKER POOL: one long-lived process pool for backtests, sweeps and cold-start scans over a whole universe 🚨
+@st.cache_resource
+def get_backtest_pool():
+    return backtest.make_pool()
+
+# 🚨 HEADLESS ENGINE: fetch -> streaming indicators -> bar-close signals live in engine.py (also `python engine.py <scan>`) 🚨
+# the terminal only adds caching + rendering; bars go through get_bars so every page shares one panel per request
+@st.cache_resource
+def get_engine():
+    return engine.Engine(store=get_bar_store(), cache=get_shared_cache(), executor=get_backtest_pool(), bars=get_bars, stream=get_tick_stream())
+
+# 🚨 PUSH FEED: ticks from HARIDAS_TICK_FEED (tcp://host:port or a tick file) build bars in ring buffers, no history polling 🚨
+@st.cache_resource
+def get_tick_stream():
+    return tick_stream.TickStream.from_env()
+
+def stream_version():
+    stream = get_tick_stream()
+    return stream.aggregator.version if stream is not None else None
+
+def get_signal_log():
+    return get_engine().log
+
+# 🚨 UNIVERSE-WIDE SIGNALS: one scan per liquid market universe covering both sentiments; watchlist + sentiment only filter it 🚨
+@instrumented_cache("exhaustion_scanner", ttl=60)
+def exhaustion_scanner(version=None):
+    return get_engine().signals("exhaustion")
+
+@instrumented_cache("crypto_ha_bb_strategy", ttl=60)
+def crypto_ha_bb_strategy(version=None):
+    return get_engine().signals("ha_bb")
+
+# 🚨 BACKGROUND REFRESH: keeps the bar store + indicator states warm so panels read from disk 🚨
+@st.cache_resource
+def get_refresh_scheduler():
+    sched = scheduler.RefreshScheduler()
+    # quotes, movers, OI and 1h bars are all resampled from the 5m (NSE) / 15m (crypto) series the quote jobs keep fresh;
+    # with a tick feed the quote jobs only poll the symbols it has no recent ticks for
+    sched.add_job("nse_quotes", lambda: get_engine().quotes(NSE_SNAPSHOT_SYMBOLS, max_age=0), 30)
+    sched.add_job("nse_5m", lambda: get_engine().refresh_signals("exhaustion"), 60)
+    sched.add_job("crypto_quotes", lambda: get_engine().quotes(CRYPTO_SNAPSHOT_SYMBOLS, max_age=0), 30, crypto=True)
+    sched.add_job("crypto_1h", lambda: get_engine().refresh_signals("ha_bb", ttl=300), 300, crypto=True)
+    sched.add_job("daily_features", lambda: get_engine().daily_features(), 60, crypto=True)  # no-op until a session rolls over or a symbol is missing
+    sched.add_job("news", get_news_feed().refresh, 300, crypto=True)
+    sched.add_job("metrics_textfile", lambda: metrics.write_textfile(METRICS_TEXTFILE), 60, crypto=True)
+    sched.start()
+    return sched
+
+# 🚨 PROMETHEUS EXPORT: textfile for node_exporter, optional /metrics endpoint via HARIDAS_METRICS_PORT 🚨
+METRICS_TEXTFILE = os.path.join(bar_store.DATA_DIR, "metrics.prom")
+
+@st.cache_resource
+def get_metrics_server():
+    port = os.environ.get("HARIDAS_METRICS_PORT")
+    if not port: return None
+    try: return metrics.serve(int(port))
+    except OSError: return None  # another worker already owns the port
+
+get_metrics_server()
 
 # --- 4. CSS ---
 css_string = (
@@ -297,6 +182,12 @@ css_string = (
     ".bar-bg { background: #e0e0e0; width: 100%; height: 14px; min-width: 50px; border-radius: 3px; } "
     ".bar-fg-green { background: #276a44; height: 100%; border-radius: 3px; } "
     ".bar-fg-red { background: #8b0000; height: 100%; border-radius: 3px; } "
+    ".v38-table td.sym { text-align:left; font-weight:bold; color:#003366; } .v38-table td.bar-cell { padding:4px 8px; } "
+    ".v38-table td.news { text-align:left; font-size:11px; max-width:260px; white-space:nowrap; overflow:hidden; text-overflow:ellipsis; } .v38-table td.news a { color:#003366; } "
+    ".b { font-weight:bold; } .up, .green { color:green; font-weight:bold; } .dn, .red { color:red; font-weight:bold; } .flat { color:#555; font-weight:bold; } "
+    ".blue { color:#1a73e8; font-weight:bold; } .gold { color:#856404; font-weight:bold; } "
+    ".v38-table td.tag-up { color:white; background:green; font-weight:bold; } .v38-table td.tag-dn { color:white; background:red; font-weight:bold; } "
+    ".idx-name { font-size:11px; color:#555; font-weight:bold; } .idx-val { font-size:15px; color:black; font-weight:bold; } .idx-chg { font-size:11px; } "
     ".calc-box { background: white; border: 1px solid #00ffd0; padding: 15px; border-radius: 8px; box-shadow: 0px 2px 8px rgba(0,0,0,0.1); margin-top: 15px;} "
     "</style>"
 )
@@ -310,13 +201,16 @@ with st.sidebar:
     
     st.markdown("### 🎛️ HARIDAS DASHBOARD")
     if market_mode == "🇮🇳 Indian Market (NSE)":
-        menu_options = ["📈 MAIN TERMINAL", "🌅 9:10 AM: Pre-Market Gap", "🚀 9:15 AM: Opening Movers", "🔥 9:20 AM: OI Setup", "⚙️ Scanner Settings", "📊 Backtest Engine"]
+        menu_options = ["📈 MAIN TERMINAL", "🌅 9:10 AM: Pre-Market Gap", "🚀 9:15 AM: Opening Movers", "🔥 9:20 AM: OI Setup", "⚙️ Scanner Settings", "📊 Backtest Engine", "🧪 Parameter Sweep"]
         sector_dict = FNO_SECTORS
         all_assets = ALL_STOCKS
+        index_strip = NSE_INDEX_STRIP
     else:
-        menu_options = ["📈 MAIN TERMINAL", "🚀 24H Crypto Movers", "🔥 Volume Spikes & OI", "🧮 Futures Risk Calculator", "⚙️ Scanner Settings", "📊 Backtest Engine"]
+        menu_options = ["📈 MAIN TERMINAL", "🚀 24H Crypto Movers", "🔥 Volume Spikes & OI", "🧮 Futures Risk Calculator", "⚙️ Scanner Settings", "📊 Backtest Engine", "🧪 Parameter Sweep"]
         sector_dict = CRYPTO_SECTORS
         all_assets = ALL_CRYPTO
+        index_strip = CRYPTO_INDEX_STRIP
+    snapshot_symbols = SNAPSHOT_SYMBOLS
 
     page_selection = st.radio("Select Menu:", menu_options)
     st.divider()
@@ -330,15 +224,16 @@ with st.sidebar:
     st.markdown("### ⏱️ AUTO REFRESH")
     auto_refresh = st.checkbox("Enable Auto-Refresh", value=False)
     refresh_time = st.selectbox("Interval (Mins):", [1, 3, 5, 15], index=0) 
+    get_refresh_scheduler()  # background jobs always run; the checkbox only reruns the panels
     if st.button("🔄 Force Refresh Now", use_container_width=True):
         st.cache_data.clear()
+        get_shared_cache().clear()
         st.rerun()
 
 # --- 6. Top Navigation ---
 ist_timezone = pytz.timezone('Asia/Kolkata')
 curr_time = datetime.datetime.now(ist_timezone)
-t_915 = curr_time.replace(hour=9, minute=15, second=0, microsecond=0)
-t_1530 = curr_time.replace(hour=15, minute=30, second=0, microsecond=0)
+t_915, t_1530 = scheduler.nse_session_bounds(curr_time)
 
 if market_mode == "🇮🇳 Indian Market (NSE)":
     terminal_title = "HARIDAS NSE TERMINAL"
@@ -362,6 +257,130 @@ nav_html = (
 )
 st.markdown(nav_html, unsafe_allow_html=True)
 
+# --- 7. LIVE PANELS (fragments rerun on their own interval, the page itself never sleeps) ---
+def panel_refresh(panel):
+    if not auto_refresh: return None
+    if get_tick_stream() is not None and panel != "journal": return STREAM_REFRESH_SECONDS
+    return scheduler.poll_interval(PANEL_REFRESH_SECONDS.get(panel, refresh_time * 60), crypto=market_mode != "🇮🇳 Indian Market (NSE)")
+
+@st.fragment(run_every=panel_refresh("indices"))
+@metrics.timed("render_indices_panel")
+def render_indices_panel():
+    st.markdown("<div class='section-title'>📉 MARKET INDICES (LIVE)</div>", unsafe_allow_html=True)
+
+    snapshot = get_market_snapshot(snapshot_symbols, stream_version())
+    indices = snapshot.index_strip(index_strip)
+    stale_count = len(snapshot.stale_symbols())
+    if stale_count: st.caption(f"⚠️ Upstream degraded: showing last good prices for {stale_count} symbols (marked ⚠️).")
+
+    st.markdown(html_tables.INDICES.render(indices, "$" if market_mode != "🇮🇳 Indian Market (NSE)" else ""), unsafe_allow_html=True)
+
+@st.fragment(run_every=panel_refresh("breadth"))
+@metrics.timed("render_breadth_panel")
+def render_breadth_panel():
+    adv, dec = get_market_snapshot(snapshot_symbols, stream_version()).adv_dec(all_assets)
+
+    total_adv_dec = adv + dec
+    adv_pct = (adv / total_adv_dec) * 100 if total_adv_dec > 0 else 50
+    adv_title = "Advance/ Decline (NSE)" if market_mode == "🇮🇳 Indian Market (NSE)" else "Advance/ Decline (Top Crypto)"
+
+    st.markdown(f"<div class='section-title'>📊 {adv_title}</div>", unsafe_allow_html=True)
+    adv_dec_html = (
+        "<div class='adv-dec-container'>"
+        "<div class='adv-dec-bar'>"
+        f"<div class='bar-green' style='width: {adv_pct}%;'></div>"
+        f"<div class='bar-red' style='width: {100-adv_pct}%;'></div>"
+        "</div>"
+        "<div style='display:flex; justify-content:space-between; font-size:12px; font-weight:bold;'>"
+        f"<span style='color:green;'>Advances: {adv}</span><span style='color:red;'>Declines: {dec}</span>"
+        "</div>"
+        f"<div style='font-size:10px; color:#555; margin-top:5px;'>Strategy Sentiment: <b>{user_sentiment}</b></div>"
+        "</div>"
+    )
+    st.markdown(adv_dec_html, unsafe_allow_html=True)
+
+# 🚨 LIVE SIGNALS ENGINE 🚨
+@st.fragment(run_every=panel_refresh("signals"))
+@metrics.timed("render_signals_panel")
+def render_signals_panel():
+    if market_mode == "🇮🇳 Indian Market (NSE)":
+        st.markdown(f"<div class='section-title'>🎯 LIVE SIGNALS FOR: {selected_sector}</div>", unsafe_allow_html=True)
+        with st.spinner(f"Scanning 5m Charts for Exhaustion Signals..."):
+            live_signals = engine.watchlist_filter(exhaustion_scanner(stream_version()), current_watchlist, user_sentiment)
+
+        if len(live_signals) > 0:
+            st.markdown(html_tables.SIGNALS.render(with_news(live_signals)), unsafe_allow_html=True)
+        else:
+            st.info("⏳ Waiting for setup... No opposite color + lowest vol candle found yet.")
+    else:
+        st.markdown(f"<div class='section-title'>🎯 LIVE SIGNALS FOR: {selected_sector}</div>", unsafe_allow_html=True)
+        with st.spinner("Scanning ALL 70+ CoinDCX Crypto Futures for HA+BB Setup..."):
+            crypto_signals = engine.watchlist_filter(crypto_ha_bb_strategy(stream_version()), current_watchlist)
+
+        if len(crypto_signals) > 0:
+            st.markdown(html_tables.CRYPTO_SIGNALS.render(with_news(crypto_signals)), unsafe_allow_html=True)
+        else:
+            st.info("⏳ Waiting for setup... No 1-Hour Heikin-Ashi BB Signal found yet.")
+
+@st.fragment(run_every=panel_refresh("movers"))
+@metrics.timed("render_gainers_losers_panel")
+def render_gainers_losers_panel():
+    gainers, losers, _ = get_dynamic_market_data(all_assets, stream_version())
+    prefix = "$" if market_mode != "🇮🇳 Indian Market (NSE)" else "₹"
+    st.markdown("<div class='section-title'>🚀 LIVE TOP GAINERS</div>", unsafe_allow_html=True)
+    if gainers: st.markdown(html_tables.GAINERS.render(gainers, prefix), unsafe_allow_html=True)
+    else: st.markdown("<p style='font-size:12px;text-align:center;'>No live gainers data.</p>", unsafe_allow_html=True)
+
+    st.markdown("<div class='section-title'>🔻 LIVE TOP LOSERS</div>", unsafe_allow_html=True)
+    if losers: st.markdown(html_tables.LOSERS.render(losers, prefix), unsafe_allow_html=True)
+    else: st.markdown("<p style='font-size:12px;text-align:center;'>No live losers data.</p>", unsafe_allow_html=True)
+
+# 🚨 TRADE JOURNAL: logged signals walked to SL / T1 / T2 / square-off as their candles close 🚨
+@st.fragment(run_every=panel_refresh("journal"))
+@metrics.timed("render_journal_panel")
+def render_journal_panel():
+    st.markdown("<div class='section-title'>📝 TRADE JOURNAL (CLOSED TRADES)</div>", unsafe_allow_html=True)
+    strategy = "exhaustion" if market_mode == "🇮🇳 Indian Market (NSE)" else "ha_bb"
+    journal_day = st.date_input("Journal Day:", value=curr_time.date(), max_value=curr_time.date(), key="journal_day")
+    day_start = ist_timezone.localize(datetime.datetime.combine(journal_day, datetime.time())).timestamp()
+    trades = get_signal_log().journal(day_start, day_start + 86400, strategy=strategy)
+    open_count = len(get_signal_log().journal(strategy=strategy, status=("OPEN",)))
+    if open_count: st.caption(f"🟡 {open_count} open position(s) being tracked")
+    if trades.empty:
+        note = "Waiting for real trades to execute and close today..." if journal_day == curr_time.date() else f"No trades closed on {journal_day:%d %b %Y}."
+        st.markdown(f"<div style='text-align:center; padding: 15px; border: 1px dashed #ccc; border-radius: 5px; color: #888; font-weight:bold; font-size:12px; margin-bottom:10px; background:white;'>{note}</div>", unsafe_allow_html=True)
+        return
+    wins, total = int((trades["pnl"] > 0).sum()), trades["pnl"].sum()
+    footer = f"<tr><td colspan='5' class='b'>{len(trades)} trades · {wins} winners</td><td colspan='3' class='{'up' if total >= 0 else 'dn'}'>{total:.2f}%</td></tr>"
+    st.markdown(html_tables.JOURNAL.render(list(trades.itertuples(index=False)), footer=footer), unsafe_allow_html=True)
+
+# 🚨 MONTE CARLO RISK: bootstrap equity paths over a trade list, sized with the risk calculator's risk % + leverage rules 🚨
+def render_risk_simulation(trades, label, key, risk_pct=None, leverage=None):
+    st.markdown(f"<div class='section-title'>🎲 Monte Carlo Risk: {label}</div>", unsafe_allow_html=True)
+    mc_col1, mc_col2, mc_col3, mc_col4, mc_col5 = st.columns(5)
+    with mc_col1: mc_paths = st.selectbox("Paths:", [10_000, 50_000, 100_000], key=f"{key}_paths")
+    with mc_col2: mc_horizon = st.number_input("Trades per Path:", min_value=1, max_value=5000, value=min(max(len(trades), 1), 500), key=f"{key}_horizon")
+    with mc_col3: mc_risk = risk_pct if risk_pct is not None else st.number_input("Risk % per Trade", min_value=0.1, max_value=100.0, value=2.0, step=0.5, key=f"{key}_risk")
+    with mc_col4: mc_leverage = leverage if leverage is not None else st.slider("Leverage (x)", min_value=1, max_value=100, value=10, key=f"{key}_leverage")
+    with mc_col5: mc_ruin = st.number_input("Ruin = Drawdown %", min_value=1.0, max_value=100.0, value=50.0, step=5.0, key=f"{key}_ruin")
+    pnl, stop = risk.trade_arrays(trades)
+    st.caption(f"{len(pnl)} trades resampled with replacement · {mc_risk:g}% of equity risked at each stop, notional capped at {mc_leverage}x equity, "
+               f"a {100 / mc_leverage:.2f}% adverse move liquidates the margin" + (f" · trades without a stop assume {risk.DEFAULT_STOP_PCT}%" if "SL" not in trades and "sl" not in trades else ""))
+    if st.button("🎲 Run Simulation", use_container_width=True, key=f"{key}_run", disabled=not len(pnl)):
+        with st.spinner(f"Simulating {mc_paths:,} paths × {mc_horizon} trades..."):
+            with metrics.timer("risk_simulation"):
+                sim = risk.simulate(pnl, stop, paths=mc_paths, horizon=int(mc_horizon), risk_pct=mc_risk, leverage=mc_leverage, ruin_pct=mc_ruin,
+                                    executor=get_backtest_pool())
+        summary = risk.summarize(sim)
+        r_col1, r_col2, r_col3, r_col4 = st.columns(4)
+        r_col1.metric("Risk of Ruin", f"{summary['Risk of Ruin %']:.2f}%")
+        r_col2.metric("Liquidation Probability", f"{summary['Liquidation %']:.2f}%")
+        r_col3.metric("Median / P95 Max Drawdown", f"{summary['Median Max Drawdown %']:.1f}% / {summary['P95 Max Drawdown %']:.1f}%")
+        r_col4.metric("Median Return", f"{summary['Median Return %']:.2f}%", delta=f"{summary['Loss Probability %']:.1f}% of paths lose", delta_color="off")
+        d_col1, d_col2 = st.columns([1, 2])
+        d_col1.dataframe(risk.distribution(sim), use_container_width=True, hide_index=True)
+        d_col2.bar_chart(risk.drawdown_histogram(sim))
+
 # ==================== MAIN TERMINAL ====================
 if page_selection == "📈 MAIN TERMINAL":
     col1, col2, col3 = st.columns([1, 2.8, 1])
@@ -370,159 +389,51 @@ if page_selection == "📈 MAIN TERMINAL":
     with col1:
         title = "📊 SECTOR PERFORMANCE" if market_mode == "🇮🇳 Indian Market (NSE)" else "📊 CRYPTO CATEGORIES"
         st.markdown(f"<div class='section-title'>{title}</div>", unsafe_allow_html=True)
-        with st.spinner("Fetching Live Sectors..."):
-            real_sectors = get_real_sector_performance(sector_dict)
+        with st.spinner("Fetching Live Market Snapshot..."):
+            snapshot = get_market_snapshot(snapshot_symbols, stream_version())
+        real_sectors = snapshot.sector_performance(sector_dict)
         if real_sectors:
-            sec_html = "<div class='table-container'><table class='v38-table'><tr><th>Category</th><th>Avg %</th><th style='width:40%;'>Trend</th></tr>"
-            for s in real_sectors:
-                c = "green" if s['Pct'] >= 0 else "red"
-                bc = "bar-fg-green" if s['Pct'] >= 0 else "bar-fg-red"
-                sec_html += f"<tr><td style='text-align:left; font-weight:bold; color:#003366;'>{s['Sector']}</td><td style='color:{c}; font-weight:bold;'>{s['Pct']}%</td><td style='padding:4px 8px;'><div class='bar-bg'><div class='{bc}' style='width:{s['Width']}%;'></div></div></td></tr>"
-            sec_html += "</table></div>"
-            st.markdown(sec_html, unsafe_allow_html=True)
+            with metrics.timer("render_sector_table"):
+                st.markdown(html_tables.SECTORS.render(real_sectors), unsafe_allow_html=True)
 
         with st.spinner("Fetching Live Market Movers & Trends..."):
-            gainers, losers, trends = get_dynamic_market_data(all_assets)
+            _, _, trends = get_dynamic_market_data(all_assets, stream_version())
 
         st.markdown("<div class='section-title'>🔍 TREND CONTINUITY (3+ Days)</div>", unsafe_allow_html=True)
         if trends:
-            t_html = "<div class='table-container'><table class='v38-table'><tr><th>Asset</th><th>Status</th></tr>"
-            for t in trends: t_html += f"<tr><td style='text-align:left; font-weight:bold; color:#003366;'>{t['Stock']}</td><td style='color:{t['Color']}; font-weight:bold;'>{t['Status']}</td></tr>"
-            t_html += "</table></div>"
-            st.markdown(t_html, unsafe_allow_html=True)
+            with metrics.timer("render_trend_table"):
+                st.markdown(html_tables.TRENDS.render(trends), unsafe_allow_html=True)
         else: st.markdown("<p style='font-size:12px;text-align:center; color:#888;'>No 3-day continuous trend found.</p>", unsafe_allow_html=True)
 
     # --- COLUMN 2 (INDICES, ADV/DEC, SIGNALS, JOURNAL) ---
     with col2:
-        st.markdown("<div class='section-title'>📉 MARKET INDICES (LIVE)</div>", unsafe_allow_html=True)
-        
-        if market_mode == "🇮🇳 Indian Market (NSE)":
-            p1_ltp, p1_chg, p1_pct = get_live_data("^BSESN")
-            p2_ltp, p2_chg, p2_pct = get_live_data("^NSEI")
-            p3_ltp, p3_chg, p3_pct = get_live_data("INR=X")
-            p4_ltp, p4_chg, p4_pct = get_live_data("^NSEBANK")
-            p5_ltp, p5_chg, p5_pct = get_live_data("^CRSMY")
-            p6_ltp, p6_chg, p6_pct = get_live_data("^CRSLDX")
-            indices = [("Sensex", p1_ltp, p1_chg, p1_pct), ("Nifty", p2_ltp, p2_chg, p2_pct), ("USDINR", p3_ltp, p3_chg, p3_pct), ("Nifty Bank", p4_ltp, p4_chg, p4_pct), ("Nifty Mid100", p5_ltp, p5_chg, p5_pct), ("Nifty Small100", p6_ltp, p6_chg, p6_pct)]
-        else:
-            p1_ltp, p1_chg, p1_pct = get_live_data("BTC-USD")
-            p2_ltp, p2_chg, p2_pct = get_live_data("ETH-USD")
-            p3_ltp, p3_chg, p3_pct = get_live_data("SOL-USD")
-            p4_ltp, p4_chg, p4_pct = get_live_data("BNB-USD")
-            p5_ltp, p5_chg, p5_pct = get_live_data("XRP-USD")
-            p6_ltp, p6_chg, p6_pct = get_live_data("DOGE-USD")
-            indices = [("BITCOIN", p1_ltp, p1_chg, p1_pct), ("ETHEREUM", p2_ltp, p2_chg, p2_pct), ("SOLANA", p3_ltp, p3_chg, p3_pct), ("BINANCE COIN", p4_ltp, p4_chg, p4_pct), ("RIPPLE", p5_ltp, p5_chg, p5_pct), ("DOGECOIN", p6_ltp, p6_chg, p6_pct)]
-
-        indices_html = "<div class='idx-container'>"
-        for name, val, chg, pct in indices:
-            clr = "green" if chg >= 0 else "red"
-            sign = "+" if chg >= 0 else ""
-            prefix = "₹" if name == "USDINR" else ("$" if market_mode != "🇮🇳 Indian Market (NSE)" else "")
-            indices_html += f"<div class='idx-box'><span style='font-size:11px; color:#555; font-weight:bold;'>{name}</span><br><span style='font-size:15px; color:black; font-weight:bold;'>{prefix}{fmt_price(val)}</span><br><span style='color:{clr}; font-size:11px; font-weight:bold;'>{sign}{fmt_price(chg)} ({sign}{pct:.2f}%)</span></div>"
-        indices_html += "</div>"
-        st.markdown(indices_html, unsafe_allow_html=True)
-
-        with st.spinner("Calculating Breadth..."):
-            adv, dec = get_adv_dec(all_assets)
-        
-        total_adv_dec = adv + dec
-        adv_pct = (adv / total_adv_dec) * 100 if total_adv_dec > 0 else 50
-        adv_title = "Advance/ Decline (NSE)" if market_mode == "🇮🇳 Indian Market (NSE)" else "Advance/ Decline (Top Crypto)"
-        
-        st.markdown(f"<div class='section-title'>📊 {adv_title}</div>", unsafe_allow_html=True)
-        adv_dec_html = (
-            "<div class='adv-dec-container'>"
-            "<div class='adv-dec-bar'>"
-            f"<div class='bar-green' style='width: {adv_pct}%;'></div>"
-            f"<div class='bar-red' style='width: {100-adv_pct}%;'></div>"
-            "</div>"
-            "<div style='display:flex; justify-content:space-between; font-size:12px; font-weight:bold;'>"
-            f"<span style='color:green;'>Advances: {adv}</span><span style='color:red;'>Declines: {dec}</span>"
-            "</div>"
-            f"<div style='font-size:10px; color:#555; margin-top:5px;'>Strategy Sentiment: <b>{user_sentiment}</b></div>"
-            "</div>"
-        )
-        st.markdown(adv_dec_html, unsafe_allow_html=True)
-
-        # 🚨 LIVE SIGNALS ENGINE 🚨
-        if market_mode == "🇮🇳 Indian Market (NSE)":
-            st.markdown(f"<div class='section-title'>🎯 LIVE SIGNALS FOR: {selected_sector}</div>", unsafe_allow_html=True)
-            with st.spinner(f"Scanning 5m Charts for Exhaustion Signals..."):
-                live_signals = exhaustion_scanner(current_watchlist, market_sentiment=user_sentiment)
-            
-            if len(live_signals) > 0:
-                sig_html = "<div class='table-container'><table class='v38-table'><tr><th>Stock</th><th>Entry</th><th>LTP</th><th>Signal</th><th>SL</th><th>T1(1:2)</th><th>T2(1:3)</th><th>EMA 10</th><th>Time</th></tr>"
-                for sig in live_signals:
-                    sig_clr = "green" if sig['Signal'] == "BUY" else "red"
-                    sig_html += f"<tr><td style='color:{sig_clr}; font-weight:bold;'>{sig['Stock']}</td><td>{fmt_price(sig['Entry'])}</td><td>{fmt_price(sig['LTP'])}</td><td style='color:white; background:{sig_clr}; font-weight:bold;'>{sig['Signal']}</td><td>{fmt_price(sig['SL'])}</td><td style='font-weight:bold;'>{fmt_price(sig['T1'])}</td><td style='font-weight:bold;'>{fmt_price(sig['T2(1:3)'])}</td><td style='color:#1a73e8; font-weight:bold;'>{fmt_price(sig['EMA_10'])}</td><td>{sig['Time']}</td></tr>"
-                sig_html += "</table></div>"
-                st.markdown(sig_html, unsafe_allow_html=True)
-            else:
-                st.info("⏳ Waiting for setup... No opposite color + lowest vol candle found yet.")
-        else:
-            st.markdown("<div class='section-title'>🎯 LIVE SIGNALS (ALL CRYPTO FUTURES)</div>", unsafe_allow_html=True)
-            with st.spinner("Scanning ALL 70+ CoinDCX Crypto Futures for HA+BB Setup..."):
-                crypto_signals = crypto_ha_bb_strategy(CRYPTO_SECTORS["ALL COINDCX FUTURES"])
-            
-            if len(crypto_signals) > 0:
-                c_sig_html = "<div class='table-container'><table class='v38-table'><tr><th>Coin</th><th>Entry (Norm)</th><th>LTP</th><th>Signal</th><th>SL (Norm)</th><th>Target (BB)</th><th>Target (1:3)</th><th>Alert Time</th></tr>"
-                for sig in crypto_signals:
-                    sig_clr = "green" if sig['Signal'] == "BUY" else "red"
-                    c_sig_html += f"<tr><td style='color:{sig_clr}; font-weight:bold;'>{sig['Coin']}</td><td>${fmt_price(sig['Entry'])}</td><td>${fmt_price(sig['LTP'])}</td><td style='color:white; background:{sig_clr}; font-weight:bold;'>{sig['Signal']}</td><td>${fmt_price(sig['SL'])}</td><td style='font-weight:bold; color:#1a73e8;'>${fmt_price(sig['Target(BB)'])}</td><td style='font-weight:bold; color:#856404;'>${fmt_price(sig['Target(1:3)'])}</td><td>{sig['Time']}</td></tr>"
-                c_sig_html += "</table></div>"
-                st.markdown(c_sig_html, unsafe_allow_html=True)
-            else:
-                st.info("⏳ Waiting for setup... No 1-Hour Heikin-Ashi BB Signal found yet.")
-
-        st.markdown("<div class='section-title'>📝 TRADE JOURNAL (CLOSED TRADES)</div>", unsafe_allow_html=True)
-        st.markdown("<div style='text-align:center; padding: 15px; border: 1px dashed #ccc; border-radius: 5px; color: #888; font-weight:bold; font-size:12px; margin-bottom:10px; background:white;'>Waiting for real trades to execute and close today...</div>", unsafe_allow_html=True)
+        render_indices_panel()
+        render_breadth_panel()
+        render_signals_panel()
+
+        render_journal_panel()
 
     # --- COLUMN 3 (GAINERS & LOSERS) ---
     with col3:
-        st.markdown("<div class='section-title'>🚀 LIVE TOP GAINERS</div>", unsafe_allow_html=True)
-        if gainers:
-            g_html = "<div class='table-container'><table class='v38-table'><tr><th>Asset</th><th>LTP</th><th>%</th></tr>"
-            for g in gainers: 
-                prefix = "$" if market_mode != "🇮🇳 Indian Market (NSE)" else "₹"
-                g_html += f"<tr><td style='text-align:left; font-weight:bold; color:#003366;'>{g['Stock']}</td><td>{prefix}{fmt_price(g['LTP'])}</td><td style='color:green; font-weight:bold;'>+{g['Pct']}%</td></tr>"
-            g_html += "</table></div>"
-            st.markdown(g_html, unsafe_allow_html=True)
-        else: st.markdown("<p style='font-size:12px;text-align:center;'>No live gainers data.</p>", unsafe_allow_html=True)
-
-        st.markdown("<div class='section-title'>🔻 LIVE TOP LOSERS</div>", unsafe_allow_html=True)
-        if losers:
-            l_html = "<div class='table-container'><table class='v38-table'><tr><th>Asset</th><th>LTP</th><th>%</th></tr>"
-            for l in losers: 
-                prefix = "$" if market_mode != "🇮🇳 Indian Market (NSE)" else "₹"
-                l_html += f"<tr><td style='text-align:left; font-weight:bold; color:#003366;'>{l['Stock']}</td><td>{prefix}{fmt_price(l['LTP'])}</td><td style='color:red; font-weight:bold;'>{l['Pct']}%</td></tr>"
-            l_html += "</table></div>"
-            st.markdown(l_html, unsafe_allow_html=True)
-        else: st.markdown("<p style='font-size:12px;text-align:center;'>No live losers data.</p>", unsafe_allow_html=True)
+        render_gainers_losers_panel()
 
 # ==================== OTHER SECTIONS ====================
 elif page_selection in ["🌅 9:10 AM: Pre-Market Gap", "🚀 9:15 AM: Opening Movers", "🚀 24H Crypto Movers"]:
     st.markdown(f"<div class='section-title'>{page_selection}</div>", unsafe_allow_html=True)
     with st.spinner("Scanning ALL Assets..."):
-        movers = get_opening_movers(all_assets)
+        movers = get_market_snapshot(snapshot_symbols, stream_version()).movers(all_assets)
     if movers:
-        m_html = "<div class='table-container'><table class='v38-table'><tr><th>Stock / Coin</th><th>LTP</th><th>Movement %</th></tr>"
-        for m in movers: 
-            c = "green" if m['Pct'] > 0 else "red"
-            m_html += f"<tr><td style='font-weight:bold;'>{m['Stock']}</td><td>{fmt_price(m['LTP'])}</td><td style='color:{c}; font-weight:bold;'>{m['Pct']}%</td></tr>"
-        m_html += "</table></div>"
-        st.markdown(m_html, unsafe_allow_html=True)
+        with metrics.timer("render_movers_table"):
+            st.markdown(html_tables.MOVERS.render(movers), unsafe_allow_html=True)
     else: st.info("No significant movement found based on live data.")
 
 elif page_selection in ["🔥 9:20 AM: OI Setup", "🔥 Volume Spikes & OI"]:
     st.markdown(f"<div class='section-title'>{page_selection}</div>", unsafe_allow_html=True)
     with st.spinner("Scanning for Volume Spikes & OI Proxy..."):
-        oi_setups = get_oi_simulation(all_assets)
+        oi_setups = [s for s in get_oi_simulation(stream_version()) if s["Stock"] in set(all_assets)]
     if oi_setups:
-        oi_html = "<div class='table-container'><table class='v38-table'><tr><th>Asset</th><th>Market Action (Signal)</th><th>OI / Vol Status</th></tr>"
-        for o in oi_setups: 
-            oi_html += f"<tr><td style='font-weight:bold;'>{o['Stock']}</td><td style='color:{o['Color']}; font-weight:bold;'>{o['Signal']}</td><td style='color:#1a73e8; font-weight:bold;'>{o['OI']}</td></tr>"
-        oi_html += "</table></div>"
-        st.markdown(oi_html, unsafe_allow_html=True)
+        with metrics.timer("render_oi_table"):
+            st.markdown(html_tables.OI.render(oi_setups), unsafe_allow_html=True)
     else: st.info("No significant real volume/OI spikes detected.")
 
 elif page_selection == "🧮 Futures Risk Calculator":
@@ -554,55 +465,156 @@ elif page_selection == "🧮 Futures Risk Calculator":
                 st.error(f"**Liquidation Price ⚠️:** ${fmt_price(liq_price)}")
             else: st.warning("Entry and Stop Loss cannot be the same!")
     st.markdown("</div>", unsafe_allow_html=True)
+    live_trades = get_signal_log().journal(strategy="ha_bb")
+    if live_trades.empty: st.info("🎲 Monte Carlo risk runs on the live HA + BB signals once the journal has closed trades (or on a run from the 📊 Backtest Engine).")
+    else: render_risk_simulation(live_trades, f"{len(live_trades)} journaled HA + BB signals at {risk_pct:g}% risk, {leverage}x", "mc_live", risk_pct, leverage)
 
 elif page_selection == "⚙️ Scanner Settings":
     st.markdown("<div class='section-title'>⚙️ Scanner Settings</div>", unsafe_allow_html=True)
     st.success("Your terminal is fully integrated. PURE LIVE data mode is active with dynamic decimal formatting.")
 
+    # 🚨 PERFORMANCE DIAGNOSTICS: per-process counters since this worker started 🚨
+    st.markdown("<div class='section-title'>⏱️ HOT-PATH LATENCY (THIS WORKER)</div>", unsafe_allow_html=True)
+    latency = metrics.REGISTRY.latency_table()
+    if latency: st.dataframe(pd.DataFrame(latency), use_container_width=True, hide_index=True)
+    else: st.info("No instrumented calls yet. Open the MAIN TERMINAL first.")
+
+    st.markdown("<div class='section-title'>🗄️ CACHE HIT RATIOS</div>", unsafe_allow_html=True)
+    ratios = metrics.cache_hit_ratios()
+    if ratios:
+        st.dataframe(pd.DataFrame([{"Tier": tier, "Name": name, "Hits": int(h), "Misses": int(m), "Hit %": round(r * 100, 1)}
+                                   for (tier, name), (h, m, r) in sorted(ratios.items())]), use_container_width=True, hide_index=True)
+    else: st.info("No cache lookups recorded yet.")
+
+    st.markdown("<div class='section-title'>🌐 UPSTREAM TRAFFIC</div>", unsafe_allow_html=True)
+    up_col1, up_col2 = st.columns(2)
+    with up_col1:
+        upstream = {}
+        for metric, label in [("haridas_upstream_requests_total", "Requests"), ("haridas_upstream_bytes_total", "Bytes"), ("haridas_upstream_errors_total", "Errors")]:
+            for row in metrics.REGISTRY.counter_table(metric): upstream.setdefault(row["host"], {"Host": row["host"]})[label] = int(row["value"])
+        if upstream: st.dataframe(pd.DataFrame(list(upstream.values())).fillna(0), use_container_width=True, hide_index=True)
+        else: st.caption("No upstream requests yet.")
+        attempts = metrics.REGISTRY.counter_table("haridas_fetch_attempts_total")
+        if attempts: st.dataframe(pd.DataFrame(attempts), use_container_width=True, hide_index=True)
+    with up_col2:
+        st.caption("Circuit breakers")
+        st.json(market_data.PIPELINE.status() or {"status": "no upstream hosts contacted yet"})
+        st.caption("Tick feed")
+        st.json(get_tick_stream().status() if get_tick_stream() is not None else {"status": "polling (set HARIDAS_TICK_FEED to stream)"})
+        st.caption("Daily features")
+        features = get_engine().built_features  # diagnostics only: never start the two-universe download from here
+        st.json({"sessions (NSE, crypto)": [str(day) for day in features.key], "symbols": len(features)} if features is not None else {"status": "not built yet"})
+        st.caption("News feeds")
+        st.json(get_news_feed().status())
+        st.caption(f"Background refresh jobs (panel auto-refresh {'on' if auto_refresh else 'off'})")
+        st.json(get_refresh_scheduler().status())
+
+    prom_text = metrics.REGISTRY.prometheus_text()
+    try: metrics.write_textfile(METRICS_TEXTFILE)
+    except OSError: pass
+    st.download_button("⬇️ Download Prometheus metrics", prom_text, file_name="metrics.prom", mime="text/plain")
+    st.caption(f"Textfile: {METRICS_TEXTFILE}" + (f" · endpoint: :{os.environ['HARIDAS_METRICS_PORT']}/metrics" if os.environ.get("HARIDAS_METRICS_PORT") else ""))
+
 elif page_selection == "📊 Backtest Engine":
     st.markdown("<div class='section-title'>📊 Backtest Engine (Real Historical Data)</div>", unsafe_allow_html=True)
-    bt_col1, bt_col2 = st.columns(2)
+    # strategy label -> (walkforward strategy or None for the daily rule, bar interval, periods)
+    bt_strategies = {"3-Day Reversal (Daily)": (None, "1d", ["1mo", "3mo", "6mo", "1y", "2y"])}
+    if market_mode == "🇮🇳 Indian Market (NSE)": bt_strategies["Exhaustion (5m Intraday)"] = ("exhaustion", "5m", ["5d", "1mo", "60d"])
+    else: bt_strategies["HA + BB (1h)"] = ("ha_bb", "1h", ["1mo", "3mo", "6mo", "1y"])
+    bt_col1, bt_col2, bt_col3, bt_col4 = st.columns(4)
     with bt_col1:
-        bt_stock = st.selectbox("Select Asset to Backtest:", all_assets, index=0)
+        bt_scope = st.selectbox("Backtest Universe:", ["Single Asset", "Watchlist", "All Assets"])
     with bt_col2:
-        bt_period = st.selectbox("Select Time Period:", ["1mo", "3mo", "6mo", "1y", "2y"])
+        if bt_scope == "Single Asset":
+            bt_stock = st.selectbox("Select Asset to Backtest:", all_assets, index=0)
+            bt_symbols, bt_label = [bt_stock], bt_stock
+        elif bt_scope == "Watchlist":
+            bt_label = st.selectbox("Watchlist to Backtest:", list(sector_dict.keys()), index=0)
+            bt_symbols = sector_dict[bt_label]
+        else:
+            bt_symbols, bt_label = all_assets, f"all {len(all_assets)} assets"
+            st.caption(f"Runs every asset in the {'NSE' if market_mode == '🇮🇳 Indian Market (NSE)' else 'crypto'} universe.")
+    with bt_col3:
+        bt_strategy = st.selectbox("Strategy:", list(bt_strategies.keys()))
+        bt_replay, bt_interval, bt_periods = bt_strategies[bt_strategy]
+    with bt_col4:
+        bt_period = st.selectbox("Select Time Period:", bt_periods)
+    if bt_replay == "exhaustion": st.caption(f"Replays {bt_interval} bars session by session with the live {user_sentiment} exhaustion rules: stop entry, SL, T1 → break-even, 50% booked at 1:3, 15:30 square-off.")
+    elif bt_replay: st.caption(f"Replays {bt_interval} bars with the live HA + BB re-entry rules: stop entry, SL, BB target → break-even, 50% booked at 1:3.")
 
     if st.button("🚀 Run Backtest", use_container_width=True):
-        with st.spinner(f"Fetching {bt_period} historical data for {bt_stock}..."):
+        with st.spinner(f"Fetching {bt_period} of {bt_interval} history for {bt_label}..."):
             try:
-                bt_data = yf.Ticker(bt_stock).history(period=bt_period)
-                if len(bt_data) > 3:
-                    trades = []
-                    for i in range(3, len(bt_data)):
-                        c1, o1 = bt_data['Close'].iloc[i-1], bt_data['Open'].iloc[i-1]
-                        c2, o2 = bt_data['Close'].iloc[i-2], bt_data['Open'].iloc[i-2]
-                        c3, o3 = bt_data['Close'].iloc[i-3], bt_data['Open'].iloc[i-3]
-
-                        if c1 > o1 and c2 > o2 and c3 > o3:
-                            entry_price, exit_price = bt_data['Open'].iloc[i], bt_data['Close'].iloc[i]
-                            if entry_price > 0:
-                                pnl = ((entry_price - exit_price) / entry_price) * 100
-                                trades.append({"Date": bt_data.index[i].strftime('%Y-%m-%d'), "Setup": "3 Days GREEN", "Signal": "SHORT", "Entry": fmt_price(entry_price), "Exit": fmt_price(exit_price), "P&L %": round(pnl, 2)})
-                        
-                        elif c1 < o1 and c2 < o2 and c3 < o3:
-                            entry_price, exit_price = bt_data['Open'].iloc[i], bt_data['Close'].iloc[i]
-                            if entry_price > 0:
-                                pnl = ((exit_price - entry_price) / entry_price) * 100
-                                trades.append({"Date": bt_data.index[i].strftime('%Y-%m-%d'), "Setup": "3 Days RED", "Signal": "BUY", "Entry": fmt_price(entry_price), "Exit": fmt_price(exit_price), "P&L %": round(pnl, 2)})
-
-                    bt_df = pd.DataFrame(trades)
-                    if not bt_df.empty:
-                        st.success(f"✅ Backtest completed for {bt_stock}. Found {len(bt_df)} setups.")
-                        total_pnl = bt_df['P&L %'].sum()
-                        win_rate = (len(bt_df[bt_df['P&L %'] > 0]) / len(bt_df)) * 100
-                        m_col1, m_col2, m_col3 = st.columns(3)
-                        m_col1.metric("Total Trades", len(bt_df))
-                        m_col2.metric("Win Rate", f"{win_rate:.2f}%")
-                        m_col3.metric("Total Strategy P&L %", f"{total_pnl:.2f}%", delta=f"{total_pnl:.2f}%")
-                        st.dataframe(bt_df, use_container_width=True)
-                    else: st.info(f"No valid setups found for {bt_stock} in the last {bt_period}.")
+                with metrics.timer("backtest_engine"):
+                    bt_options = {"sentiment": user_sentiment} if bt_replay == "exhaustion" else {}
+                    bt_summary, bt_df = get_engine().backtest(bt_symbols, bt_period, bt_replay or "reversal", **bt_options)
+                st.session_state["bt_trades"] = (f"{bt_strategy} on {bt_label}, {bt_period}", bt_df.copy())
+                if not bt_df.empty:
+                    port = backtest.portfolio_summary(bt_df, by="Date" if bt_replay is None else "Exit Time")
+                    st.success(f"✅ Backtest completed for {bt_label}. Found {port['Trades']} setups" + (f" across {port['Symbols']} assets." if bt_scope != "Single Asset" else "."))
+                    m_col1, m_col2, m_col3, m_col4 = st.columns(4)
+                    m_col1.metric("Total Trades", port["Trades"])
+                    m_col2.metric("Win Rate", f"{port['Win Rate %']:.2f}%")
+                    m_col3.metric("Total Strategy P&L %", f"{port['Total P&L %']:.2f}%", delta=f"{port['Total P&L %']:.2f}%")
+                    m_col4.metric("Max Drawdown", f"{port['Max Drawdown %']:.2f}%")
+                    price_cols = [c for c in ["Entry", "Exit", "SL", "T1", "T2"] if c in bt_df.columns]
+                    bt_df[price_cols] = bt_df[price_cols].map(fmt_price)
+                    if bt_scope == "Single Asset": st.dataframe(bt_df.drop(columns="Symbol"), use_container_width=True)
+                    else:
+                        st.dataframe(bt_summary, use_container_width=True, hide_index=True)
+                        with st.expander(f"All {len(bt_df)} trades"): st.dataframe(bt_df, use_container_width=True, hide_index=True)
+                else: st.info(f"No valid setups found for {bt_label} in the last {bt_period}.")
             except Exception as e: st.error(f"Error fetching data: {e}")
-
-if auto_refresh:
-    time.sleep(refresh_time * 60)
-    st.rerun()
+    # kept across reruns so the simulation's own widgets don't discard the run it is based on
+    if "bt_trades" in st.session_state and not st.session_state["bt_trades"][1].empty: render_risk_simulation(st.session_state["bt_trades"][1], st.session_state["bt_trades"][0], "mc_bt")
+
+elif page_selection == "🧪 Parameter Sweep":
+    st.markdown("<div class='section-title'>🧪 Parameter Sweep (Strategy Constants)</div>", unsafe_allow_html=True)
+    # label -> (sweep strategy, periods)
+    sw_strategies = {"Exhaustion (5m Intraday)": ("exhaustion", ["5d", "1mo", "60d"])} if market_mode == "🇮🇳 Indian Market (NSE)" else {"HA + BB (1h)": ("ha_bb", ["1mo", "3mo", "6mo", "1y"])}
+    sw_strategies["OI Volume Spike (15m)"] = ("oi_proxy", ["5d", "1mo", "60d"])
+    sw_col1, sw_col2, sw_col3, sw_col4 = st.columns(4)
+    with sw_col1:
+        sw_label = st.selectbox("Strategy:", list(sw_strategies.keys()))
+        sw_strategy, sw_periods = sw_strategies[sw_label]
+    with sw_col2: sw_watchlist = st.selectbox("Watchlist:", list(sector_dict.keys()) + ["All Assets"], index=0)
+    with sw_col3: sw_period = st.selectbox("Time Period:", sw_periods)
+    with sw_col4: sw_rank = st.selectbox("Rank By:", ["Total P&L %", "Avg R", "Win Rate %", "Avg P&L %", "Max Drawdown %"])
+    sw_symbols = all_assets if sw_watchlist == "All Assets" else sector_dict[sw_watchlist]
+
+    with st.expander("Parameter grid (comma-separated values)", expanded=True):
+        sw_grid, grid_cols = {}, st.columns(len(sweep.PARAM_GRIDS[sw_strategy]))
+        for grid_col, (param, values) in zip(grid_cols, sweep.PARAM_GRIDS[sw_strategy].items()):
+            text = grid_col.text_input(param, ", ".join(f"{v:g}" for v in values), key=f"sw_{sw_strategy}_{param}")
+            try: sw_grid[param] = sorted({type(values[0])(float(x)) for x in text.split(",") if x.strip()})
+            except ValueError: grid_col.error("numbers only")
+    sw_total = 1
+    for values in sw_grid.values(): sw_total *= len(values)
+    s_col1, s_col2, s_col3 = st.columns(3)
+    with s_col1: sw_search = st.radio("Search:", ["Grid", "Random"], horizontal=True)
+    with s_col2: sw_samples = st.number_input("Random samples:", min_value=1, max_value=max(1, sw_total), value=min(30, max(1, sw_total)), disabled=sw_search == "Grid")
+    with s_col3: sw_min_trades = st.number_input("Min trades:", min_value=0, value=10)
+    if sw_strategy == "exhaustion": st.caption(f"Replays {sweep.INTERVALS[sw_strategy]} bars with the {user_sentiment} exhaustion fills of the Backtest Engine. ema_span 0 = no EMA trend filter (live).")
+    elif sw_strategy == "oi_proxy": st.caption("Trades each volume spike in its candle's direction from the next open for `hold` bars (NSE: flat by 15:30).")
+
+    if st.button("🧪 Run Sweep", use_container_width=True, disabled=len(sw_grid) < len(sweep.PARAM_GRIDS[sw_strategy]) or not sw_total):
+        sw_combos = sweep.grid_combos(sw_grid) if sw_search == "Grid" else sweep.random_combos(sw_grid, int(sw_samples))
+        sw_live = {param: sweep.LIVE_PARAMS[sw_strategy][param] for param in sw_grid}
+        if sw_live not in sw_combos: sw_combos.append(sw_live)  # always benchmark against today's constants
+        with st.spinner(f"Sweeping {len(sw_combos)} parameter sets over {len(sw_symbols)} assets ({sw_period} of {sweep.INTERVALS[sw_strategy]})..."):
+            try:
+                with metrics.timer("parameter_sweep"):
+                    sw_bars = get_bars(sw_symbols, sw_period, sweep.INTERVALS[sw_strategy])
+                    sw_options = {"sentiment": user_sentiment} if sw_strategy == "exhaustion" else {}
+                    sw_table, sw_computed = sweep.run_sweep(sw_bars, sw_strategy, sw_combos, executor=get_backtest_pool() if len(sw_bars) > 1 else None,
+                                                            rank_by=sw_rank, min_trades=sw_min_trades, **sw_options)
+                if not sw_table.empty:
+                    st.success(f"✅ {len(sw_combos)} parameter sets × {len(sw_bars)} assets" + (f"; {sw_computed} indicator arrays computed and shared across sets." if sw_computed else "."))
+                    best, live = sw_table.iloc[0], sw_table[sw_table["Live"] != ""]
+                    b_col1, b_col2, b_col3 = st.columns(3)
+                    b_col1.metric(f"Best {sw_rank}", f"{best[sw_rank]:.2f}")
+                    if not live.empty: b_col2.metric(f"Live Settings {sw_rank}", f"{live.iloc[0][sw_rank]:.2f}", delta=f"rank #{live.index[0] + 1}", delta_color="off")
+                    b_col3.metric("Best Set Trades", int(best["Trades"]))
+                    st.dataframe(sw_table, use_container_width=True)
+                else: st.info(f"No parameter set produced {sw_min_trades}+ trades on {sw_watchlist} in the last {sw_period}.")
+            except Exception as e: st.error(f"Error running sweep: {e}")
@@ -0,0 +1,82 @@
+"""Multi-asset Backtest Engine: vectorized per-symbol rule runs fanned out over a process pool."""
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from bar_panel import as_panel
+from strategies import TRADE_COLUMNS, three_day_reversal_signals, trade_frame
+
+DEFAULT_WORKERS = min(8, os.cpu_count() or 1)
+MIN_SYMBOLS_PER_WORKER = 16  # below this a worker's pickling overhead outweighs the work it saves
+SUMMARY_COLUMNS = ["Symbol", "Trades", "Win Rate %", "Total P&L %", "Avg P&L %", "Max Drawdown %", "Best %", "Worst %"]
+
+
+def make_pool(workers=None):
+    # spawn: never fork a process that is running Streamlit's server and scheduler threads
+    return ProcessPoolExecutor(max_workers=workers or DEFAULT_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+
+
+def max_drawdown(pnl):
+    """Deepest peak-to-trough fall of the cumulative P&L % curve (equal stake per trade)."""
+    if len(pnl) == 0: return 0.0
+    curve = np.cumsum(np.asarray(pnl, dtype=float))
+    peak = np.maximum.accumulate(np.concatenate([[0.0], curve]))[1:]
+    return float(np.max(peak - curve))
+
+
+def symbol_summary(sym, pnl):
+    return {"Symbol": sym, "Trades": len(pnl), "Win Rate %": round(float((pnl > 0).mean() * 100), 2),
+            "Total P&L %": round(float(pnl.sum()), 2), "Avg P&L %": round(float(pnl.mean()), 2),
+            "Max Drawdown %": round(max_drawdown(pnl), 2), "Best %": float(pnl.max()), "Worst %": float(pnl.min())}
+
+
+def _session_days(index):
+    # exchange-local calendar day of each bar as datetime64[D]
+    return pd.DatetimeIndex(index).tz_localize(None).values.astype("datetime64[D]")
+
+
+def _run_chunk(items, streak):
+    """items: [(symbol, days, open, close)] -> (summaries, [symbol, day, short, entry, exit, pnl] arrays)."""
+    summaries, cols = [], [[] for _ in range(6)]
+    for sym, days, o, c in items:
+        pos, short, entry, exit_price, pnl = three_day_reversal_signals(o, c, streak)
+        if not len(pos): continue
+        summaries.append(symbol_summary(sym, pnl))
+        for col, values in zip(cols, (np.full(len(pos), sym, dtype=object), days[pos], short, entry, exit_price, pnl)): col.append(values)
+    return summaries, [np.concatenate(col) if col else np.empty(0) for col in cols]
+
+
+def run_universe(frames, executor=None, workers=DEFAULT_WORKERS, streak=3):
+    """Backtest every symbol's daily bars -> (per-symbol summary, all trades with a Symbol column).
+
+    With an executor the universe is split into one chunk per worker; only numpy arrays cross the
+    process boundary.
+    """
+    items = [(sym, _session_days(bars.timestamps()), bars.open.astype(float), bars.close.astype(float))
+             for sym, bars in as_panel(frames).items() if len(bars) > streak]
+    if executor is not None and workers > 1 and len(items) >= 2 * MIN_SYMBOLS_PER_WORKER:
+        size = max(MIN_SYMBOLS_PER_WORKER, math.ceil(len(items) / workers))
+        chunks = [items[i:i + size] for i in range(0, len(items), size)]
+        results = list(executor.map(_run_chunk, chunks, [streak] * len(chunks)))
+    else: results = [_run_chunk(items, streak)]
+    summaries = [row for rows, _ in results for row in rows]
+    if not summaries: return pd.DataFrame(columns=SUMMARY_COLUMNS), pd.DataFrame(columns=["Symbol"] + TRADE_COLUMNS)
+    sym, days, short, entry, exit_price, pnl = (np.concatenate([arrays[i] for rows, arrays in results if rows]) for i in range(6))
+    trades = trade_frame(np.datetime_as_string(days, unit="D"), short.astype(bool), entry, exit_price, pnl, streak)
+    trades.insert(0, "Symbol", sym)
+    summary = pd.DataFrame(summaries, columns=SUMMARY_COLUMNS)
+    return summary.sort_values("Total P&L %", ascending=False, ignore_index=True), trades
+
+
+def portfolio_summary(trades, by="Date"):
+    """Universe totals; drawdown runs on the time-ordered curve of every symbol's trades summed per `by`."""
+    if trades.empty: return {"Trades": 0, "Win Rate %": 0.0, "Total P&L %": 0.0, "Avg P&L %": 0.0, "Max Drawdown %": 0.0, "Symbols": 0}
+    pnl = trades["P&L %"].to_numpy(dtype=float)
+    daily = trades.groupby(by)["P&L %"].sum().sort_index()
+    return {"Trades": len(trades), "Win Rate %": round(float((pnl > 0).mean() * 100), 2), "Total P&L %": round(float(pnl.sum()), 2),
+            "Avg P&L %": round(float(pnl.mean()), 2), "Max Drawdown %": round(max_drawdown(daily.to_numpy()), 2),
+            "Symbols": int(trades["Symbol"].nunique())}
@@ -0,0 +1,103 @@
+"""Columnar in-memory bars: one contiguous float32 array per field for a whole universe.
+
+A BarPanel stores every symbol's bars back to back (each listing keeps its own history length and
+session), with an int64 epoch-seconds time axis and a symbol -> row index into the offsets.
+panel[symbol] is a SymbolView whose arrays are slices of the shared ones, so scanners walk a
+2,000-symbol universe without a DataFrame, an index and a block manager per symbol. The arrays
+are read-only: a single panel is safely shared by every session and rerun.
+"""
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+from bar_store import FIELDS, from_epoch, to_epoch
+
+
+def as_price(x):
+    """A price worked out from float32 bars, as the decimal it stands for: 813.7663, not 813.7662963867188."""
+    return float(str(np.float32(x)))
+
+
+class SymbolView:
+    """Zero-copy window onto one symbol's rows: .ts (int64 epoch s), .open ... .volume (float32), .tz."""
+
+    __slots__ = ("symbol", "tz", "stale", "ts", "open", "high", "low", "close", "volume")
+
+    def __init__(self, symbol, tz, stale, ts, columns):
+        self.symbol, self.tz, self.stale, self.ts = symbol, tz, stale, ts
+        self.open, self.high, self.low, self.close, self.volume = columns
+
+    def __len__(self):
+        return len(self.ts)
+
+    def __getitem__(self, field):
+        return getattr(self, field.lower())
+
+    @property
+    def empty(self):
+        return not len(self.ts)
+
+    def head(self, n):
+        """View of the first n bars."""
+        return SymbolView(self.symbol, self.tz, self.stale, self.ts[:n], [self[f][:n] for f in FIELDS])
+
+    def timestamps(self, start=None, stop=None):
+        """DatetimeIndex of a slice of the bars, built only for the rows asked for."""
+        return from_epoch(self.ts[start:stop], self.tz)
+
+    def frame(self):
+        df = pd.DataFrame({f: self[f].astype(float) for f in FIELDS}, index=self.timestamps())
+        if self.stale: df.attrs["stale"] = True
+        return df
+
+
+class BarPanel(Mapping):
+    def __init__(self, symbols, offsets, ts, tz, columns, stale=frozenset()):
+        self.symbols, self.offsets, self.ts, self.tz, self.columns, self.stale = symbols, offsets, ts, tz, columns, stale
+        self.row = {sym: i for i, sym in enumerate(symbols)}
+        for array in (offsets, ts, *columns.values()): array.flags.writeable = False
+
+    @classmethod
+    def from_frames(cls, frames):
+        """{symbol: OHLCV DataFrame} -> panel; one pass, written straight into the shared arrays."""
+        items = [(sym, df) for sym, df in frames.items() if df is not None and not df.empty]
+        offsets = np.zeros(len(items) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(df) for _, df in items])
+        ts = np.empty(offsets[-1], dtype=np.int64)
+        columns = {f: np.zeros(offsets[-1], dtype=np.float32) for f in FIELDS}
+        tz = []
+        for (_, df), start, stop in zip(items, offsets[:-1], offsets[1:]):
+            ts[start:stop], zone = to_epoch(df.index)
+            tz.append(zone)
+            for f in FIELDS:
+                if f in df.columns: columns[f][start:stop] = df[f].to_numpy(dtype=np.float32)
+        stale = frozenset(sym for sym, df in items if df.attrs.get("stale"))
+        return cls([sym for sym, _ in items], offsets, ts, tz, columns, stale)
+
+    def __getitem__(self, symbol):
+        i = self.row[symbol]
+        rows = slice(self.offsets[i], self.offsets[i + 1])
+        return SymbolView(symbol, self.tz[i], symbol in self.stale, self.ts[rows], [self.columns[f][rows] for f in FIELDS])
+
+    def __iter__(self):
+        return iter(self.symbols)
+
+    def __len__(self):
+        return len(self.symbols)
+
+    @property
+    def bars(self):
+        return int(self.offsets[-1])
+
+    @property
+    def nbytes(self):
+        return int(self.offsets.nbytes + self.ts.nbytes + sum(a.nbytes for a in self.columns.values()))
+
+    def frames(self):
+        """Per-symbol float64 DataFrames, for callers that still want pandas."""
+        return {sym: self[sym].frame() for sym in self.symbols}
+
+
+def as_panel(frames):
+    return frames if isinstance(frames, BarPanel) else BarPanel.from_frames(frames)
@@ -0,0 +1,173 @@
+"""On-disk OHLCV store (SQLite, one table per interval) with incremental append-only refresh."""
+import datetime
+import os
+import re
+import sqlite3
+import time
+
+import pandas as pd
+
+import metrics
+
+DATA_DIR = os.environ.get("HARIDAS_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".terminal_data"))
+DEFAULT_PATH = os.path.join(DATA_DIR, "bars.sqlite")
+
+# yfinance period -> days of history it covers ("Nd" periods are trading sessions, not calendar days)
+PERIOD_DAYS = {"1d": 1, "2d": 2, "5d": 5, "10d": 10, "15d": 15, "1mo": 31, "3mo": 92, "6mo": 183,
+               "1y": 366, "2y": 731, "5y": 1827, "10y": 3653, "max": 36500}
+FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def period_days(period):
+    if period in PERIOD_DAYS: return PERIOD_DAYS[period]
+    m = re.fullmatch(r"(\d+)(d|mo|y)", str(period))
+    if not m: raise ValueError(f"Unsupported period: {period}")
+    n, unit = int(m.group(1)), m.group(2)
+    return n if unit == "d" else (n * 31 if unit == "mo" else n * 366)
+
+
+def _table(interval):
+    if not re.fullmatch(r"[0-9a-zA-Z]+", interval): raise ValueError(f"Bad interval: {interval}")
+    return f"bars_{interval}"
+
+
+def to_epoch(index):
+    idx = pd.DatetimeIndex(index)
+    tz = str(idx.tz) if idx.tz is not None else ""
+    if idx.tz is not None: idx = idx.tz_convert("UTC").tz_localize(None)
+    return idx.as_unit("s").asi8, tz
+
+
+def from_epoch(ts, tz):
+    idx = pd.to_datetime(ts, unit="s", utc=True)
+    return idx.tz_convert(tz) if tz else idx.tz_localize(None)
+
+
+def trim_to_period(df, period):
+    # "Nd" keeps the last N sessions present in the data, calendar periods keep a date window
+    if df.empty: return df
+    days = period_days(period)
+    if str(period).endswith("d") and period != "max":
+        dates = df.index.normalize()
+        keep = dates.unique()[-days:]
+        return df[dates.isin(keep)]
+    cutoff = df.index[-1] - pd.Timedelta(days=days)
+    return df[df.index >= cutoff]
+
+
+class BarStore:
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._fetched = {}  # (symbol, interval) -> wall time of last successful download
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as con:
+            con.execute("CREATE TABLE IF NOT EXISTS bar_meta (symbol TEXT, interval TEXT, tz TEXT, span_days INTEGER, "
+                        "PRIMARY KEY (symbol, interval))")
+            con.execute("CREATE TABLE IF NOT EXISTS indicator_state (symbol TEXT, interval TEXT, name TEXT, last_ts INTEGER, "
+                        "state TEXT, PRIMARY KEY (symbol, interval, name))")
+
+    def _connect(self):
+        con = sqlite3.connect(self.path, timeout=30)
+        con.execute("PRAGMA journal_mode=WAL")
+        return con
+
+    def _ensure_table(self, con, interval):
+        con.execute(f"CREATE TABLE IF NOT EXISTS {_table(interval)} (symbol TEXT, ts INTEGER, open REAL, high REAL, "
+                    "low REAL, close REAL, volume REAL, PRIMARY KEY (symbol, ts))")
+
+    def coverage(self, symbols, interval):
+        """{symbol: (last_ts, span_days, tz)} for symbols already stored at this interval."""
+        if not symbols: return {}
+        with self._connect() as con:
+            self._ensure_table(con, interval)
+            marks = ",".join("?" * len(symbols))
+            meta = {s: (span, tz) for s, tz, span in con.execute(
+                f"SELECT symbol, tz, span_days FROM bar_meta WHERE interval=? AND symbol IN ({marks})", [interval, *symbols])}
+            last = dict(con.execute(f"SELECT symbol, MAX(ts) FROM {_table(interval)} WHERE symbol IN ({marks}) GROUP BY symbol", symbols))
+        return {s: (last[s], meta[s][0], meta[s][1]) for s in meta if last.get(s) is not None}
+
+    def write(self, interval, frames, span_days=None):
+        if not frames: return
+        with self._connect() as con:
+            self._ensure_table(con, interval)
+            for sym, df in frames.items():
+                if df is None or df.empty: continue
+                ts, tz = to_epoch(df.index)
+                cols = [df[f].astype(float).tolist() if f in df.columns else [0.0] * len(df) for f in FIELDS]
+                con.executemany(f"INSERT OR REPLACE INTO {_table(interval)} VALUES (?,?,?,?,?,?,?)",
+                                zip([sym] * len(df), ts.tolist(), *cols))
+                if span_days is None:
+                    con.execute("INSERT OR IGNORE INTO bar_meta VALUES (?,?,?,0)", (sym, interval, tz))
+                else:
+                    con.execute("INSERT INTO bar_meta VALUES (?,?,?,?) ON CONFLICT(symbol, interval) DO UPDATE SET "
+                                "tz=excluded.tz, span_days=MAX(span_days, excluded.span_days)", (sym, interval, tz, span_days))
+
+    def read(self, symbols, period, interval):
+        days = period_days(period)
+        # "Nd" periods count sessions, so look back far enough to cover weekends and holidays
+        lookback = days * 2 + 7 if str(period).endswith("d") else days + 1
+        since = int((datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=lookback)).timestamp())
+        cover = self.coverage(symbols, interval)
+        frames = {}
+        with self._connect() as con:
+            for sym in symbols:
+                if sym not in cover: continue
+                rows = con.execute(f"SELECT ts, open, high, low, close, volume FROM {_table(interval)} "
+                                   "WHERE symbol=? AND ts>=? ORDER BY ts", (sym, since)).fetchall()
+                if not rows: continue
+                ts, *cols = zip(*rows)
+                df = pd.DataFrame(dict(zip(FIELDS, cols)), index=from_epoch(list(ts), cover[sym][2]))
+                df = trim_to_period(df, period)
+                if not df.empty: frames[sym] = df
+        return frames
+
+    def _download(self, download, interval, symbols, period, start=None):
+        frames = download(symbols, period, interval, start=start)
+        now = time.time()
+        for sym in frames: self._fetched[(sym, interval)] = now
+        return frames
+
+    def load(self, symbols, period, interval, download, max_age=0):
+        """Serve bars from disk, downloading only cold symbols in full and warm ones from their last stored bar.
+
+        download(symbols, period, interval, start=None) -> {symbol: DataFrame}. The last stored bar is
+        re-fetched on every refresh so a still-forming candle is overwritten once it closes. Warm symbols
+        downloaded less than max_age seconds ago (e.g. by the background scheduler) skip the network.
+        Warm symbols whose refresh failed are served from disk with df.attrs["stale"] = True.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        days = period_days(period)
+        cover = self.coverage(symbols, interval)
+        cold = [s for s in symbols if s not in cover or cover[s][1] < days]
+        metrics.cache_result("bar_store", interval, "miss", len(cold))
+        metrics.cache_result("bar_store", interval, "hit", len(symbols) - len(cold))
+        if cold: self.write(interval, self._download(download, interval, cold, period), span_days=days)
+        now = time.time()
+        warm_groups = {}
+        for sym in symbols:
+            if sym in cold or now - self._fetched.get((sym, interval), 0) < max_age: continue
+            last_ts = cover[sym][0]
+            warm_groups.setdefault(last_ts // 86400, []).append((sym, last_ts))
+        failed = set()
+        for members in warm_groups.values():
+            start = datetime.datetime.fromtimestamp(min(ts for _, ts in members), tz=datetime.timezone.utc)
+            fresh = self._download(download, interval, [s for s, _ in members], None, start=start)
+            self.write(interval, fresh)
+            failed.update(s for s, _ in members if s not in fresh)
+        frames = self.read(symbols, period, interval)
+        for sym in failed & set(frames): frames[sym].attrs["stale"] = True
+        return frames
+
+    def load_states(self, symbols, interval, name):
+        """Checkpointed streaming.IndicatorState objects for these symbols."""
+        from streaming import IndicatorState
+        if not symbols: return {}
+        with self._connect() as con:
+            rows = con.execute(f"SELECT symbol, state FROM indicator_state WHERE interval=? AND name=? AND symbol IN ({','.join('?' * len(symbols))})",
+                               [interval, name, *symbols]).fetchall()
+        return {sym: IndicatorState.from_json(text) for sym, text in rows}
+
+    def save_states(self, states, interval, name):
+        with self._connect() as con:
+            con.executemany("INSERT OR REPLACE INTO indicator_state VALUES (?,?,?,?,?)",
+                            [(sym, interval, name, st.last_ts, st.to_json()) for sym, st in states.items()])
@@ -0,0 +1,325 @@
+"""Offline benchmark suite: times the scanners, the backtest loop and the full page build on replayed bars.
+
+    python benchmark.py run --source synthetic --sizes 10,100,1000,5000 --history 5d,1mo,1y,5y --out before.json
+    python benchmark.py run --source fixture.pkl --out after.json
+    python benchmark.py compare before.json after.json
+    python benchmark.py record --out fixture.pkl        (the only command that needs the network)
+
+Every case runs the real fetch path (pipeline -> BarStore -> scanner) against an offline source in a
+throwaway data directory, cold (empty store) and warm (second refresh), and reports median seconds.
+"""
+import os
+import shutil
+import tempfile
+
+WORK_DIR = tempfile.mkdtemp(prefix="haridas-bench-")
+os.environ["HARIDAS_DATA_DIR"] = WORK_DIR  # set before bar_store is imported: never touch the live terminal's data
+
+import argparse
+import datetime
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+import backtest
+import bar_panel
+import bar_store
+import data_sources
+import markets
+import market_data
+import strategies
+import streaming
+import sweep
+import walkforward
+from daily_features import DailyFeatures
+from fetch_pipeline import FetchPipeline
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "My_Intraday_Setup.py")
+DEFAULT_SIZES = [10, 100, 1000, 5000]
+DEFAULT_HISTORY = ["5d", "1mo", "1y", "5y"]
+SCHEMA_VERSION = 1
+POOL = None  # worker process pool (backtests, sweeps, cold-start scans), started once per run so worker start-up is not timed
+
+
+def universe(n, crypto=False):
+    return [f"SYN{i:05d}-USD" if crypto else f"SYN{i:05d}.NS" for i in range(n)]
+
+
+class Case:
+    """One (bench, universe size, history) run: fresh BarStore in its own directory, phases timed."""
+
+    def __init__(self, name):
+        self.dir = tempfile.mkdtemp(prefix=f"{name}-", dir=WORK_DIR)
+        self.store = bar_store.BarStore(os.path.join(self.dir, "bars.sqlite"))
+        self.phases = {}
+        self.info = {}
+
+    def timed(self, phase, fn, *args):
+        start = time.perf_counter()
+        result = fn(*args)
+        self.phases[phase] = time.perf_counter() - start
+        return result
+
+    def fetch(self, phase, symbols, period, interval):
+        # the terminal's get_bars: fetch, then pack into one columnar panel
+        bars = self.timed(phase, lambda: bar_panel.BarPanel.from_frames(market_data.fetch_bars(symbols, period, interval, self.store)))
+        self.info.update(bars=bars.bars, panel_bytes=bars.nbytes)
+        return bars
+
+    def close(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+
+# --- benches: fetch cold, compute cold, fetch warm (incremental refresh), compute warm ---
+def bench_exhaustion_scanner(case, symbols, period):
+    engine = streaming.IndicatorEngine("5m", store=case.store)
+    for phase in ("cold", "warm"):
+        bars = case.fetch(f"fetch_{phase}", symbols, period, "5m")
+        signals = case.timed(f"compute_{phase}", lambda: strategies.scan_exhaustion(bars, engine.update(bars, executor=POOL), ("BULLISH", "BEARISH")))
+    case.info["signals"] = len(signals)
+
+
+def bench_crypto_ha_bb_strategy(case, symbols, period):
+    engine = streaming.IndicatorEngine("1h", store=case.store)
+    for phase in ("cold", "warm"):
+        bars = case.fetch(f"fetch_{phase}", symbols, period, "1h")
+        signals = case.timed(f"compute_{phase}", lambda: strategies.scan_ha_bb_incremental(bars, engine.update(bars, executor=POOL)))
+    case.info["signals"] = len(signals)
+
+
+def bench_ha_bb_panel(case, symbols, period):
+    for phase in ("cold", "warm"):
+        bars = case.fetch(f"fetch_{phase}", symbols, period, "1h")
+        signals = case.timed(f"compute_{phase}", strategies.scan_ha_bb, bars)
+    case.info["signals"] = len(signals)
+
+
+def bench_get_oi_simulation(case, symbols, period):
+    for phase in ("cold", "warm"):
+        bars = case.fetch(f"fetch_{phase}", symbols, period, "15m")
+        signals = case.timed(f"compute_{phase}", strategies.scan_oi_proxy, bars)
+    case.info["signals"] = len(signals)
+
+
+def bench_get_dynamic_market_data(case, symbols, period):
+    for phase in ("cold", "warm"):
+        bars = case.fetch(f"fetch_{phase}", symbols, period, "1d")
+        _, _, trends = case.timed(f"compute_{phase}", strategies.scan_daily_movers, bars)
+    # the terminal's path: features built once per session, then only the forming bar per refresh
+    features = case.timed("features_build", DailyFeatures.build, bars)
+    case.timed("features_movers", features.movers, bars, symbols)
+    case.info["signals"] = len(trends)
+
+
+def bench_backtest_engine(case, symbols, period):
+    bars = case.fetch("fetch_cold", symbols, period, "1d")
+    _, trades = case.timed("compute_cold", backtest.run_universe, bars)
+    if POOL is not None: case.timed("compute_pool", lambda: backtest.run_universe(bars, executor=POOL))
+    case.info["signals"] = len(trades)
+
+
+def bench_walkforward(strategy, interval):
+    def bench(case, symbols, period):
+        bars = case.fetch("fetch_cold", symbols, period, interval)
+        _, trades = case.timed("compute_cold", walkforward.run_walkforward, bars, strategy)
+        if POOL is not None: case.timed("compute_pool", lambda: walkforward.run_walkforward(bars, strategy, executor=POOL))
+        case.info["signals"] = len(trades)
+    return bench
+
+
+def bench_sweep(strategy, combos=16):
+    def bench(case, symbols, period):
+        bars = case.fetch("fetch_cold", symbols, period, sweep.INTERVALS[strategy])
+        grid = sweep.random_combos(sweep.PARAM_GRIDS[strategy], combos)
+        table, computed = case.timed("compute_cold", sweep.run_sweep, bars, strategy, grid)
+        if POOL is not None: case.timed("compute_pool", lambda: sweep.run_sweep(bars, strategy, grid, executor=POOL))
+        case.info.update(combos=len(grid), indicator_arrays=computed, signals=int(table["Trades"].sum()))
+    return bench
+
+
+# name -> (fn, interval, crypto)
+BENCHES = {
+    "exhaustion_scanner": (bench_exhaustion_scanner, "5m", False),
+    "crypto_ha_bb_strategy": (bench_crypto_ha_bb_strategy, "1h", True),
+    "scan_ha_bb_panel": (bench_ha_bb_panel, "1h", True),
+    "get_oi_simulation": (bench_get_oi_simulation, "15m", False),
+    "get_dynamic_market_data": (bench_get_dynamic_market_data, "1d", False),
+    "backtest_engine": (bench_backtest_engine, "1d", False),
+    "walkforward_exhaustion": (bench_walkforward("exhaustion", "5m"), "5m", False),
+    "walkforward_ha_bb": (bench_walkforward("ha_bb", "1h"), "1h", True),
+    "sweep_exhaustion": (bench_sweep("exhaustion"), "5m", False),
+    "sweep_ha_bb": (bench_sweep("ha_bb"), "1h", True),
+}
+
+
+def run_page_build(repeat):
+    """MAIN TERMINAL render for each market through Streamlit's AppTest: cold caches, then a warm rerun."""
+    try: from streamlit.testing.v1 import AppTest
+    except ImportError: return [{"bench": "page_build", "status": "skipped", "reason": "streamlit.testing unavailable"}]
+    import streamlit as st
+    results = []
+    for market in (0, 1):
+        runs = {"cold": [], "warm": []}
+        status, reason = "ok", ""
+        for _ in range(repeat):
+            _reset_page_caches(st)
+            # the news feeds are the only other network calls on the page: fail every connection fast like an air-gapped box;
+            # the background refresh jobs start with the page but are not part of its render, so they stay off the clock
+            with mock.patch("news.ConnectionPool.connect", side_effect=OSError("offline benchmark")), \
+                    mock.patch("scheduler.RefreshScheduler.start"):
+                at = AppTest.from_file(SCRIPT, default_timeout=3600)
+                if market:
+                    at.run()  # the script opens on NSE; switch to crypto with cold caches
+                    _reset_page_caches(st)
+                    at.sidebar.radio[0].set_value(at.sidebar.radio[0].options[market])
+                for phase in ("cold", "warm"):
+                    start = time.perf_counter()
+                    at.run()
+                    runs[phase].append(time.perf_counter() - start)
+            if at.exception:
+                status, reason = "error", at.exception[0].message
+                break
+        results.append({"bench": "page_build", "market": "crypto" if market else "nse", "status": status, "reason": reason,
+                        "phases": {p: _summary(v) for p, v in runs.items() if v}})
+    return results
+
+
+def _reset_page_caches(st):
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    for name in os.listdir(WORK_DIR):
+        if name.endswith((".sqlite", ".sqlite-wal", ".sqlite-shm")): os.remove(os.path.join(WORK_DIR, name))
+
+
+def _summary(runs):
+    return {"median_s": round(statistics.median(runs), 6), "min_s": round(min(runs), 6), "runs": [round(r, 6) for r in runs]}
+
+
+def run_case(name, size, history, repeat, max_bars):
+    fn, interval, crypto = BENCHES[name]
+    estimate = size * markets.estimate_bars(history, interval, crypto)
+    row = {"bench": name, "market": "crypto" if crypto else "nse", "interval": interval, "symbols": size,
+           "history": history, "estimated_bars": estimate}
+    if estimate > max_bars: return {**row, "status": "skipped", "reason": f"more than --max-bars {max_bars}"}
+    symbols, runs, info = universe(size, crypto), {}, {}
+    for _ in range(repeat):
+        case = Case(name)
+        try: fn(case, symbols, history)
+        except Exception as e: return {**row, "status": "error", "reason": repr(e)}
+        finally: case.close()
+        for phase, seconds in case.phases.items(): runs.setdefault(phase, []).append(seconds)
+        info = case.info
+    return {**row, **info, "status": "ok", "phases": {p: _summary(v) for p, v in runs.items()}}
+
+
+def _git_commit():
+    try: return subprocess.run(["git", "rev-parse", "HEAD"], cwd=os.path.dirname(SCRIPT), capture_output=True, text=True, timeout=10).stdout.strip()
+    except Exception: return ""
+
+
+def make_source(spec, seed):
+    if spec == "synthetic": return data_sources.SyntheticSource(seed=seed)
+    return data_sources.FixtureSource(spec)
+
+
+def cmd_run(args):
+    market_data.set_source(make_source(args.source, args.seed))
+    # measure our code, not the upstream politeness limits
+    market_data.PIPELINE = FetchPipeline(max_concurrency=args.workers, rate=1e9, burst=1e9, deadline_seconds=3600)
+    benches = args.bench or list(BENCHES) + ["page_build"]
+    global POOL
+    if any(b.startswith(("exhaustion", "crypto_ha_bb", "backtest", "walkforward", "sweep")) for b in benches) and args.workers > 1:
+        POOL = backtest.make_pool(args.workers)
+        list(POOL.map(abs, range(args.workers)))
+    report = {
+        "schema": SCHEMA_VERSION,
+        "meta": {"started": datetime.datetime.now(datetime.timezone.utc).isoformat(), "commit": _git_commit(), "source": args.source,
+                 "seed": args.seed, "repeat": args.repeat, "max_bars": args.max_bars, "python": sys.version.split()[0],
+                 "pandas": pd.__version__, "numpy": np.__version__, "platform": platform.platform(), "cpus": os.cpu_count()},
+        "results": [],
+    }
+    for name in benches:
+        if name == "page_build":
+            rows = run_page_build(args.repeat)
+        else:
+            rows = [run_case(name, size, history, args.repeat, args.max_bars) for history in args.history for size in args.sizes]
+        for row in rows:
+            report["results"].append(row)
+            phases = " ".join(f"{p}={v['median_s']:.3f}s" for p, v in row.get("phases", {}).items())
+            print(f"{row['bench']:<24} {row.get('symbols', ''):>6} {row.get('history', row.get('market', '')):>6}  {row['status']:<7} {phases or row.get('reason', '')}", flush=True)
+    report["meta"]["finished"] = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    with open(args.out, "w") as f: json.dump(report, f, indent=1)
+    print(f"wrote {args.out}")
+
+
+def _key(row):
+    return row["bench"], row.get("market"), row.get("symbols"), row.get("history")
+
+
+def cmd_compare(args):
+    with open(args.before) as f: before = {_key(r): r for r in json.load(f)["results"]}
+    with open(args.after) as f: after = json.load(f)["results"]
+    regressions = 0
+    print(f"{'bench':<24} {'symbols':>7} {'history':>7} {'phase':<14} {'before':>9} {'after':>9} {'ratio':>6}")
+    for row in after:
+        old = before.get(_key(row))
+        if old is None or row["status"] != "ok" or old["status"] != "ok": continue
+        for phase, stats in row["phases"].items():
+            if phase not in old["phases"]: continue
+            b, a = old["phases"][phase]["median_s"], stats["median_s"]
+            ratio = a / b if b else float("inf")
+            flag = " !" if ratio > args.threshold and a - b > args.min_delta else ""
+            regressions += bool(flag)
+            print(f"{row['bench']:<24} {str(row.get('symbols', '')):>7} {str(row.get('history', row.get('market'))):>7} {phase:<14} {b:>9.4f} {a:>9.4f} {ratio:>6.2f}{flag}")
+    print(f"{regressions} regression(s) above {args.threshold}x")
+    return 1 if regressions else 0
+
+
+def cmd_record(args):
+    sizes = data_sources.record_fixture(args.out, {"5m": (args.nse, "10d"), "15m": (args.crypto, "1mo"), "1d": (args.nse + args.crypto, "2y"),
+                                                   "1h": (args.crypto, "1y")})
+    print(f"wrote {args.out}: {sizes}")
+
+
+def _csv(kind):
+    return lambda text: [kind(x) for x in text.split(",") if x]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    run = sub.add_parser("run", help="run the benchmark sweep and write JSON")
+    run.add_argument("--source", default="synthetic", help="'synthetic' or a fixture pickle from `record`")
+    run.add_argument("--sizes", type=_csv(int), default=DEFAULT_SIZES)
+    run.add_argument("--history", type=_csv(str), default=DEFAULT_HISTORY)
+    run.add_argument("--bench", type=_csv(str), help=f"subset of {','.join(list(BENCHES) + ['page_build'])}")
+    run.add_argument("--repeat", type=int, default=3)
+    run.add_argument("--max-bars", type=int, default=5_000_000, help="skip cases whose universe holds more bars than this")
+    run.add_argument("--workers", type=int, default=8)
+    run.add_argument("--seed", type=int, default=7)
+    run.add_argument("--out", default="bench_output.json")
+    compare = sub.add_parser("compare", help="compare two result files")
+    compare.add_argument("before")
+    compare.add_argument("after")
+    compare.add_argument("--threshold", type=float, default=1.2, help="flag phases slower than this ratio")
+    compare.add_argument("--min-delta", type=float, default=0.01, help="ignore slowdowns smaller than this many seconds")
+    record = sub.add_parser("record", help="record live bars into a fixture for offline replay")
+    record.add_argument("--nse", type=_csv(str), default=["RELIANCE.NS", "HDFCBANK.NS", "TCS.NS", "INFY.NS", "SBIN.NS", "ITC.NS", "^NSEI"])
+    record.add_argument("--crypto", type=_csv(str), default=["BTC-USD", "ETH-USD", "SOL-USD", "XRP-USD", "DOGE-USD"])
+    record.add_argument("--out", default="fixture.pkl")
+    args = parser.parse_args(argv)
+    unknown = set(getattr(args, "bench", None) or []) - set(BENCHES) - {"page_build"}
+    if unknown: parser.error(f"unknown bench: {','.join(sorted(unknown))}")
+    try: return {"run": cmd_run, "compare": cmd_compare, "record": cmd_record}[args.cmd](args) or 0
+    finally: shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""Per-symbol daily features that hold for a whole session, built once and joined to live prices.
+
+Previous close, the close before it, the colours of the last three completed candles and the current
+same-colour streak cannot change until the next session begins: 00:00 IST for NSE listings and
+00:00 UTC for crypto. DailyFeatures builds them once per session from the daily panel as columnar
+arrays indexed by symbol. After that, gainers, losers and 3-day trend continuity need only the
+forming daily bar (LTP and session open), which the quote refresh already keeps warm. Before a
+session's bar exists (NSE pre-market), the last completed session is the current one, exactly as in
+strategies.scan_daily_movers.
+"""
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from bar_panel import as_panel, as_price
+from bar_store import from_epoch
+from scheduler import IST
+
+MAX_STREAK = 10  # the daily panel is 10 sessions deep
+
+
+def session_key(now=None):
+    """(NSE session date, crypto session date): features are rebuilt when either rolls over."""
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    return now.astimezone(IST).date(), now.astimezone(datetime.timezone.utc).date()
+
+
+def _days(ts, tzs):
+    """Local calendar day number of each epoch second, in its own symbol's exchange timezone."""
+    out, tzs = np.empty(len(tzs), dtype=np.int64), np.asarray(tzs, dtype=object)
+    for tz in set(tzs.tolist()):
+        pick = tzs == tz
+        idx = from_epoch(ts[pick], tz)
+        out[pick] = (idx.tz_localize(None) if tz else idx).as_unit("s").asi8 // 86400
+    return out
+
+
+def _colour(close, open_):
+    return np.sign(close - open_).astype(np.int8)
+
+
+class DailyFeatures:
+    """Columnar table, one row per symbol: prev close, close before it, last 3 candle colours (+1 / -1 / 0), signed streak."""
+
+    def __init__(self, symbols, tz, today, prev_close, close_2, colours, streak, completed, key=None):
+        self.symbols, self.tz, self.today, self.key = symbols, tz, today, key
+        self.prev_close, self.close_2, self.colours, self.streak, self.completed = prev_close, close_2, colours, streak, completed
+        self.row = {sym: i for i, sym in enumerate(symbols)}
+
+    def __len__(self):
+        return len(self.symbols)
+
+    @classmethod
+    def build(cls, bars, symbols=None, now=None, key=None):
+        """Daily panel -> features of each symbol's completed sessions (today's forming bar, if any, is left out)."""
+        bars = as_panel(bars)
+        rows = np.array([bars.row[s] for s in (bars.symbols if symbols is None else symbols) if s in bars.row], dtype=np.int64)
+        rows = rows[bars.offsets[rows + 1] > bars.offsets[rows]]
+        symbols, start, stop = [bars.symbols[i] for i in rows], bars.offsets[rows], bars.offsets[rows + 1]
+        tz = [bars.tz[i] for i in rows]
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        today = _days(np.full(len(rows), int(now.timestamp()), dtype=np.int64), tz)
+        done = stop - (_days(bars.ts[stop - 1], tz) >= today) if len(rows) else stop
+        n = done - start
+        close, colour = bars.columns["Close"], _colour(bars.columns["Close"], bars.columns["Open"])
+
+        def back(col, k, fill):
+            return np.where(n >= k, col[np.maximum(done - k, 0)], fill)
+        colours = np.stack([back(colour, k, 0) for k in (1, 2, 3)], axis=1).astype(np.int8).reshape(len(rows), 3)
+        last, streak, run = colours[:, 0], np.zeros(len(rows), dtype=np.int16), np.ones(len(rows), dtype=bool)
+        for k in range(1, MAX_STREAK + 1):
+            run &= (n >= k) & (back(colour, k, 0) == last) & (last != 0)
+            streak += run
+        return cls(symbols, tz, today, back(close, 1, np.nan).astype(np.float64), back(close, 2, np.nan).astype(np.float64),
+                   colours, streak * last, n, key=key or session_key(now))
+
+    def extend(self, other):
+        """-> a new table with other's rows for symbols this one lacks (tables are shared, never mutated)."""
+        rows = [other.row[s] for s in other.symbols if s not in self.row]
+        return DailyFeatures(self.symbols + [other.symbols[i] for i in rows], self.tz + [other.tz[i] for i in rows],
+                             *(np.concatenate([mine, theirs[rows]]) for mine, theirs in
+                               ((self.today, other.today), (self.prev_close, other.prev_close), (self.close_2, other.close_2),
+                                (self.colours, other.colours), (self.streak, other.streak), (self.completed, other.completed))), key=self.key)
+
+    def frame(self):
+        return pd.DataFrame({"Prev Close": self.prev_close, "Close -2": self.close_2, "Colour -1": self.colours[:, 0],
+                             "Colour -2": self.colours[:, 1], "Colour -3": self.colours[:, 2], "Streak": self.streak, "Sessions": self.completed},
+                            index=pd.Index(self.symbols, name="Symbol"))
+
+    def movers(self, live, symbols, top=5):
+        """live: daily panel whose last bar is the forming one -> (gainers, losers, 3-day trends), as scan_daily_movers."""
+        live = as_panel(live)
+        symbols = [s for s in symbols if s in self.row and s in live.row]
+        fi, li = np.array([self.row[s] for s in symbols], dtype=np.int64), np.array([live.row[s] for s in symbols], dtype=np.int64)
+        keep = live.offsets[li + 1] > live.offsets[li]
+        symbols, fi, li = [s for s, k in zip(symbols, keep.tolist()) if k], fi[keep], li[keep]
+        if not symbols: return [], [], []
+        last = live.offsets[li + 1] - 1
+        opened = _days(live.ts[last], [live.tz[i] for i in li]) >= self.today[fi]
+        ltp, session_open = live.columns["Close"][last].astype(np.float64), live.columns["Open"][last]
+        prev_close, colours = self.prev_close[fi], self.colours[fi]
+        c1 = np.where(opened, ltp, prev_close)
+        c2 = np.where(opened, prev_close, self.close_2[fi])
+        today = np.where(opened, _colour(live.columns["Close"][last], session_open), colours[:, 0])
+        before = np.where(opened[:, None], colours[:, :2], colours[:, 1:])
+        usable = (self.completed[fi] >= np.where(opened, 2, 3)) & (c2 != 0) & ~np.isnan(c1)
+        with np.errstate(divide="ignore", invalid="ignore"): pct = ((c1 - c2) / c2) * 100
+        gainers, losers, trends = [], [], []
+        for sym, ok, price, change, t, (b1, b2) in zip(symbols, usable.tolist(), c1.tolist(), pct.tolist(), today.tolist(), before.tolist()):
+            if not ok: continue
+            obj = {"Stock": sym, "LTP": as_price(price), "Pct": round(change, 2)}
+            if change > 0: gainers.append(obj)
+            elif change < 0: losers.append(obj)
+            if t == b1 == b2 == 1: trends.append({"Stock": sym, "Status": "৩ দিন উত্থান", "Color": "green"})
+            elif t == b1 == b2 == -1: trends.append({"Stock": sym, "Status": "৩ দিন পতন", "Color": "red"})
+        return sorted(gainers, key=lambda x: x['Pct'], reverse=True)[:top], sorted(losers, key=lambda x: x['Pct'])[:top], trends
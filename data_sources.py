@@ -0,0 +1,119 @@
+"""Offline OHLCV sources: a seeded synthetic generator and replay of recorded fixture bars.
+
+Both have market_data.download_chunk's signature, source(symbols, period, interval, start=None)
+-> {symbol: DataFrame}, so they plug in with market_data.set_source() and exercise the real
+pipeline, BarStore and scanners without the network.
+"""
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from bar_store import period_days, trim_to_period
+from markets import NSE_OPEN_MINUTES, NSE_TZ, bars_per_day, interval_minutes, is_crypto
+
+
+def _session_days(end, first_day, crypto):
+    days = pd.date_range(first_day, end.normalize(), freq="D")
+    return days if crypto else days[days.dayofweek < 5]
+
+
+def bar_index(symbol, period, interval, end, start=None):
+    """Bar open times up to `end`: 24/7 UTC for crypto, 09:15-15:30 IST weekdays for NSE."""
+    crypto = is_crypto(symbol)
+    tz = "UTC" if crypto else NSE_TZ
+    end = end.tz_convert(tz)
+    mins = interval_minutes(interval)
+    if start is not None: first_day = pd.Timestamp(start).tz_convert(tz).normalize()
+    elif str(period).endswith("d"): first_day = end.normalize() - pd.Timedelta(days=period_days(period) * 2 + 7)
+    else: first_day = end.normalize() - pd.Timedelta(days=period_days(period))
+    days = _session_days(end, first_day, crypto)
+    if start is None and str(period).endswith("d"): days = days[-period_days(period):]
+    if mins >= 1440: idx = days
+    else:
+        first, count = (0, 1440 // mins) if crypto else (NSE_OPEN_MINUTES, bars_per_day(interval, crypto))
+        offsets = pd.to_timedelta(first + np.arange(count) * mins, unit="min")
+        local_days = days.tz_localize(None).values
+        idx = pd.DatetimeIndex((local_days[:, None] + offsets.values[None, :]).ravel()).tz_localize(tz)
+    idx = idx[idx <= end]
+    if start is not None: idx = idx[idx >= pd.Timestamp(start)]
+    return idx
+
+
+class SyntheticSource:
+    """Deterministic random-walk bars for any symbol.
+
+    Prices are generated backwards from a frozen `end`, so a symbol's last N bars are identical
+    whatever period (or incremental start) asked for them, and warm BarStore refreshes line up
+    with the cold download exactly like the real upstream.
+    """
+
+    def __init__(self, seed=7, end=None, daily_vol=0.02):
+        self.seed = seed
+        self.end = pd.Timestamp(end) if end is not None else pd.Timestamp.now(tz="UTC")
+        if self.end.tz is None: self.end = self.end.tz_localize("UTC")
+        self.daily_vol = daily_vol
+
+    def frame(self, symbol, period, interval, start=None):
+        idx = bar_index(symbol, period, interval, self.end, start)
+        n = len(idx)
+        if not n: return pd.DataFrame(columns=["Open", "High", "Low", "Close", "Volume"], index=idx)
+        crc = zlib.crc32(symbol.encode())
+        rng = np.random.default_rng([self.seed, crc, zlib.crc32(interval.encode())])
+        # draw row 0 belongs to the newest bar, so any request sees the same values for the same bar
+        draws = rng.standard_normal((n, 5))[::-1]
+        vol = self.daily_vol * np.sqrt(min(interval_minutes(interval), 1440) / 1440)
+        base = 10.0 + crc % 5000
+        steps = draws[:, 0] * vol
+        # close[-1] = base, close[t-1] = close[t] * exp(-r_t)
+        log_close = np.log(base) - np.concatenate([np.cumsum(steps[::-1][:-1])[::-1], [0.0]])
+        close = np.exp(log_close)
+        open_ = close * np.exp(draws[:, 1] * vol / 2)
+        high = np.maximum(open_, close) * np.exp(np.abs(draws[:, 2]) * vol / 2)
+        low = np.minimum(open_, close) * np.exp(-np.abs(draws[:, 3]) * vol / 2)
+        volume = np.round(np.exp(11 + draws[:, 4] * 0.6))
+        return pd.DataFrame({"Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume}, index=idx)
+
+    def __call__(self, symbols, period, interval, start=None):
+        frames = {sym: self.frame(sym, period, interval, start) for sym in symbols}
+        return {sym: df for sym, df in frames.items() if not df.empty}
+
+
+class FixtureSource:
+    """Replays bars recorded with record_fixture(), shifted by whole weeks so the newest bar is recent.
+
+    Symbols that were not recorded borrow a recorded symbol's bars (chosen by hash), which lets a
+    small fixture stand in for a universe of any size.
+    """
+
+    def __init__(self, path, now=None):
+        self.fixture = pd.read_pickle(path)  # {interval: {symbol: DataFrame}}
+        now = pd.Timestamp(now) if now is not None else pd.Timestamp.now(tz="UTC")
+        if now.tz is None: now = now.tz_localize("UTC")
+        self.frames = {}
+        for interval, frames in self.fixture.items():
+            last = max(df.index[-1].tz_convert("UTC") if df.index.tz is not None else df.index[-1].tz_localize("UTC")
+                       for df in frames.values())
+            shift = pd.Timedelta(days=7) * max(0, (now - last) // pd.Timedelta(days=7))
+            self.frames[interval] = {sym: df.set_axis(df.index + shift) for sym, df in frames.items()}
+
+    def __call__(self, symbols, period, interval, start=None):
+        recorded = self.frames.get(interval)
+        if not recorded: return {}
+        names = sorted(recorded)
+        out = {}
+        for sym in symbols:
+            df = recorded.get(sym)
+            if df is None: df = recorded[names[zlib.crc32(sym.encode()) % len(names)]]
+            df = df[df.index >= pd.Timestamp(start)] if start is not None else trim_to_period(df, period)
+            if not df.empty: out[sym] = df.copy()
+        return out
+
+
+def record_fixture(path, requests, source=None):
+    """Record {interval: (symbols, period)} from the live upstream (or `source`) into a fixture pickle."""
+    import market_data
+    fetch = source or market_data.download
+    fixture = {interval: fetch(list(symbols), period, interval) for interval, (symbols, period) in requests.items()}
+    pd.to_pickle(fixture, path)
+    return {interval: len(frames) for interval, frames in fixture.items()}
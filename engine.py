@@ -0,0 +1,291 @@
+"""Headless scanner engine: the terminal's fetch -> indicator -> signal pipeline without Streamlit, plus a CLI.
+
+    python engine.py exhaustion --watchlist "NIFTY BANK" --sentiment BULLISH --out signals.csv
+    python engine.py movers --market nse --out premarket.json          (9:10 / 9:15 pages)
+    python engine.py oi_proxy --market nse                              (9:20 page)
+    python engine.py backtest --market crypto --strategy ha_bb --period 3mo --trades
+
+Only the standard library and universe.py load at import; pandas, numpy, yfinance and the scanners
+built on them are imported on first use, so a scan reaches its first download in well under a second.
+Signals found by a scan are logged to the same journal as the terminal's (signal_log.py).
+"""
+import time
+
+# taken before the remaining imports so the start-up figure --timings prints includes them
+_STARTED = time.perf_counter()
+
+import argparse  # noqa: E402
+import csv  # noqa: E402
+import json  # noqa: E402
+import os  # noqa: E402
+import sys  # noqa: E402
+import threading  # noqa: E402
+
+import universe  # noqa: E402
+
+MARKETS = ("nse", "crypto")
+# live strategy -> (market, history window, bar interval)
+SIGNAL_BARS = {"exhaustion": ("nse", "5d", "5m"), "ha_bb": ("crypto", "15d", "1h")}
+LIQUID_TTL = 900  # seconds a liquidity pre-filter result stands
+QUOTE_TTL = 30  # seconds a quote stands; with a tick feed, symbols quiet this long are polled instead
+FEATURES_RETRY = 60  # seconds between re-downloads of symbols missing from the session's daily features
+SCANS = ("exhaustion", "ha_bb", "oi_proxy", "movers", "gainers", "backtest")
+BACKTESTS = ("reversal", "exhaustion", "ha_bb")
+
+
+def row_symbol(row):
+    return row.get("Stock") or row.get("Coin") or row.get("Symbol")
+
+
+def watchlist_filter(rows, watchlist=None, sentiment=None):
+    """Rows whose symbol is in the watchlist and, for live signals, whose side matches the sentiment."""
+    members = set(watchlist) if watchlist is not None else None
+    side = {"BULLISH": "BUY", "BEARISH": "SHORT"}.get(sentiment)
+    return [r for r in rows if (members is None or row_symbol(r) in members) and (side is None or r.get("Signal") == side)]
+
+
+class Engine:
+    """Scanner state for one process: bar store, shared cache, indicator and signal engines.
+
+    bars: optional replacement for Engine.fetch(symbols, period, interval, ttl) -> BarPanel; the
+    terminal passes its st.cache_resource'd get_bars so every page shares one panel per request.
+    stream: optional tick_stream.TickStream; bars and quotes its ring buffers are deep enough for are
+    read from them (each ring seeded once through fetch) instead of being downloaded.
+    """
+
+    def __init__(self, store=None, cache=None, executor=None, bars=None, log=None, stream=None):
+        self.store, self.cache, self.executor, self.stream = store, cache, executor, stream
+        self._bars, self._log = bars or self.fetch, log
+        self._indicators, self._signals, self._liquid, self._features, self._features_tried = {}, {}, {}, None, 0.0
+        self._lock, self._features_lock = threading.Lock(), threading.Lock()
+
+    # --- universes (re-read only when their file changes) ---
+    def universe(self, market):
+        return universe.load_universe(market)
+
+    def symbols(self, market=None):
+        if market is not None: return self.universe(market).symbols
+        return list(dict.fromkeys(s for m in MARKETS for s in self.universe(m).symbols))
+
+    # --- bars ---
+    def fetch(self, symbols, period, interval, ttl=60, max_age=None):
+        import market_data
+        from bar_panel import BarPanel
+        frames = market_data.fetch_bars(symbols, period=period, interval=interval, store=self.store,
+                                        max_age=ttl if max_age is None else max_age, cache=self.cache, ttl=ttl)
+        return BarPanel.from_frames(frames)
+
+    def bars(self, symbols, period, interval, ttl=60):
+        if self.stream is not None and self.stream.aggregator.covers(interval, period, symbols):
+            return self._streamed(symbols, period, interval, ttl).panel(symbols, interval, period)
+        return self._bars(symbols, period, interval, ttl=ttl)
+
+    def _streamed(self, symbols, period, interval, ttl):
+        ticks = self.stream.aggregator
+        missing = ticks.missing(symbols, interval, period)
+        if missing: ticks.seed(self.fetch(missing, period, interval, ttl=ttl), interval, period, missing)
+        return ticks
+
+    def daily_bars(self):
+        # one 10d daily panel for both markets: movers, trends and the liquidity filter all read it
+        return self.bars(self.symbols(), "10d", "1d", ttl=120)
+
+    def quotes(self, symbols, max_age=QUOTE_TTL):
+        import market_data
+        if self.stream is None: return market_data.fetch_quotes(symbols, store=self.store, max_age=max_age, cache=self.cache, ttl=QUOTE_TTL)
+        ticks = self._streamed(symbols, "5d", "1d", QUOTE_TTL)
+        out = ticks.quotes(symbols, ttl=QUOTE_TTL)
+        # symbols the feed doesn't carry (or has gone quiet on) are polled; without an upstream bar they stay flagged stale
+        quiet = ticks.quiet(symbols, QUOTE_TTL)
+        if quiet:
+            bars = market_data.fetch_bars(quiet, period="5d", interval="1d", store=self.store, max_age=max_age, cache=self.cache, ttl=QUOTE_TTL)
+            out.update({sym: market_data.quote_from_bars(df) for sym, df in bars.items() if df is not None and not df.empty})
+        return out
+
+    def liquid(self, symbols):
+        """Liquidity pre-filter over the daily panel, recomputed every LIQUID_TTL seconds."""
+        from strategies import liquid_symbols
+        key, now = tuple(symbols), time.time()
+        hit = self._liquid.get(key)
+        if hit is None or now - hit[0] > LIQUID_TTL: hit = self._liquid[key] = (now, liquid_symbols(self.daily_bars(), symbols))
+        return hit[1]
+
+    # --- live signals ---
+    def indicators(self, interval):
+        with self._lock:
+            if interval not in self._indicators:
+                from streaming import IndicatorEngine
+                self._indicators[interval] = IndicatorEngine(interval, store=self.store)
+            return self._indicators[interval]
+
+    @property
+    def log(self):
+        with self._lock:
+            if self._log is None:
+                from signal_log import SignalLog
+                self._log = SignalLog()
+            return self._log
+
+    def signal_engine(self, strategy):
+        log = self.log
+        with self._lock:
+            if strategy not in self._signals:
+                from signal_log import SignalEngine
+                self._signals[strategy] = SignalEngine(strategy, log=log)
+            return self._signals[strategy]
+
+    def signals(self, strategy):
+        """Live signals over the strategy's liquid market universe, both sentiments, logged to the journal."""
+        market, period, interval = SIGNAL_BARS[strategy]
+        bars = self.bars(self.liquid(self.symbols(market)), period, interval)
+        return self.signal_engine(strategy).run(bars, self.indicators(interval).update(bars, executor=self.executor))
+
+    def refresh_signals(self, strategy, ttl=60):
+        """Background refresh from the store (or the tick buffers): fold new candles, log new signals, walk open ones to their exits."""
+        market, period, interval = SIGNAL_BARS[strategy]
+        symbols = self.liquid(self.symbols(market))
+        bars = self.bars(symbols, period, interval, ttl) if self.stream is not None else self.fetch(symbols, period, interval, ttl=ttl, max_age=30)
+        engine = self.signal_engine(strategy)
+        engine.run(bars, self.indicators(interval).update(bars, executor=self.executor))
+        return engine.track(bars)
+
+    # --- other scans ---
+    def oi_proxy(self):
+        from strategies import scan_oi_proxy
+        return scan_oi_proxy(self.bars(self.symbols(), "2d", "15m"))
+
+    def _build_features(self, symbols, key):
+        from daily_features import DailyFeatures
+        # uncached: a daily panel cached just before a rollover still has the old session as its forming bar
+        bars = self.fetch(symbols, "10d", "1d", ttl=0)
+        return DailyFeatures.build(bars, [s for s in symbols if s not in bars.stale], key=key)
+
+    def daily_features(self, symbols=None):
+        """Session-fixed daily features, built once per NSE / crypto session day. Symbols missing from
+        the table (failed or stale downloads) are fetched again, at most every FEATURES_RETRY seconds."""
+        from daily_features import session_key
+        key = session_key()
+        with self._features_lock:  # the first caller of a session builds, everyone else waits for it
+            if self._features is None or self._features.key != key:
+                self._features, self._features_tried = self._build_features(self.symbols(), key), time.time()
+            features = self._features
+            missing = [s for s in (self.symbols() if symbols is None else symbols) if s not in features.row]
+            if missing and time.time() - self._features_tried >= FEATURES_RETRY:
+                self._features_tried = time.time()
+                features = self._features = features.extend(self._build_features(missing, key))
+        return features
+
+    @property
+    def built_features(self):
+        """The current daily features table, or None; never starts a build."""
+        return self._features
+
+    def daily_movers(self, symbols):
+        """(gainers, losers, 3-day trends) among symbols: precomputed daily features + the forming daily bar only."""
+        return self.daily_features(symbols).movers(self.bars(symbols, "5d", "1d", ttl=30), symbols)
+
+    def snapshot(self, symbols):
+        from market_snapshot import MarketSnapshot
+        return MarketSnapshot.from_quotes(self.quotes(symbols))
+
+    def backtest(self, symbols, period, strategy="reversal", **options):
+        """-> (per-symbol summary, trades) for the daily 3-day reversal or a walk-forward replay."""
+        import walkforward
+        bars = self.bars(symbols, period, "1d" if strategy == "reversal" else walkforward.STRATEGIES[strategy][0])
+        executor = self.executor if len(bars) > 1 else None
+        if strategy == "reversal":
+            import backtest
+            return backtest.run_universe(bars, executor=executor)
+        return walkforward.run_walkforward(bars, strategy, executor=executor, **options)
+
+
+# --- CLI ---
+def _rows(eng, args):
+    if args.scan in SIGNAL_BARS:
+        market = SIGNAL_BARS[args.scan][0]
+        watch = eng.universe(market).watchlists[args.watchlist] if args.watchlist else None
+        return watchlist_filter(eng.signals(args.scan), watch, args.sentiment if args.scan == "exhaustion" else None)
+    symbols = eng.universe(args.market).watchlists[args.watchlist] if args.watchlist else eng.symbols(args.market)
+    if args.scan == "oi_proxy": return watchlist_filter(eng.oi_proxy(), symbols)
+    if args.scan == "movers": return eng.snapshot(symbols).movers(symbols, threshold=args.threshold)
+    if args.scan == "gainers":
+        gainers, losers, trends = eng.daily_movers(symbols)
+        return [{"List": name, **row} for name, rows in (("gainers", gainers), ("losers", losers), ("trends", trends)) for row in rows]
+    options = {"sentiment": args.sentiment or "BULLISH"} if args.strategy == "exhaustion" else {}
+    summary, trades = eng.backtest(symbols, args.period, args.strategy, **options)
+    table = trades if args.trades else summary
+    return table.astype(object).where(table.notna(), None).to_dict("records")  # NaN is not JSON
+
+
+def write_rows(rows, out, fmt):
+    fh = sys.stdout if out == "-" else open(out, "w", newline="", encoding="utf-8")
+    try:
+        if fmt == "json": json.dump(rows, fh, indent=1, default=str, ensure_ascii=False); fh.write("\n")
+        else:
+            fields = list(dict.fromkeys(k for row in rows for k in row))
+            writer = csv.DictWriter(fh, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(rows)
+    finally:
+        if fh is not sys.stdout: fh.close()
+
+
+def make_source(name):
+    """'yahoo' (live), 'synthetic' or a fixture pickle recorded with benchmark.py record."""
+    if name == "yahoo": return None
+    import data_sources
+    return data_sources.SyntheticSource() if name == "synthetic" else data_sources.FixtureSource(name)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("scan", choices=SCANS)
+    parser.add_argument("--market", choices=MARKETS, default="nse", help="universe for oi_proxy / movers / gainers / backtest")
+    parser.add_argument("--watchlist", help="restrict the output to one watchlist of the universe file")
+    parser.add_argument("--sentiment", choices=["BULLISH", "BEARISH"], help="exhaustion: keep one side only")
+    parser.add_argument("--threshold", type=float, default=2.0, help="movers: minimum |%% move|")
+    parser.add_argument("--strategy", choices=BACKTESTS, default="reversal", help="backtest strategy")
+    parser.add_argument("--period", default="1y", help="backtest history")
+    parser.add_argument("--trades", action="store_true", help="backtest: every trade instead of the per-symbol summary")
+    parser.add_argument("--out", default="-", help="output file (default stdout)")
+    parser.add_argument("--format", choices=["json", "csv"], help="default: from --out's extension, else json")
+    parser.add_argument("--source", default="yahoo", help="'yahoo', 'synthetic' or a fixture pickle")
+    parser.add_argument("--timings", action="store_true", help="print start-up and scan seconds to stderr")
+    args = parser.parse_args(argv)
+    if args.watchlist and args.watchlist not in universe.load_universe(SIGNAL_BARS[args.scan][0] if args.scan in SIGNAL_BARS else args.market).watchlists:
+        parser.error(f"unknown watchlist: {args.watchlist}")
+
+    import bar_store
+    import market_data
+    import shared_cache
+    source, work = make_source(args.source), None
+    if source is None: store, cache, log = bar_store.BarStore(), shared_cache.SharedCache(), None
+    else:
+        # offline bars carry real tickers: keep them and their signals out of the terminal's store, cache and journal
+        import tempfile
+        from signal_log import SignalLog
+        market_data.set_source(source)
+        work = tempfile.mkdtemp(prefix="haridas-engine-")
+        store, cache = bar_store.BarStore(os.path.join(work, "bars.sqlite")), shared_cache.SharedCache(os.path.join(work, "shared_cache.sqlite"))
+        log = SignalLog(os.path.join(work, "signals.sqlite"))
+    pool = None
+    if args.scan == "backtest":
+        import backtest
+        if backtest.DEFAULT_WORKERS > 1: pool = backtest.make_pool()
+    eng = Engine(store=store, cache=cache, executor=pool, log=log)
+    ready = time.perf_counter()
+    try: rows = _rows(eng, args)
+    finally:
+        if pool is not None: pool.shutdown()
+        if work is not None:
+            import shutil
+            shutil.rmtree(work, ignore_errors=True)
+    done = time.perf_counter()
+    write_rows(rows, args.out, args.format or ("csv" if args.out.endswith(".csv") else "json"))
+    if args.timings:
+        print(f"start-up {ready - _STARTED:.3f}s (imports + store, before the first download), scan {done - ready:.3f}s, {len(rows)} rows", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""Asyncio fetch pipeline: global concurrency cap, token-bucket rate limit, jittered backoff, circuit breaker."""
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+
+
+class TokenBucket:
+    """Thread-safe token bucket; callers reserve a token and sleep (asynchronously) until it is due."""
+
+    def __init__(self, rate, capacity):
+        self.rate, self.capacity = float(rate), float(capacity)
+        self.tokens = float(capacity)
+        self.stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.stamp) * self.rate)
+            self.stamp = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    async def acquire(self):
+        wait = self.reserve()
+        if wait > 0: await asyncio.sleep(wait)
+
+
+class CircuitBreaker:
+    """closed -> open after `threshold` consecutive failures; half-open probe after `reset_seconds`.
+
+    Half-open admits one caller at a time until its record() closes or reopens the breaker; a probe
+    that never records (cancelled at a deadline) is given up after another `reset_seconds`.
+    """
+
+    def __init__(self, threshold=5, reset_seconds=60):
+        self.threshold, self.reset_seconds = threshold, reset_seconds
+        self.failures = 0
+        self.opened_at = self.probe_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None: return "closed"
+        return "half-open" if time.monotonic() - self.opened_at >= self.reset_seconds else "open"
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state != "half-open": return state == "closed"
+            now = time.monotonic()
+            if self.probe_at is not None and now - self.probe_at < self.reset_seconds: return False
+            self.probe_at = now
+            return True
+
+    def record(self, ok):
+        with self._lock:
+            self.probe_at = None
+            if ok: self.failures, self.opened_at = 0, None
+            else:
+                self.failures += 1
+                if self.failures >= self.threshold or self.opened_at is not None: self.opened_at = time.monotonic()
+
+
+class FetchPipeline:
+    """Runs blocking chunk fetches concurrently on an event loop within global limits.
+
+    fetch(chunk) must return {symbol: value}; an empty result counts as a failed (throttled) attempt.
+    Fetches run on the pipeline's own worker pool, shared by every thread using the pipeline, so
+    concurrent Streamlit sessions and the background scheduler together never exceed
+    `max_concurrency` in-flight requests, and a deadline never waits on a hung worker.
+    """
+
+    def __init__(self, max_concurrency=8, rate=4.0, burst=8, retries=3, base_delay=0.5, max_delay=8.0,
+                 deadline_seconds=30.0, breaker_threshold=5, breaker_reset_seconds=60):
+        self.bucket = TokenBucket(rate, burst)
+        self.retries, self.base_delay, self.max_delay = retries, base_delay, max_delay
+        self.deadline_seconds = deadline_seconds
+        self.breaker_threshold, self.breaker_reset_seconds = breaker_threshold, breaker_reset_seconds
+        self.breakers = {}
+        self._workers = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="haridas-fetch")
+        self._lock = threading.Lock()
+
+    def breaker(self, host):
+        with self._lock:
+            if host not in self.breakers: self.breakers[host] = CircuitBreaker(self.breaker_threshold, self.breaker_reset_seconds)
+            return self.breakers[host]
+
+    def backoff(self, attempt):
+        # "full jitter": uniform over [0, capped exponential]
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    async def _run_chunk(self, host, fetch, chunk, deadline):
+        breaker = self.breaker(host)
+        for attempt in range(self.retries + 1):
+            if not breaker.allow():
+                metrics.REGISTRY.inc("haridas_fetch_attempts_total", host=host, result="breaker_open")
+                return {}
+            if time.monotonic() >= deadline: return {}
+            await self.bucket.acquire()
+            try: result = await asyncio.get_running_loop().run_in_executor(self._workers, fetch, chunk)
+            except Exception: result = {}
+            breaker.record(bool(result))
+            metrics.REGISTRY.inc("haridas_fetch_attempts_total", help_text="Chunk fetch attempts by outcome", host=host, result="ok" if result else "fail")
+            metrics.REGISTRY.set("haridas_breaker_open", breaker.state == "open", help_text="1 while the host circuit breaker is open", host=host)
+            if result: return result
+            if attempt < self.retries: await asyncio.sleep(min(self.backoff(attempt), max(0.0, deadline - time.monotonic())))
+        return {}
+
+    async def _gather(self, host, fetch, chunks):
+        deadline = time.monotonic() + self.deadline_seconds
+        tasks = [asyncio.ensure_future(self._run_chunk(host, fetch, chunk, deadline)) for chunk in chunks]
+        done, pending = await asyncio.wait(tasks, timeout=self.deadline_seconds) if tasks else (set(), set())
+        for task in pending: task.cancel()
+        results = {}
+        for task in done:
+            if not task.cancelled() and task.exception() is None: results.update(task.result())
+        return results
+
+    def run(self, host, fetch, chunks):
+        """Fetch all chunks, returning whatever succeeded before the deadline -> {symbol: value}."""
+        return asyncio.run(self._gather(host, fetch, list(chunks)))
+
+    def status(self):
+        with self._lock: return {host: {"state": b.state, "failures": b.failures} for host, b in self.breakers.items()}
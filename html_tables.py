@@ -0,0 +1,118 @@
+"""Dashboard panel markup, generated in one pass and memoized by the content of its rows.
+
+Each Panel turns rows into HTML with one join over per-row fragments. A fragment is cached under
+its row's values, and the finished markup under the whole row tuple, so a rerun whose rows have
+not changed costs one dict lookup. The same rows always give byte-identical markup. Streamlit
+hashes every element it sends, and once the browser holds a large element (see
+global.minCachedMessageSize), resending it costs only a hash reference. Styling lives in the
+terminal's CSS classes rather than inline styles, so a table that does change ships far fewer bytes.
+"""
+import html
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+import metrics
+from strategies import fmt_ts
+
+
+def fmt_price(val):
+    if pd.isna(val): return "0.00"
+    if val < 0.01: return f"{val:.6f}"
+    elif val < 1: return f"{val:.4f}"
+    else: return f"{val:,.2f}"
+
+
+def _row_key(row):
+    # every row of a panel has the same fields, so the values alone identify it
+    return tuple(row.values()) if isinstance(row, dict) else tuple(row)
+
+
+class Panel:
+    """rows -> open + row(row, *context) for each row + footer + close, memoized per distinct rows."""
+
+    def __init__(self, name, open_html, row, close_html="</table></div>", max_rows=4096, max_tables=64):
+        self.name, self.open_html, self.row, self.close_html = name, open_html, row, close_html
+        self.max_rows, self.max_tables = max_rows, max_tables
+        self.rows, self.tables = OrderedDict(), OrderedDict()
+        self._lock = threading.Lock()
+
+    def render(self, rows, *context, footer=""):
+        keys = tuple(map(_row_key, rows))
+        key = (keys, context, footer)
+        with self._lock:
+            markup = self.tables.get(key)
+            hit = markup is not None
+            if hit: self.tables.move_to_end(key)
+            else:
+                markup = self.open_html + "".join([self._fragment(r, (k, context)) for r, k in zip(rows, keys)]) + footer + self.close_html
+                self.tables[key] = markup
+                if len(self.tables) > self.max_tables: self.tables.popitem(last=False)
+        metrics.cache_result("html", self.name, "hit" if hit else "miss")
+        if not hit: metrics.REGISTRY.inc("haridas_html_bytes_total", len(markup), help_text="Panel markup generated (cache misses only)", panel=self.name)
+        return markup
+
+    def _fragment(self, row, key):
+        html = self.rows.get(key)
+        if html is None:
+            html = self.rows[key] = self.row(row, *key[1])
+            if len(self.rows) > self.max_rows: self.rows.popitem(last=False)
+        else: self.rows.move_to_end(key)
+        return html
+
+    def clear(self):
+        with self._lock: self.rows.clear(); self.tables.clear()
+
+
+def table(name, headers, row):
+    """headers: titles, or whole <th ...> cells where a column needs attributes."""
+    return Panel(name, "<div class='table-container'><table class='v38-table'><tr>" + "".join(h if h.startswith("<th") else f"<th>{h}</th>" for h in headers) + "</tr>", row)
+
+
+def _side(signal):
+    return "up" if signal == "BUY" else "dn"
+
+
+def _sign(pct):
+    return "up" if pct >= 0 else "dn"
+
+
+def _index_box(name, val, chg, pct, stale, currency):
+    sign, prefix = "+" if chg >= 0 else "", "₹" if name == "USDINR" else currency
+    return (f"<div class='idx-box'><span class='idx-name'>{name}{' ⚠️' if stale else ''}</span><br><span class='idx-val'>{prefix}{fmt_price(val)}</span><br>"
+            f"<span class='idx-chg {_sign(chg)}'>{sign}{fmt_price(chg)} ({sign}{pct:.2f}%)</span></div>")
+
+
+def _news_cell(related):
+    if not related: return "<td class='flat'>-</td>"
+    title, link, source, _ = related[0]
+    short = title if len(title) <= 60 else title[:57] + "..."
+    return f"<td class='news'><a href='{html.escape(link)}' target='_blank' title='{html.escape(source)}: {html.escape(title)}'>{html.escape(short)}</a></td>"
+
+
+def _journal_row(t):
+    clr = "up" if t.pnl > 0 else ("dn" if t.pnl < 0 else "flat")
+    return (f"<tr><td class='b'>{t.symbol}</td><td>{t.signal}</td><td>{fmt_price(t.fill)}</td><td>{fmt_price(t.exit)}</td><td>{t.outcome}</td>"
+            f"<td>{t.r:.2f}</td><td class='{clr}'>{t.pnl:.2f}%</td><td>{fmt_ts(t.exit_ts, t.tz or None, '%d %b, %H:%M')}</td></tr>")
+
+
+INDICES = Panel("indices", "<div class='idx-container'>", lambda r, currency: _index_box(*r, currency), "</div>")
+SECTORS = table("sectors", ["Category", "Avg %", "<th style='width:40%;'>Trend</th>"], lambda s: (
+    f"<tr><td class='sym'>{s['Sector']}</td><td class='{_sign(s['Pct'])}'>{s['Pct']}%</td>"
+    f"<td class='bar-cell'><div class='bar-bg'><div class='bar-fg-{'green' if s['Pct'] >= 0 else 'red'}' style='width:{s['Width']}%;'></div></div></td></tr>"))
+TRENDS = table("trends", ["Asset", "Status"], lambda t: f"<tr><td class='sym'>{t['Stock']}</td><td class='{t['Color']}'>{t['Status']}</td></tr>")
+SIGNALS = table("signals", ["Stock", "Entry", "LTP", "Signal", "SL", "T1(1:2)", "T2(1:3)", "EMA 10", "Time", "News"], lambda s: (
+    f"<tr><td class='{_side(s['Signal'])}'>{s['Stock']}</td><td>{fmt_price(s['Entry'])}</td><td>{fmt_price(s['LTP'])}</td>"
+    f"<td class='tag-{_side(s['Signal'])}'>{s['Signal']}</td><td>{fmt_price(s['SL'])}</td><td class='b'>{fmt_price(s['T1'])}</td>"
+    f"<td class='b'>{fmt_price(s['T2(1:3)'])}</td><td class='blue'>{fmt_price(s['EMA_10'])}</td><td>{s['Time']}</td>{_news_cell(s.get('News'))}</tr>"))
+CRYPTO_SIGNALS = table("crypto_signals", ["Coin", "Entry (Norm)", "LTP", "Signal", "SL (Norm)", "Target (BB)", "Target (1:3)", "Alert Time", "News"], lambda s: (
+    f"<tr><td class='{_side(s['Signal'])}'>{s['Coin']}</td><td>${fmt_price(s['Entry'])}</td><td>${fmt_price(s['LTP'])}</td>"
+    f"<td class='tag-{_side(s['Signal'])}'>{s['Signal']}</td><td>${fmt_price(s['SL'])}</td><td class='blue'>${fmt_price(s['Target(BB)'])}</td>"
+    f"<td class='gold'>${fmt_price(s['Target(1:3)'])}</td><td>{s['Time']}</td>{_news_cell(s.get('News'))}</tr>"))
+GAINERS = table("gainers", ["Asset", "LTP", "%"], lambda g, currency: f"<tr><td class='sym'>{g['Stock']}</td><td>{currency}{fmt_price(g['LTP'])}</td><td class='up'>+{g['Pct']}%</td></tr>")
+LOSERS = table("losers", ["Asset", "LTP", "%"], lambda l, currency: f"<tr><td class='sym'>{l['Stock']}</td><td>{currency}{fmt_price(l['LTP'])}</td><td class='dn'>{l['Pct']}%</td></tr>")
+JOURNAL = table("journal", ["Symbol", "Signal", "Entry", "Exit", "Outcome", "R", "P&L %", "Closed"], _journal_row)
+MOVERS = table("movers", ["Stock / Coin", "LTP", "Movement %"], lambda m: (
+    f"<tr><td class='b'>{m['Stock']}{' ⚠️' if m['Stale'] else ''}</td><td>{fmt_price(m['LTP'])}</td><td class='{'up' if m['Pct'] > 0 else 'dn'}'>{m['Pct']}%</td></tr>"))
+OI = table("oi", ["Asset", "Market Action (Signal)", "OI / Vol Status"], lambda o: f"<tr><td class='b'>{o['Stock']}</td><td class='{o['Color']}'>{o['Signal']}</td><td class='blue'>{o['OI']}</td></tr>")
@@ -0,0 +1,52 @@
+"""Vectorized indicators over (bars × symbols) price panels."""
+import numpy as np
+import pandas as pd
+
+from bar_panel import as_panel
+
+OHLC = ["Open", "High", "Low", "Close"]
+
+
+def stack_panel(frames, symbols=None, fields=OHLC, length=None):
+    """Right-align each symbol's last `length` bars into 2-D (bars × symbols) arrays.
+
+    Row -1 is every symbol's own latest bar, so "last closed candle" is row -2 for all columns
+    even when listings have different history lengths. Shorter histories are NaN-padded on top.
+    Returns (symbols, bar_counts, {field: ndarray}).
+    """
+    bars = as_panel(frames)
+    symbols = [s for s in (symbols or bars) if s in bars]
+    views = [bars[s] for s in symbols]
+    counts = np.array([len(v) for v in views], dtype=np.int64)
+    rows = int(length or (counts.max() if len(counts) else 0))
+    panel = {f: np.full((rows, len(symbols)), np.nan) for f in fields}
+    for j, view in enumerate(views):
+        for f in fields:
+            col = view[f][-rows:] if rows else view[f][:0]
+            panel[f][rows - len(col):, j] = col
+    return symbols, np.minimum(counts, rows), panel
+
+
+def heikin_ashi(o, h, l, c):
+    """HA candles for every column at once.
+
+    HA_Open[i] = (HA_Open[i-1] + HA_Close[i-1]) / 2 seeded with the first real Open, which is an
+    alpha=0.5 EMA of HA_Close shifted one bar, evaluated by pandas' C ewm over all columns together.
+    """
+    ha_close = (o + h + l + c) / 4
+    seed = np.vstack([np.full((1, o.shape[1]), np.nan), ha_close[:-1]])
+    first = np.argmax(~np.isnan(o), axis=0)
+    cols = np.arange(o.shape[1])
+    seed[first, cols] = o[first, cols]
+    ha_open = pd.DataFrame(seed).ewm(alpha=0.5, adjust=False).mean().to_numpy()
+    ha_open = np.where(np.isnan(ha_close), np.nan, ha_open)
+    ha_high = np.maximum.reduce([h, ha_open, ha_close])
+    ha_low = np.minimum.reduce([l, ha_open, ha_close])
+    return ha_open, ha_high, ha_low, ha_close
+
+
+def bollinger(close, window=20, num_std=2.0):
+    """(sma, upper, lower) per column; sample std like pandas rolling().std()."""
+    roll = pd.DataFrame(close).rolling(window=window)
+    sma, std = roll.mean().to_numpy(), roll.std().to_numpy()
+    return sma, sma + num_std * std, sma - num_std * std
@@ -0,0 +1,154 @@
+"""Batched OHLCV fetch layer shared by every scanner in the terminal.
+
+yfinance and curl_cffi are imported on the first real download, not at import time, so headless
+scans (engine.py) and offline sources start without paying for them.
+"""
+import functools
+from urllib.parse import urlparse
+
+import pandas as pd
+
+import metrics
+import resample
+from fetch_pipeline import FetchPipeline
+
+CHUNK_SIZE = 25
+UPSTREAM_HOST = "query2.finance.yahoo.com"
+PIPELINE = FetchPipeline()
+
+
+@functools.lru_cache(maxsize=None)
+def _counting_session():
+    # yfinance accepts a curl_cffi session; subclass it to count upstream requests and response bytes
+    try: from curl_cffi import requests as cffi_requests
+    except ImportError: return None
+
+    class CountingSession(cffi_requests.Session):
+        def request(self, method, url, *args, **kwargs):
+            host = urlparse(str(url)).hostname or UPSTREAM_HOST
+            try: resp = super().request(method, url, *args, **kwargs)
+            except Exception:
+                metrics.upstream(host, errors=1)
+                raise
+            metrics.upstream(host, nbytes=len(resp.content or b""), errors=int(resp.status_code >= 400))
+            return resp
+
+    try: return CountingSession(impersonate="chrome")
+    except Exception: return None
+
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _split_frame(raw, symbols):
+    # yf.download(group_by="ticker") -> one (ticker, field) column block per symbol
+    frames = {}
+    if raw is None or raw.empty: return frames
+    tickers = set(raw.columns.get_level_values(0)) if isinstance(raw.columns, pd.MultiIndex) else set()
+    for sym in symbols:
+        if sym in tickers: df = raw[sym]
+        elif not tickers and len(symbols) == 1: df = raw
+        else: continue
+        df = df[[c for c in OHLCV_COLUMNS if c in df.columns]].dropna(subset=["Close"])
+        if not df.empty: frames[sym] = df
+    return frames
+
+
+def download_chunk(symbols, period, interval, start=None):
+    # threads=False: concurrency is capped by the pipeline, not by yfinance's own pool
+    import yfinance as yf
+    window = {"start": start} if start is not None else {"period": period}
+    session = _counting_session()
+    if session is not None: window["session"] = session
+    raw = yf.download(list(symbols), interval=interval, group_by="ticker",
+                      auto_adjust=True, threads=False, progress=False, **window)
+    return _split_frame(raw, list(symbols))
+
+
+_source = download_chunk
+
+
+def set_source(source=None):
+    """Swap the upstream fetcher, source(symbols, period, interval, start=None) -> {symbol: DataFrame}.
+
+    Used to replay recorded or synthetic bars offline (see data_sources.py); None restores yfinance.
+    """
+    global _source
+    _source = source or download_chunk
+
+
+def download(symbols, period, interval, start=None):
+    chunks = list(_chunks(list(symbols), CHUNK_SIZE))
+    return PIPELINE.run(UPSTREAM_HOST, lambda chunk: _source(chunk, period, interval, start), chunks)
+
+
+def mark_stale(df):
+    """Flag a frame served from the last good copy because its refresh failed upstream."""
+    df = df.copy()
+    df.attrs["stale"] = True
+    return df
+
+
+def is_stale(df):
+    return bool(df is not None and df.attrs.get("stale"))
+
+
+def fetch_bars(symbols, period="5d", interval="1d", store=None, max_age=0, cache=None, ttl=60):
+    """Fetch bars for many symbols in CHUNK_SIZE bulk requests -> {symbol: DataFrame}.
+
+    With a bar_store.BarStore only bars newer than the last stored one go over the network. With a
+    shared_cache.SharedCache each (symbol, interval, period) is fetched once per ttl across sessions
+    and processes, whatever watchlist it was requested in. NSE and crypto requests that their asset
+    class's fine series covers are resampled from it instead of downloaded again (see resample.py).
+    """
+    symbols = list(dict.fromkeys(symbols))
+    groups = {}
+    for sym in symbols: groups.setdefault(resample.source_request(sym, period, interval), []).append(sym)
+    frames = {}
+    for source, syms in groups.items():
+        frames.update(resample.derive(_fetch_bars(syms, *source, store, max_age, cache, ttl), (period, interval), source))
+    return frames
+
+
+def _fetch_bars(symbols, period, interval, store, max_age, cache, ttl):
+    def load(syms):
+        if store is not None: return store.load(syms, period, interval, download, max_age=max_age)
+        return download(syms, period, interval)
+
+    if cache is None: return load(symbols)
+    key_of = {sym: f"bars|{interval}|{period}|{sym}" for sym in symbols}
+    sym_of = {key: sym for sym, key in key_of.items()}
+    found = cache.get_or_compute_many(list(sym_of), ttl, lambda keys: {key_of[s]: df for s, df in load([sym_of[k] for k in keys]).items()},
+                                      on_stale=mark_stale, name=f"bars_{interval}")
+    return {sym_of[key]: df for key, df in found.items()}
+
+
+def fetch_grouped(requests, store=None):
+    """requests: iterable of (symbol, period, interval) -> {(period, interval): {symbol: DataFrame}}."""
+    groups = {}
+    for sym, period, interval in requests:
+        groups.setdefault((period, interval), []).append(sym)
+    return {key: fetch_bars(syms, *key, store=store) for key, syms in groups.items()}
+
+
+def quote_from_bars(df):
+    """(ltp, change, pct_change, stale) from daily bars, previous close = prior session close."""
+    if df is None or df.empty: return 0.0, 0.0, 0.0, False
+    closes = df["Close"].dropna()
+    stale = is_stale(df)
+    if closes.empty: return 0.0, 0.0, 0.0, stale
+    ltp = closes.iloc[-1]
+    prev_close = closes.iloc[-2] if len(closes) > 1 else ltp
+    if pd.isna(ltp) or pd.isna(prev_close) or prev_close == 0: return 0.0, 0.0, 0.0, stale
+    change = ltp - prev_close
+    return float(ltp), float(change), float((change / prev_close) * 100), stale
+
+
+def fetch_quotes(symbols, store=None, max_age=0, cache=None, ttl=30):
+    bars = fetch_bars(symbols, period="5d", interval="1d", store=store, max_age=max_age, cache=cache, ttl=ttl)
+    return {sym: quote_from_bars(bars.get(sym)) for sym in dict.fromkeys(symbols)}
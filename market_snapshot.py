@@ -0,0 +1,47 @@
+"""One quote snapshot per refresh; sector, breadth, movers and index panels all derive from it."""
+import pandas as pd
+
+SNAPSHOT_COLUMNS = ["LTP", "Change", "Pct", "Stale"]
+SECTOR_IGNORE_KEYS = ("MIXED WATCHLIST", "TOP WATCHLIST", "ALL COINDCX FUTURES")
+
+
+class MarketSnapshot:
+    def __init__(self, quotes):
+        # quotes: DataFrame indexed by symbol with LTP / Change / Pct and a 0/1 Stale flag
+        self.quotes = quotes
+
+    @classmethod
+    def from_quotes(cls, quotes):
+        """quotes: {symbol: (ltp, change, pct, stale)} as returned by market_data.fetch_quotes."""
+        df = pd.DataFrame.from_dict(quotes, orient="index", columns=SNAPSHOT_COLUMNS) if quotes else pd.DataFrame(columns=SNAPSHOT_COLUMNS)
+        return cls(df.astype(float))
+
+    def _column(self, field, symbols):
+        return self.quotes[field].reindex(list(dict.fromkeys(symbols))).fillna(0.0)
+
+    def sector_performance(self, sector_dict, ignore_keys=SECTOR_IGNORE_KEYS):
+        members = pd.DataFrame([(sector, t) for sector, items in sector_dict.items() if sector not in ignore_keys for t in items],
+                               columns=["Sector", "Symbol"])
+        if members.empty: return []
+        members["Pct"] = self.quotes["Pct"].reindex(members["Symbol"]).fillna(0.0).to_numpy()
+        avg = members[members["Pct"] != 0.0].groupby("Sector", sort=False)["Pct"].mean().round(2)
+        results = [{"Sector": sector, "Pct": float(pct), "Width": max(min(abs(pct) * 20, 100), 5)} for sector, pct in avg.items()]
+        return sorted(results, key=lambda x: x['Pct'], reverse=True)
+
+    def adv_dec(self, symbols):
+        change = self._column("Change", symbols)
+        return int((change > 0).sum()), int((change < 0).sum())
+
+    def movers(self, symbols, threshold=2.0):
+        df = self.quotes.reindex(list(dict.fromkeys(symbols))).dropna()
+        df = df[df["Pct"].abs() >= threshold]
+        df = df.reindex(df["Pct"].abs().sort_values(ascending=False).index)
+        return [{"Stock": sym, "LTP": float(ltp), "Pct": float(pct), "Stale": bool(stale)} for sym, ltp, pct, stale in zip(df.index, df["LTP"], df["Pct"], df["Stale"])]
+
+    def index_strip(self, strip):
+        """strip: [(display_name, symbol)] -> [(display_name, ltp, change, pct, stale)]."""
+        df = self.quotes.reindex([sym for _, sym in strip]).fillna(0.0)
+        return [(name, float(ltp), float(chg), float(pct), bool(stale)) for (name, _), (ltp, chg, pct, stale) in zip(strip, df.to_numpy())]
+
+    def stale_symbols(self):
+        return self.quotes.index[self.quotes["Stale"] > 0].tolist()
@@ -0,0 +1,29 @@
+"""Market calendar constants: NSE session hours, bar intervals and which symbols trade as crypto."""
+from bar_store import period_days
+
+NSE_TZ = "Asia/Kolkata"
+NSE_OPEN_MINUTES, NSE_SESSION_MINUTES = 9 * 60 + 15, 375  # 09:15-15:30 IST
+INTERVAL_MINUTES = {"1m": 1, "2m": 2, "5m": 5, "15m": 15, "30m": 30, "60m": 60, "90m": 90, "1h": 60, "1d": 1440}
+CRYPTO_SUFFIXES = ("-USD", "-USDT", "-INR")
+
+
+def is_crypto(symbol):
+    return symbol.endswith(CRYPTO_SUFFIXES)
+
+
+def interval_minutes(interval):
+    if interval not in INTERVAL_MINUTES: raise ValueError(f"Unsupported interval: {interval}")
+    return INTERVAL_MINUTES[interval]
+
+
+def bars_per_day(interval, crypto):
+    mins = interval_minutes(interval)
+    if mins >= 1440: return 1
+    return 1440 // mins if crypto else -(-NSE_SESSION_MINUTES // mins)
+
+
+def estimate_bars(period, interval, crypto):
+    """Approximate bars per symbol a period covers (trading sessions only for NSE)."""
+    days = period_days(period)
+    sessions = days if crypto or str(period).endswith("d") else int(days * 5 / 7)
+    return sessions * bars_per_day(interval, crypto)
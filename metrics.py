@@ -0,0 +1,225 @@
+"""In-process hot-path metrics (latency histograms, cache hit/miss, upstream traffic) with Prometheus text export."""
+import functools
+import http.server
+import os
+import threading
+import time
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}    # (name, labels) -> float
+        self.gauges = {}      # (name, labels) -> float
+        self.histograms = {}  # (name, labels) -> [bucket_counts..., +Inf count, sum]
+        self.help = {}
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def inc(self, name, value=1.0, help_text="", **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0.0) + value
+            if help_text: self.help.setdefault(name, help_text)
+
+    def set(self, name, value, help_text="", **labels):
+        with self._lock:
+            self.gauges[self._key(name, labels)] = float(value)
+            if help_text: self.help.setdefault(name, help_text)
+
+    def observe(self, name, value, help_text="", **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            h = self.histograms.setdefault(key, [0] * (len(LATENCY_BUCKETS) + 1) + [0.0])
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if value <= bound: h[i] += 1
+            h[len(LATENCY_BUCKETS)] += 1
+            h[-1] += value
+            if help_text: self.help.setdefault(name, help_text)
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear(); self.gauges.clear(); self.histograms.clear()
+
+    # --- export ---
+    @staticmethod
+    def _labels(labels, extra=()):
+        items = list(labels) + list(extra)
+        if not items: return ""
+        return "{" + ",".join(f'{k}="{_escape(v, quotes=True)}"' for k, v in items) + "}"
+
+    def prometheus_text(self):
+        with self._lock:
+            counters, gauges = dict(self.counters), dict(self.gauges)
+            histograms = {k: list(v) for k, v in self.histograms.items()}
+            help_text = dict(self.help)
+        lines, seen = [], set()
+
+        def header(name, kind):
+            if name in seen: return
+            seen.add(name)
+            if name in help_text: lines.append(f"# HELP {name} {_escape(help_text[name])}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in sorted(counters.items()):
+            header(name, "counter")
+            lines.append(f"{name}{self._labels(labels)} {value:g}")
+        for (name, labels), value in sorted(gauges.items()):
+            header(name, "gauge")
+            lines.append(f"{name}{self._labels(labels)} {value:g}")
+        for (name, labels), h in sorted(histograms.items()):
+            header(name, "histogram")
+            for bound, count in zip(LATENCY_BUCKETS, h):
+                lines.append(f"{name}_bucket{self._labels(labels, [('le', f'{bound:g}')])} {count}")
+            lines.append(f"{name}_bucket{self._labels(labels, [('le', '+Inf')])} {h[len(LATENCY_BUCKETS)]}")
+            lines.append(f"{name}_sum{self._labels(labels)} {h[-1]:.6f}")
+            lines.append(f"{name}_count{self._labels(labels)} {h[len(LATENCY_BUCKETS)]}")
+        return "\n".join(lines) + "\n"
+
+    def latency_table(self, name="haridas_call_seconds"):
+        """Rows of {fn, calls, avg_ms, p50_ms, p95_ms, errors} with quantiles interpolated from buckets."""
+        with self._lock:
+            histograms = {dict(labels).get("fn"): list(h) for (n, labels), h in self.histograms.items() if n == name}
+            errors = {dict(labels).get("fn"): v for (n, labels), v in self.counters.items() if n == "haridas_call_errors_total"}
+        rows = []
+        for fn, h in sorted(histograms.items(), key=lambda kv: -kv[1][-1]):
+            count = h[len(LATENCY_BUCKETS)]
+            rows.append({"fn": fn, "calls": count, "avg_ms": round(h[-1] / count * 1000, 1) if count else 0.0,
+                         "p50_ms": round(_quantile(h, 0.5) * 1000, 1), "p95_ms": round(_quantile(h, 0.95) * 1000, 1),
+                         "total_s": round(h[-1], 2), "errors": int(errors.get(fn, 0))})
+        return rows
+
+    def counter_table(self, name):
+        with self._lock:
+            return [{**dict(labels), "value": value} for (n, labels), value in sorted(self.counters.items()) if n == name]
+
+
+def _escape(value, quotes=False):
+    # text exposition format: backslash and newline are escaped in label values and HELP, double quotes in label values only
+    value = str(value).replace("\\", "\\\\").replace("\n", "\\n")
+    return value.replace('"', '\\"') if quotes else value
+
+
+def _quantile(h, q):
+    count = h[len(LATENCY_BUCKETS)]
+    if not count: return 0.0
+    target, prev_bound, prev_count = q * count, 0.0, 0
+    for bound, cum in zip(LATENCY_BUCKETS, h):
+        if cum >= target:
+            span = cum - prev_count
+            return prev_bound + (bound - prev_bound) * ((target - prev_count) / span if span else 1.0)
+        prev_bound, prev_count = bound, cum
+    return LATENCY_BUCKETS[-1]
+
+
+REGISTRY = Registry()
+
+
+def timed(name):
+    """Record call latency into haridas_call_seconds{fn=name} and exceptions into haridas_call_errors_total."""
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            start = time.perf_counter()
+            try: return fn(*args, **kwargs)
+            except Exception:
+                REGISTRY.inc("haridas_call_errors_total", help_text="Exceptions raised by instrumented calls", fn=name)
+                raise
+            finally: REGISTRY.observe("haridas_call_seconds", time.perf_counter() - start, help_text="Instrumented call latency", fn=name)
+        return inner
+    return wrap
+
+
+class timer:
+    """with metrics.timer("render_sector_table"): ... -> same histogram as @timed."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None: REGISTRY.inc("haridas_call_errors_total", fn=self.name)
+        REGISTRY.observe("haridas_call_seconds", time.perf_counter() - self.start, fn=self.name)
+        return False
+
+
+def cache_result(tier, name, result, count=1):
+    """result: hit | miss | stale."""
+    if count: REGISTRY.inc("haridas_cache_requests_total", count, help_text="Cache lookups by tier and result", tier=tier, cache=name, result=result)
+
+
+_local = threading.local()
+
+
+def instrument_cache(name, cache_decorator, tier="st_cache"):
+    """timed(name) around cache_decorator(fn), counting a miss whenever the call reaches fn itself.
+
+    The flag lives on a per-thread stack so nested cached calls are attributed to the right function.
+    """
+    def wrap(fn):
+        @functools.wraps(fn)
+        def on_miss(*args, **kwargs):
+            _local.stack[-1][0] = True
+            return fn(*args, **kwargs)
+        cached = timed(name)(cache_decorator(on_miss))
+
+        @functools.wraps(fn)
+        def outer(*args, **kwargs):
+            stack = _local.__dict__.setdefault("stack", [])
+            stack.append([False])
+            try: return cached(*args, **kwargs)
+            finally: cache_result(tier, name, "miss" if stack.pop()[0] else "hit")
+        return outer
+    return wrap
+
+
+def upstream(host, requests=1, nbytes=0, errors=0):
+    if requests: REGISTRY.inc("haridas_upstream_requests_total", requests, help_text="HTTP requests sent upstream", host=host)
+    if nbytes: REGISTRY.inc("haridas_upstream_bytes_total", nbytes, help_text="Response bytes downloaded", host=host)
+    if errors: REGISTRY.inc("haridas_upstream_errors_total", errors, help_text="Failed upstream requests", host=host)
+
+
+def cache_hit_ratios():
+    """{(tier, name): (hits, misses, hit_ratio)}; stale fallbacks count as hits."""
+    stats = {}
+    for row in REGISTRY.counter_table("haridas_cache_requests_total"):
+        hits, misses = stats.get((row["tier"], row["cache"]), (0.0, 0.0))
+        if row["result"] == "miss": misses += row["value"]
+        else: hits += row["value"]
+        stats[(row["tier"], row["cache"])] = (hits, misses)
+    return {k: (h, m, h / (h + m) if h + m else 0.0) for k, (h, m) in stats.items()}
+
+
+def write_textfile(path):
+    """Atomically write the Prometheus exposition (node_exporter textfile collector format)."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f: f.write(REGISTRY.prometheus_text())
+    os.replace(tmp, path)
+
+
+def serve(port, host="0.0.0.0"):
+    """Expose GET /metrics on a daemon thread; returns the server."""
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip("/") not in ("", "/metrics"):
+                self.send_error(404); return
+            body = REGISTRY.prometheus_text().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args): pass
+
+    server = http.server.ThreadingHTTPServer((host, int(port)), Handler)
+    threading.Thread(target=server.serve_forever, name="haridas-metrics", daemon=True).start()
+    return server
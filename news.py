@@ -0,0 +1,280 @@
+"""Market news from several RSS/Atom feeds, polled concurrently and indexed by the symbols they mention.
+
+Every feed is fetched on its own worker over a keep-alive connection pool with If-None-Match /
+If-Modified-Since, so an unchanged feed costs a 304 and no parse. Changed feeds are parsed while
+they download (XMLPullParser), and reading stops at the first GUID already seen, because feeds list
+newest first. Headlines repeated across sources are dropped by their normalised title. Each new
+headline is matched once against a keyword index built from the universe (tickers, former tickers
+and common company / coin names). The index maps each symbol to its latest headlines, so panels
+look news up by symbol instead of rescanning text.
+
+    HARIDAS_NEWS_FEEDS="https://a.example/rss,https://b.example/feed" streamlit run My_Intraday_Setup.py
+"""
+import email.utils
+import html
+import http.client
+import os
+import re
+import threading
+import time
+import xml.etree.ElementTree as ET
+import zlib
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+from urllib.parse import urljoin, urlsplit
+
+import metrics
+from markets import is_crypto
+from universe import ALIASES
+
+DEFAULT_FEEDS = ["https://economictimes.indiatimes.com/markets/rssfeeds/2146842.cms",
+                 "https://economictimes.indiatimes.com/markets/stocks/rssfeeds/2146843.cms",
+                 "https://www.livemint.com/rss/markets",
+                 "https://www.coindesk.com/arc/outboundfeeds/rss/"]
+USER_AGENT = "Mozilla/5.0"
+# names headlines use instead of the ticker
+NAMES = {"reliance": "RELIANCE.NS", "infosys": "INFY.NS", "hdfc bank": "HDFCBANK.NS", "icici bank": "ICICIBANK.NS", "axis bank": "AXISBANK.NS",
+         "kotak": "KOTAKBANK.NS", "airtel": "BHARTIARTL.NS", "bharti airtel": "BHARTIARTL.NS", "tata motors": "TATAMOTORS.NS",
+         "tata steel": "TATASTEEL.NS", "tata power": "TATAPOWER.NS", "larsen": "LT.NS", "l&t": "LT.NS", "sun pharma": "SUNPHARMA.NS",
+         "maruti": "MARUTI.NS", "bajaj finance": "BAJFINANCE.NS", "adani enterprises": "ADANIENT.NS", "adani ports": "ADANIPORTS.NS",
+         "hindalco": "HINDALCO.NS", "vedanta": "VEDL.NS", "coal india": "COALINDIA.NS", "asian paints": "ASIANPAINT.NS",
+         "hindustan unilever": "HINDUNILVR.NS", "mahindra": "M&M.NS", "indigo": "INDIGO.NS", "interglobe": "INDIGO.NS",
+         "zomato": "ETERNAL.NS", "jio financial": "JIOFIN.NS", "state bank": "SBIN.NS", "sbi": "SBIN.NS", "hcl tech": "HCLTECH.NS",
+         "tech mahindra": "TECHM.NS", "dr reddy's": "DRREDDY.NS", "power grid": "POWERGRID.NS", "ultratech": "ULTRACEMCO.NS",
+         "bitcoin": "BTC-USD", "ethereum": "ETH-USD", "ether": "ETH-USD", "solana": "SOL-USD", "ripple": "XRP-USD",
+         "dogecoin": "DOGE-USD", "cardano": "ADA-USD", "polkadot": "DOT-USD", "chainlink": "LINK-USD", "litecoin": "LTC-USD",
+         "avalanche": "AVAX-USD", "shiba inu": "SHIB-USD", "polygon": "MATIC-USD", "tron": "TRX-USD", "binance coin": "BNB-USD"}
+# tickers shorter than this only match when the headline writes them in capitals (ITC, TCS, but not "idea")
+CAPS_BELOW = 5
+TOKEN = re.compile(r"[A-Za-z0-9][A-Za-z0-9&'-]*")
+READ_BYTES = 16384
+
+
+def feeds_from_env():
+    spec = os.environ.get("HARIDAS_NEWS_FEEDS")
+    return [u.strip() for u in spec.split(",") if u.strip()] if spec else list(DEFAULT_FEEDS)
+
+
+def ticker(symbol):
+    return symbol.rsplit("-", 1)[0] if is_crypto(symbol) else symbol.split(".")[0]
+
+
+def _words(title):
+    return [w[:-2] if w.endswith(("'s", "’s")) else w for w in TOKEN.findall(title)]
+
+
+def title_key(title):
+    return " ".join(w.lower() for w in _words(title))
+
+
+def build_keywords(symbols, names=NAMES, aliases=ALIASES):
+    """Inverted index: lower-case token or two-word phrase -> (symbols, matches in capitals only)."""
+    universe, index = set(symbols), {}
+    def add(phrase, sym, caps):
+        syms, was_caps = index.get(phrase, (frozenset(), True))
+        index[phrase] = (syms | {sym}, was_caps and caps)
+    for sym in universe:
+        base = ticker(sym)
+        add(base.lower(), sym, len(base) < CAPS_BELOW)
+    for old, new in aliases.items():
+        if new in universe: add(ticker(old).lower(), new, len(ticker(old)) < CAPS_BELOW)
+    for name, sym in names.items():
+        if sym in universe: add(name, sym, False)
+    return index
+
+
+def match_symbols(title, keywords):
+    words, found = _words(title), set()
+    for i, word in enumerate(words):
+        for phrase in (word, " ".join(words[i:i + 2]) if i + 1 < len(words) else None):
+            hit = keywords.get(phrase.lower()) if phrase else None
+            if hit and (not hit[1] or phrase.isupper()): found |= hit[0]
+    return found
+
+
+def _published(text):
+    if not text: return None
+    try: return email.utils.parsedate_to_datetime(text).timestamp()
+    except (TypeError, ValueError):
+        try: return datetime.fromisoformat(text.strip().replace("Z", "+00:00")).timestamp()
+        except ValueError: return None
+
+
+def _item(el):
+    """RSS <item> or Atom <entry> -> dict."""
+    fields = {}
+    for child in el:
+        tag = child.tag.rsplit("}", 1)[-1]
+        if tag == "link" and child.get("href"): fields.setdefault("link", child.get("href"))
+        elif child.text and tag not in fields: fields[tag] = child.text.strip()
+    link = fields.get("link", "")
+    return {"title": html.unescape(fields.get("title", "")), "link": link, "guid": fields.get("guid") or fields.get("id") or link,
+            "published": _published(fields.get("pubDate") or fields.get("published") or fields.get("updated"))}
+
+
+class ConnectionPool:
+    """Idle keep-alive HTTP(S) connections per host, reused across polls and feeds."""
+
+    def __init__(self, timeout=10.0):
+        self.timeout, self.idle = timeout, {}
+        self._lock = threading.Lock()
+
+    def get(self, scheme, host):
+        with self._lock:
+            conns = self.idle.get((scheme, host))
+            if conns: return conns.pop()
+        return self.connect(scheme, host)
+
+    def connect(self, scheme, host):
+        """A new connection, never an idle one."""
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        return cls(host, timeout=self.timeout)
+
+    def put(self, scheme, host, conn):
+        with self._lock: self.idle.setdefault((scheme, host), []).append(conn)
+
+
+class FeedState:
+    def __init__(self, url, remember=500):
+        self.url, self.etag, self.modified = url, None, None
+        self.seen, self.order = set(), deque(maxlen=remember)
+        self.status, self.fetched, self.items, self.error = None, None, 0, None
+        self.polling = threading.Lock()
+
+    def remember(self, guid):
+        if len(self.order) == self.order.maxlen: self.seen.discard(self.order[0])
+        self.order.append(guid)
+        self.seen.add(guid)
+
+
+class NewsFeed:
+    def __init__(self, feeds=None, symbols=(), max_items=300, per_symbol=5, timeout=10.0):
+        self.feeds = {url: FeedState(url) for url in (feeds if feeds is not None else feeds_from_env())}
+        self.keywords = build_keywords(symbols)
+        self.items = deque(maxlen=max_items)  # newest first
+        self.titles = OrderedDict()  # normalised title -> None, for cross-source dedup
+        self.by_symbol, self.per_symbol = {}, per_symbol
+        self.pool = ConnectionPool(timeout)
+        self.refreshed = None
+        self._workers = ThreadPoolExecutor(max_workers=max(1, min(8, len(self.feeds))), thread_name_prefix="haridas-news")
+        self._lock, self._refreshing = threading.Lock(), threading.Lock()
+
+    # --- fetching ---
+    def _get(self, state, url, redirects=3, conditional=True):
+        parts = urlsplit(url)
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        headers = {"User-Agent": USER_AGENT, "Accept-Encoding": "gzip, deflate"}
+        if conditional and state.etag: headers["If-None-Match"] = state.etag
+        if conditional and state.modified: headers["If-Modified-Since"] = state.modified
+        conn = self.pool.get(parts.scheme, parts.netloc)
+        try:
+            conn.request("GET", path, headers=headers)
+            resp = conn.getresponse()
+        except (OSError, http.client.HTTPException):
+            conn.close()  # a stale keep-alive connection: retry once on a new one (the pool may hold more stale ones)
+            conn = self.pool.connect(parts.scheme, parts.netloc)
+            conn.request("GET", path, headers=headers)
+            resp = conn.getresponse()
+        if resp.status in (301, 302, 303, 307, 308) and redirects and resp.getheader("Location"):
+            resp.read()
+            self.pool.put(parts.scheme, parts.netloc, conn)
+            target = urljoin(url, resp.getheader("Location"))
+            # validators belong to the feed's own host; another host gets an unconditional GET
+            return self._get(state, target, redirects - 1, conditional and urlsplit(target).netloc == parts.netloc)
+        return parts, conn, resp
+
+    def _poll(self, state):
+        """One conditional GET -> new items (newest first), stopping at the first GUID already seen."""
+        parts, conn, resp = self._get(state, state.url)
+        state.status, state.fetched, state.error = resp.status, time.time(), None
+        metrics.REGISTRY.inc("haridas_news_fetches_total", help_text="News feed polls by HTTP status", host=parts.netloc, status=str(resp.status))
+        if resp.status == 304 or resp.status >= 400:
+            resp.read()
+            self.pool.put(parts.scheme, parts.netloc, conn)
+            if resp.status >= 400: metrics.upstream(parts.netloc, errors=1)
+            return []
+        encoding = (resp.getheader("Content-Encoding") or "").lower()
+        inflate = zlib.decompressobj(16 + zlib.MAX_WBITS if encoding == "gzip" else zlib.MAX_WBITS) if encoding in ("gzip", "deflate") else None
+        parser, fresh, nbytes, complete = ET.XMLPullParser(events=("end",)), [], 0, True
+        try:
+            while complete:
+                chunk = resp.read(READ_BYTES)
+                if not chunk: break
+                nbytes += len(chunk)
+                parser.feed(inflate.decompress(chunk) if inflate else chunk)
+                for _, el in parser.read_events():
+                    if el.tag.rsplit("}", 1)[-1] not in ("item", "entry"): continue
+                    item = _item(el)
+                    el.clear()
+                    if item["guid"] in state.seen:
+                        complete = False
+                        break
+                    fresh.append(item)
+        except Exception:
+            conn.close()
+            raise
+        metrics.upstream(parts.netloc, nbytes=nbytes)
+        if complete: self.pool.put(parts.scheme, parts.netloc, conn)
+        else: conn.close()  # stopped mid-body: the connection cannot be reused
+        state.etag, state.modified = resp.getheader("ETag"), resp.getheader("Last-Modified")
+        for item in reversed(fresh): state.remember(item["guid"])
+        return fresh
+
+    def _poll_safe(self, state):
+        """Poll and index one feed -> headlines added. Indexing happens here, not in refresh, so a poll
+        that outlives refresh's timeout still lands: its GUIDs and validators are already saved."""
+        if not state.polling.acquire(blocking=False): return 0  # still busy from an earlier refresh
+        try: return self._add([(state.url, item) for item in self._poll(state)])
+        except Exception as exc:  # one broken feed never blocks the others
+            state.error, state.fetched = f"{type(exc).__name__}: {exc}", time.time()
+            metrics.upstream(urlsplit(state.url).netloc, errors=1)
+            return 0
+        finally: state.polling.release()
+
+    def refresh(self, timeout=15.0):
+        """Poll every feed concurrently -> headlines added by the polls that finished within timeout
+        (slower ones keep running and index theirs when they finish). Overlapping calls return 0."""
+        if not self._refreshing.acquire(blocking=False): return 0
+        try:
+            done, _ = wait([self._workers.submit(self._poll_safe, state) for state in self.feeds.values()], timeout=timeout)
+            return sum(f.result() for f in done)
+        finally:
+            self.refreshed = time.time()
+            self._refreshing.release()
+
+    def refresh_async(self, max_age=300):
+        """Start a background refresh when the last one is older than max_age; never waits on the network."""
+        if self.refreshed is None or time.time() - self.refreshed >= max_age:
+            self.refreshed = time.time()
+            threading.Thread(target=self.refresh, name="haridas-news-refresh", daemon=True).start()
+
+    # --- index ---
+    def _add(self, found):
+        added = []
+        with self._lock:
+            for url, item in found:
+                key = title_key(item["title"])
+                if not key or key in self.titles: continue
+                self.titles[key] = None
+                if len(self.titles) > 4 * self.items.maxlen: self.titles.popitem(last=False)
+                entry = (item["title"], item["link"], urlsplit(url).netloc, item["published"] or time.time())
+                for sym in match_symbols(item["title"], self.keywords):
+                    self.by_symbol[sym] = sorted(self.by_symbol.get(sym, []) + [entry], key=lambda e: e[3])[-self.per_symbol:]
+                added.append(entry)
+            # feeds are polled in parallel and finish in any order: keep the merged list newest first by publish time
+            if added: self.items = deque(sorted([*self.items, *added], key=lambda e: e[3], reverse=True)[:self.items.maxlen], maxlen=self.items.maxlen)
+        metrics.REGISTRY.inc("haridas_news_items_total", len(added), help_text="Distinct headlines ingested")
+        return len(added)
+
+    def headlines(self, n=5):
+        """[(title, link, source host, published epoch s)], newest first."""
+        with self._lock: return list(self.items)[:n]
+
+    def related(self, symbol, n=1):
+        """Newest headlines mentioning symbol, as a hashable tuple (cache and memo keys)."""
+        with self._lock: return tuple(reversed(self.by_symbol.get(symbol, ())))[:n]
+
+    def status(self):
+        return {state.url: {"status": state.status, "items_seen": len(state.seen), "etag": bool(state.etag), "error": state.error,
+                            "age_s": round(time.time() - state.fetched) if state.fetched else None} for state in self.feeds.values()}
@@ -0,0 +1,78 @@
+"""Coarser timeframes built locally from one fine bar series per asset class.
+
+NSE symbols are fetched at 5m and crypto at 15m, over one shared window, and every 15m, 1h and
+daily request inside the fine interval's upstream retention is aggregated from those bars: bins are
+anchored at the 09:15 IST open for NSE (1h bars run 09:15-10:15 ... 15:15-15:30, like Yahoo's) and
+at 00:00 UTC for crypto. Longer histories are still fetched at their own granularity.
+"""
+import numpy as np
+import pandas as pd
+
+from bar_store import period_days, trim_to_period
+from markets import INTERVAL_MINUTES, NSE_OPEN_MINUTES, NSE_TZ, is_crypto
+
+# asset class -> (fine interval, window fetched for every request it can serve)
+BASE_INTERVALS = {"nse": ("5m", "10d"), "crypto": ("15m", "15d")}
+# days of history Yahoo serves per intraday interval
+RETENTION_DAYS = {"1m": 7, "2m": 60, "5m": 60, "15m": 60, "30m": 60, "60m": 730, "90m": 60, "1h": 730}
+NSE_INDICES = ("^NSE", "^BSE", "^CNX", "^CRS")
+
+
+def asset_class(symbol):
+    if is_crypto(symbol): return "crypto"
+    if symbol.endswith((".NS", ".BO")) or symbol.startswith(NSE_INDICES): return "nse"
+    return None  # FX and anything else keeps its own session: fetched as requested
+
+
+def calendar_days(period, asset):
+    # "Nd" periods count sessions: NSE trades weekdays, plus slack for exchange holidays
+    days = period_days(period)
+    return days * 7 // 5 + 4 if asset == "nse" and str(period).endswith("d") else days
+
+
+def source_request(symbol, period, interval):
+    """(period, interval) to download for a (period, interval) request on this symbol."""
+    asset = asset_class(symbol)
+    if asset is None or interval not in INTERVAL_MINUTES: return period, interval
+    base, base_period = BASE_INTERVALS[asset]
+    mins, base_mins = INTERVAL_MINUTES[interval], INTERVAL_MINUTES[base]
+    if mins < base_mins or (mins < 1440 and mins % base_mins) or calendar_days(period, asset) > RETENTION_DAYS[base]:
+        return period, interval
+    return (base_period if calendar_days(period, asset) <= calendar_days(base_period, asset) else period), base
+
+
+def resample_bars(df, interval, tz, session_open=0):
+    """Aggregate sorted OHLCV bars into `interval` bins starting `session_open` minutes past local midnight.
+
+    Daily bars are one per local calendar day, stamped at local midnight like Yahoo's.
+    """
+    if df.empty: return df
+    idx = pd.DatetimeIndex(df.index)
+    wall = idx.tz_convert(tz).tz_localize(None) if idx.tz is not None else idx
+    day, minute = np.divmod(wall.values.astype("datetime64[m]").astype(np.int64), 1440)
+    mins = INTERVAL_MINUTES[interval]
+    key = day * 1440 if mins >= 1440 else day * 1440 + session_open + (minute - session_open) // mins * mins
+    starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+    ends = np.r_[starts[1:], len(key)] - 1
+    reduce = {"Open": lambda x: x[starts], "High": lambda x: np.fmax.reduceat(x, starts), "Low": lambda x: np.fmin.reduceat(x, starts),
+              "Close": lambda x: x[ends], "Volume": lambda x: np.add.reduceat(np.nan_to_num(x), starts)}
+    index = pd.DatetimeIndex((key[starts] * 60).astype("datetime64[s]"))
+    out = pd.DataFrame({f: reduce[f](df[f].to_numpy(dtype=float)) for f in df.columns if f in reduce},
+                       index=index.tz_localize(tz) if idx.tz is not None else index)
+    out.attrs.update(df.attrs)
+    return out
+
+
+def derive(frames, request, source):
+    """Frames downloaded as source=(period, interval) -> the requested (period, interval); staleness flags carry over."""
+    (period, interval), (source_period, source_interval) = request, source
+    out = {}
+    for sym, df in frames.items():
+        if interval != source_interval:
+            crypto = asset_class(sym) == "crypto"
+            df = resample_bars(df, interval, "UTC" if crypto else NSE_TZ, 0 if crypto else NSE_OPEN_MINUTES)
+        if period != source_period:
+            attrs, df = df.attrs, trim_to_period(df, period)
+            df.attrs.update(attrs)
+        out[sym] = df
+    return out
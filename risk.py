@@ -0,0 +1,99 @@
+"""Monte Carlo risk of a trade stream: bootstrap equity paths sized like the Futures Risk Calculator.
+
+Every trade is sized from the equity at its entry, as the calculator sizes one: risk_pct of equity is
+lost at the stop. Notional is therefore risk / stop distance, capped at equity x leverage, the most
+the margin can carry. A trade whose adverse move reaches 1 / leverage (the calculator's liquidation
+price) is liquidated instead and loses its whole margin. Per-trade equity returns are computed once,
+then resampled with replacement into a (paths x trades) index matrix. Equity curves, peaks and
+drawdowns are cumulative sums and maxima along that matrix's rows, in blocks of paths small enough
+to stay in cache. Blocks fan out over the backtest process pool when one is given.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+from backtest import DEFAULT_WORKERS
+
+BLOCK_PATHS = 2000  # paths per block: a 2000 x 500 float32 block is 4 MB
+MIN_CELLS_PER_WORKER = 10_000_000  # below this (paths x trades) a worker's start-up outweighs the work it saves
+PERCENTILES = [5, 25, 50, 75, 95, 99]
+DEFAULT_STOP_PCT = 1.5  # for trade lists without a stop (3-day reversal): the calculator's 65000 / 64000 example
+
+
+def trade_arrays(trades, stop_pct=DEFAULT_STOP_PCT):
+    """Backtest trades ("P&L %", "Entry", "SL") or signal journal rows ("pnl", "entry", "sl") -> (P&L, stop distance) fractions."""
+    pnl = trades["P&L %" if "P&L %" in trades else "pnl"].to_numpy(dtype=float) / 100
+    entry, sl = (trades.get(c) if c in trades else trades.get(c.lower()) for c in ("Entry", "SL"))
+    stop = np.full(len(pnl), stop_pct / 100)
+    if entry is not None and sl is not None:
+        entry, sl = pd.to_numeric(entry, errors="coerce").to_numpy(dtype=float), pd.to_numeric(sl, errors="coerce").to_numpy(dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"): dist = np.abs(entry - sl) / entry
+        stop = np.where(np.isfinite(dist) & (dist > 0), dist, stop)
+    keep = np.isfinite(pnl)
+    return pnl[keep], stop[keep]
+
+
+def sized_returns(pnl, stop, risk_pct=2.0, leverage=10):
+    """-> (equity return per trade, liquidated mask) under risk-% sizing with the leverage cap."""
+    exposure = np.minimum(risk_pct / 100 / stop, leverage)  # notional / equity
+    liquidated = pnl <= -1 / leverage
+    return exposure * np.maximum(pnl, -1 / leverage), liquidated
+
+
+def _simulate_block(log_returns, liquidated, paths, horizon, ruin_log, seed):
+    """One block of bootstrap paths -> (max drawdown, final equity, ruined, liquidated) per path."""
+    rng = np.random.default_rng(seed)
+    idx = rng.integers(0, len(log_returns), size=(paths, horizon), dtype=np.int32)
+    curve = np.cumsum(log_returns[idx], axis=1)  # log equity, starting capital = 0
+    peak = np.maximum(np.maximum.accumulate(curve, axis=1), 0)
+    deepest = np.max(peak - curve, axis=1)
+    ruined = np.min(curve, axis=1) <= ruin_log
+    return -np.expm1(-deepest), np.exp(curve[:, -1]), ruined, liquidated[idx].any(axis=1)
+
+
+def simulate(pnl, stop, paths=10_000, horizon=None, risk_pct=2.0, leverage=10, ruin_pct=50.0, seed=0,
+             executor=None, workers=DEFAULT_WORKERS, block=BLOCK_PATHS):
+    """Bootstrap `paths` sequences of `horizon` trades (default: as many as the sample).
+
+    -> {"max_dd", "final", "ruined", "liquidated"} arrays, one entry per path; drawdowns and final
+    equity are fractions of equity, ruin is equity touching (1 - ruin_pct) of the starting capital.
+    A zero horizon gives flat paths; a non-zero one needs at least one trade to resample.
+    """
+    if not len(pnl) and horizon != 0: raise ValueError("no trades to resample: simulate needs at least one P&L")
+    horizon = len(pnl) if horizon is None else int(horizon)
+    if horizon < 0: raise ValueError(f"horizon must be >= 0, got {horizon}")
+    if horizon == 0:
+        return {"max_dd": np.zeros(paths), "final": np.ones(paths), "ruined": np.zeros(paths, dtype=bool), "liquidated": np.zeros(paths, dtype=bool)}
+    returns, liquidates = sized_returns(np.asarray(pnl, dtype=float), np.asarray(stop, dtype=float), risk_pct, leverage)
+    with np.errstate(divide="ignore"): log_returns = np.log1p(returns).astype(np.float32)  # a wiped-out account is -inf
+    ruin_log = math.log(1 - ruin_pct / 100) if ruin_pct < 100 else -math.inf
+    sizes = [min(block, paths - i) for i in range(0, paths, block)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [[log_returns] * len(sizes), [liquidates] * len(sizes), sizes, [horizon] * len(sizes), [ruin_log] * len(sizes), seeds]
+    if executor is not None and workers > 1 and paths * horizon >= 2 * MIN_CELLS_PER_WORKER:
+        results = list(executor.map(_simulate_block, *args, chunksize=max(1, math.ceil(len(sizes) / workers))))
+    else: results = list(map(_simulate_block, *args))
+    return {name: np.concatenate([r[i] for r in results]) for i, name in enumerate(("max_dd", "final", "ruined", "liquidated"))}
+
+
+def summarize(sim):
+    """Headline figures of a simulation, in % like backtest.portfolio_summary."""
+    return {"Paths": len(sim["final"]), "Risk of Ruin %": round(float(sim["ruined"].mean() * 100), 2),
+            "Liquidation %": round(float(sim["liquidated"].mean() * 100), 2),
+            "Median Max Drawdown %": round(float(np.median(sim["max_dd"]) * 100), 2),
+            "P95 Max Drawdown %": round(float(np.percentile(sim["max_dd"], 95) * 100), 2),
+            "Median Return %": round(float((np.median(sim["final"]) - 1) * 100), 2),
+            "Loss Probability %": round(float((sim["final"] < 1).mean() * 100), 2)}
+
+
+def distribution(sim, percentiles=PERCENTILES):
+    """Percentile table of max drawdown and final return, in %."""
+    return pd.DataFrame({"Percentile": [f"P{p}" for p in percentiles],
+                         "Max Drawdown %": np.round(np.percentile(sim["max_dd"], percentiles) * 100, 2),
+                         "Return %": np.round((np.percentile(sim["final"], percentiles) - 1) * 100, 2)})
+
+
+def drawdown_histogram(sim, bins=40):
+    counts, edges = np.histogram(sim["max_dd"] * 100, bins=bins, range=(0, 100))
+    return pd.Series(counts, index=pd.Index(np.round(edges[:-1], 1), name="Max Drawdown %"), name="Paths")
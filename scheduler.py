@@ -0,0 +1,81 @@
+"""Background refresh scheduler and NSE session clock."""
+import datetime
+import threading
+import time
+
+import pytz
+
+IST = pytz.timezone('Asia/Kolkata')
+OFF_SESSION_SECONDS = 900
+
+
+def nse_session_bounds(now):
+    t_915 = now.replace(hour=9, minute=15, second=0, microsecond=0)
+    t_1530 = now.replace(hour=15, minute=30, second=0, microsecond=0)
+    return t_915, t_1530
+
+
+def nse_session(now=None):
+    """("PRE-MARKET" | "LIVE MARKET" | "POST MARKET") from the 09:15-15:30 IST window."""
+    now = now or datetime.datetime.now(IST)
+    t_915, t_1530 = nse_session_bounds(now)
+    if now < t_915: return "PRE-MARKET"
+    elif now <= t_1530: return "LIVE MARKET"
+    return "POST MARKET"
+
+
+def is_nse_live(now=None):
+    now = now or datetime.datetime.now(IST)
+    return now.weekday() < 5 and nse_session(now) == "LIVE MARKET"
+
+
+def poll_interval(base_seconds, crypto=False, now=None):
+    """Crypto polls 24/7 at base rate; NSE slows to OFF_SESSION_SECONDS outside the session."""
+    if crypto or is_nse_live(now): return base_seconds
+    return max(base_seconds, OFF_SESSION_SECONDS)
+
+
+class RefreshScheduler:
+    """Runs registered refresh jobs on a daemon thread, each on its own market-hours aware interval."""
+
+    def __init__(self):
+        self.jobs = {}
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def add_job(self, name, fn, base_seconds, crypto=False):
+        with self._lock:
+            self.jobs[name] = {"fn": fn, "base": base_seconds, "crypto": crypto,
+                               "next_run": 0.0, "last_run": None, "last_error": None, "runs": 0}
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive(): return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="haridas-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def run_due(self, now=None):
+        now = now or time.time()
+        with self._lock: due = [(name, job) for name, job in self.jobs.items() if job["next_run"] <= now]
+        for name, job in due:
+            try:
+                job["fn"]()
+                job["last_error"] = None
+            except Exception as e: job["last_error"] = repr(e)
+            job["runs"] += 1
+            job["last_run"] = time.time()
+            job["next_run"] = job["last_run"] + poll_interval(job["base"], job["crypto"])
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self.run_due()
+            with self._lock: next_due = min((job["next_run"] for job in self.jobs.values()), default=time.time() + 1)
+            self._stop.wait(max(1.0, next_due - time.time()))
+
+    def status(self):
+        with self._lock:
+            return {name: {k: job[k] for k in ("base", "crypto", "last_run", "next_run", "last_error", "runs")} for name, job in self.jobs.items()}
@@ -0,0 +1,144 @@
+"""Cross-session, cross-process cache for raw bars and quotes.
+
+A small in-memory LRU sits in front of a SQLite file shared by every Streamlit worker on the box.
+Misses are coalesced with per-key leases: the first caller fetches, everyone else waits for its result.
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import metrics
+from bar_store import DATA_DIR
+
+DEFAULT_PATH = os.path.join(DATA_DIR, "shared_cache.sqlite")
+NEGATIVE = "__haridas_no_data__"  # cached "upstream had nothing" so waiters don't refetch a dead symbol
+STALE_FOREVER = 10 ** 12
+
+
+def _is_negative(value):
+    return isinstance(value, str) and value == NEGATIVE
+
+
+class SharedCache:
+    def __init__(self, path=DEFAULT_PATH, max_bytes=256 * 1024 * 1024, memory_items=2048, lease_seconds=30, poll_seconds=0.05):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._memory = OrderedDict()  # key -> (written, value)
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as con:
+            con.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value BLOB, written REAL, accessed REAL, size INTEGER)")
+            con.execute("CREATE TABLE IF NOT EXISTS leases (key TEXT PRIMARY KEY, owner TEXT, expires REAL)")
+
+    def _connect(self):
+        con = sqlite3.connect(self.path, timeout=30)
+        con.execute("PRAGMA journal_mode=WAL")
+        return con
+
+    # --- memory tier ---
+    def _remember(self, key, written, value):
+        with self._lock:
+            self._memory[key] = (written, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_items: self._memory.popitem(last=False)
+
+    def get_many(self, keys, ttl):
+        """Fresh values (written less than ttl seconds ago) for the keys that have one."""
+        now = time.time()
+        found, misses = {}, []
+        with self._lock:
+            for key in keys:
+                hit = self._memory.get(key)
+                if hit and now - hit[0] < ttl:
+                    self._memory.move_to_end(key)
+                    found[key] = hit[1]
+                else: misses.append(key)
+        if not misses: return found
+        with self._connect() as con:
+            marks = ",".join("?" * len(misses))
+            rows = con.execute(f"SELECT key, value, written FROM entries WHERE key IN ({marks}) AND written > ?", [*misses, now - ttl]).fetchall()
+            if rows: con.execute(f"UPDATE entries SET accessed=? WHERE key IN ({','.join('?' * len(rows))})", [now, *[r[0] for r in rows]])
+        for key, blob, written in rows:
+            value = pickle.loads(blob)
+            self._remember(key, written, value)
+            found[key] = value
+        return found
+
+    def set_many(self, items):
+        if not items: return
+        now = time.time()
+        rows = [(key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), now, now) for key, value in items.items()]
+        with self._connect() as con:
+            con.executemany("INSERT OR REPLACE INTO entries VALUES (?,?,?,?,?)", [(k, b, w, a, len(b)) for k, b, w, a in rows])
+            self._evict(con)
+        for key, value in items.items(): self._remember(key, now, value)
+
+    def _evict(self, con):
+        # LRU by last access until the file-backed tier is back under max_bytes
+        total = con.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes: return
+        for key, size in con.execute("SELECT key, size FROM entries ORDER BY accessed").fetchall():
+            con.execute("DELETE FROM entries WHERE key=?", (key,))
+            total -= size
+            if total <= self.max_bytes: break
+
+    # --- request coalescing ---
+    def _acquire(self, keys):
+        now = time.time()
+        mine = []
+        with self._connect() as con:
+            for key in keys:
+                cur = con.execute("INSERT INTO leases VALUES (?,?,?) ON CONFLICT(key) DO UPDATE SET owner=excluded.owner, "
+                                  "expires=excluded.expires WHERE leases.expires < ?", (key, self.owner, now + self.lease_seconds, now))
+                if cur.rowcount: mine.append(key)
+        return mine
+
+    def _release(self, keys):
+        with self._connect() as con:
+            con.executemany("DELETE FROM leases WHERE key=? AND owner=?", [(k, self.owner) for k in keys])
+
+    def get_or_compute_many(self, keys, ttl, compute, on_stale=None, name="shared"):
+        """Fresh cached values, fetching misses via compute(keys) -> {key: value} at most once across processes.
+
+        Keys leased by another caller are polled until that caller stores a value or gives the lease up.
+        Keys compute() returns nothing for fall back to their last good (expired) value passed through
+        on_stale(value); without one they are negatively cached for ttl and come back absent.
+        """
+        keys = list(dict.fromkeys(keys))
+        found = self.get_many(keys, ttl)
+        missing = [k for k in keys if k not in found]
+        metrics.cache_result("shared", name, "hit", len(found))
+        metrics.cache_result("shared", name, "miss", len(missing))
+        while missing:
+            mine = self._acquire(missing)
+            if mine:
+                try:
+                    values = {k: v for k, v in compute(mine).items() if v is not None}
+                    failed = [k for k in mine if k not in values]
+                    stale = self.get_many(failed, ttl=STALE_FOREVER) if on_stale is not None and failed else {}
+                    stale = {k: on_stale(v) for k, v in stale.items() if not _is_negative(v)}
+                    metrics.cache_result("shared", name, "stale", len(stale))
+                    self.set_many({**{k: NEGATIVE for k in failed if k not in stale}, **values})
+                    found.update(values)
+                    found.update(stale)
+                finally: self._release(mine)
+                missing = [k for k in missing if k not in mine]
+            if missing:
+                time.sleep(self.poll_seconds)
+                found.update(self.get_many(missing, ttl))
+                missing = [k for k in missing if k not in found]
+        return {k: found[k] for k in keys if k in found and not _is_negative(found[k])}
+
+    def clear(self):
+        with self._lock: self._memory.clear()
+        with self._connect() as con:
+            con.execute("DELETE FROM entries")
+            con.execute("DELETE FROM leases")
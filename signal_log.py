@@ -0,0 +1,141 @@
+"""Bar-close-triggered live signals, appended to a SQLite log and tracked to their exits for the Trade Journal.
+
+A SignalEngine re-runs its scanner for a symbol only when one of its candles has closed (the forming
+bar moved on); otherwise the previous answer is served. Each new signal is logged once per
+(strategy, symbol, setup bar), and every pending or open one is advanced through walkforward.execute
+over the closed bars: the stop order fills within the next bar or expires, then SL, break-even after
+T1, 50% at T2 and the NSE square-off close it exactly as in the intraday backtest.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from bar_panel import as_panel, as_price
+from bar_store import DATA_DIR
+from markets import INTERVAL_MINUTES, NSE_OPEN_MINUTES, NSE_SESSION_MINUTES, NSE_TZ
+from strategies import scan_exhaustion, scan_ha_bb_incremental
+from walkforward import STRATEGIES, execute, frame_arrays, trade_result
+
+DEFAULT_PATH = os.path.join(DATA_DIR, "signals.sqlite")
+COLUMNS = ["strategy", "symbol", "setup_ts", "interval", "tz", "signal", "entry", "sl", "t1", "t2",
+           "status", "fill_ts", "fill", "exit_ts", "exit", "outcome", "r", "pnl"]
+ACTIVE = ("PENDING", "OPEN")
+# strategy -> (scanner, symbol key, target keys of its signal dicts, LTP is the forming bar's price, live scan params)
+# the exhaustion scan covers both sentiments at once, so the radio only filters its output
+SCANNERS = {"exhaustion": (scan_exhaustion, "Stock", ("T1", "T2(1:3)"), False, {"sentiment": ("BULLISH", "BEARISH")}),
+            "ha_bb": (scan_ha_bb_incremental, "Coin", ("Target(BB)", "Target(1:3)"), True, {})}
+
+
+def nse_session_close(session):
+    """Epoch seconds of 15:30 IST on an NSE session day ("YYYY-MM-DD")."""
+    return (pd.Timestamp(session).tz_localize(NSE_TZ) + pd.Timedelta(minutes=NSE_OPEN_MINUTES + NSE_SESSION_MINUTES)).timestamp()
+
+
+class SignalLog:
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as con:
+            con.execute("CREATE TABLE IF NOT EXISTS signals (strategy TEXT, symbol TEXT, setup_ts INTEGER, interval TEXT, tz TEXT, "
+                        "signal TEXT, entry REAL, sl REAL, t1 REAL, t2 REAL, status TEXT, fill_ts INTEGER, fill REAL, "
+                        "exit_ts INTEGER, exit REAL, outcome TEXT, r REAL, pnl REAL, PRIMARY KEY (strategy, symbol, setup_ts))")
+            con.execute("CREATE INDEX IF NOT EXISTS signals_status ON signals (strategy, status)")
+            con.execute("CREATE INDEX IF NOT EXISTS signals_exit ON signals (exit_ts)")
+
+    def _connect(self):
+        con = sqlite3.connect(self.path, timeout=30)
+        con.execute("PRAGMA journal_mode=WAL")
+        return con
+
+    def record(self, strategy, interval, rows):
+        """rows: [(symbol, setup_ts, tz, signal, entry, sl, t1, t2)]; a setup already logged is ignored. -> rows added."""
+        with self._connect() as con:
+            before = con.total_changes
+            con.executemany("INSERT OR IGNORE INTO signals (strategy, symbol, setup_ts, interval, tz, signal, entry, sl, t1, t2, status) "
+                            "VALUES (?,?,?,?,?,?,?,?,?,?,'PENDING')", [(strategy, *row[:2], interval, *row[2:]) for row in rows])
+            return con.total_changes - before
+
+    def active(self, strategy, symbols):
+        if not symbols: return []
+        with self._connect() as con:
+            rows = con.execute(f"SELECT * FROM signals WHERE strategy=? AND status IN ('PENDING','OPEN') "
+                               f"AND symbol IN ({','.join('?' * len(symbols))})", [strategy, *symbols]).fetchall()
+        return [dict(zip(COLUMNS, row)) for row in rows]
+
+    def update(self, rows):
+        fields = COLUMNS[10:]
+        with self._connect() as con:
+            con.executemany(f"UPDATE signals SET {', '.join(f + '=?' for f in fields)} WHERE strategy=? AND symbol=? AND setup_ts=?",
+                            [[row[f] for f in fields] + [row["strategy"], row["symbol"], row["setup_ts"]] for row in rows])
+
+    def journal(self, start=None, end=None, strategy=None, status=("CLOSED",)):
+        """Logged signals by status, newest exit (then setup) first; start/end bound the exit time (epoch s)."""
+        where, args = [f"status IN ({','.join('?' * len(status))})"], list(status)
+        if strategy is not None: where, args = where + ["strategy=?"], args + [strategy]
+        if start is not None: where, args = where + ["exit_ts>=?"], args + [int(start)]
+        if end is not None: where, args = where + ["exit_ts<?"], args + [int(end)]
+        with self._connect() as con:
+            rows = con.execute(f"SELECT * FROM signals WHERE {' AND '.join(where)} ORDER BY exit_ts DESC, setup_ts DESC", args).fetchall()
+        return pd.DataFrame(rows, columns=COLUMNS)
+
+
+class SignalEngine:
+    """One strategy's live scan, re-run per symbol only when its candle closes, with logging and tracking."""
+
+    def __init__(self, strategy, log=None):
+        self.strategy, self.log = strategy, log
+        self.interval, self.square_off, _ = STRATEGIES[strategy]
+        self.scan, self.key, self.targets, self.live_ltp, self.params = SCANNERS[strategy]
+        self.memo = {}  # (scan params, symbol) -> (forming bar ts, signal or None)
+        self._lock = threading.Lock()
+
+    def run(self, frames, states, now=None, **params):
+        """Signals for every symbol in frames; the scanner only sees symbols with a newly closed candle."""
+        params = {**self.params, **params}
+        panel, key = as_panel(frames), tuple(sorted(params.items()))
+        with self._lock:
+            changed = [sym for sym in panel if self.memo.get((key, sym), (None,))[0] != panel[sym].ts[-1]]
+            if changed:
+                fresh = {sig[self.key]: sig for sig in self.scan(panel, states, symbols=changed, **params)}
+                for sym in changed: self.memo[(key, sym)] = (int(panel[sym].ts[-1]), fresh.get(sym))
+                if self.log is not None:
+                    self.log.record(self.strategy, self.interval, [
+                        (sym, states[sym].last["ts"], panel[sym].tz, sig["Signal"], sig["Entry"], sig["SL"], *(sig[t] for t in self.targets))
+                        for sym, sig in fresh.items()])
+                    self.track(panel, changed, now)
+            signals = [(sym, self.memo[(key, sym)][1]) for sym in panel]
+        return [{**sig, "LTP": as_price(panel[sym].close[-1])} if self.live_ltp else dict(sig) for sym, sig in signals if sig]
+
+    def track(self, frames, symbols=None, now=None):
+        """Advance logged PENDING/OPEN signals over the closed bars (bars whose interval has ended). -> rows changed."""
+        panel, now = as_panel(frames), time.time() if now is None else now
+        rows = self.log.active(self.strategy, [sym for sym in (symbols if symbols is not None else panel) if sym in panel])
+        bar_seconds, updates = INTERVAL_MINUTES[self.interval] * 60, []
+        for row in rows:
+            bars = panel[row["symbol"]]
+            n = int(np.searchsorted(bars.ts, now - bar_seconds, side="right"))
+            p = int(np.searchsorted(bars.ts[:n], row["setup_ts"]))
+            if p >= n or bars.ts[p] != row["setup_ts"]:
+                # setup bar not closed yet, or already scrolled out of the window before the order could fill
+                if row["status"] == "PENDING" and n and row["setup_ts"] < bars.ts[0]: updates.append({**row, "status": "EXPIRED"})
+                continue
+            arrays = frame_arrays(bars.head(n))
+            trades = execute(arrays, [(p, row["signal"], row["entry"], row["sl"], row["t1"], row["t2"])], self.square_off)
+            if not trades:
+                if p + 1 < n: updates.append({**row, "status": "EXPIRED"})
+                continue
+            _, f, fill, exit_bar, legs = trades[0]
+            # a square-off / end-of-data exit on the newest bar only means the position is still running
+            reason = legs[-1][2]
+            done = reason not in ("EOD", "END") or exit_bar < n - 1 or (reason == "EOD" and now >= nse_session_close(arrays["session"][exit_bar]))
+            row = {**row, "status": "CLOSED" if done else "OPEN", "fill_ts": int(arrays["ts"][f]), "fill": as_price(fill)}
+            if done:
+                avg_exit, pnl, r = trade_result(1 if row["signal"] == "BUY" else -1, fill, row["sl"], legs)
+                row.update(exit_ts=int(arrays["ts"][exit_bar]), exit=as_price(avg_exit), outcome="+".join(reason for _, _, reason in legs), r=r, pnl=pnl)
+            updates.append(row)
+        if updates: self.log.update(updates)
+        return updates
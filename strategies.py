@@ -0,0 +1,218 @@
+"""Signal logic for the live scanners, evaluated on pre-fetched bars."""
+import numpy as np
+import pandas as pd
+
+from bar_panel import as_panel, as_price
+from markets import is_crypto
+from indicators import bollinger, heikin_ashi, stack_panel
+from streaming import session_keys
+
+
+def fmt_ts(ts, tz, fmt):
+    stamp = pd.Timestamp(int(ts), unit="s", tz="UTC")
+    return (stamp.tz_convert(tz) if tz is not None else stamp.tz_localize(None)).strftime(fmt)
+
+
+def exhaustion_signal(symbol, candle, sentiment="BULLISH", entry_buffer=0.50, tz=None, t1_r=2.0, t2_r=3.0):
+    """Opposite-colour, lowest-volume-of-session 5m candle -> BUY/SHORT with 1:2 and 1:3 targets (t1_r / t2_r).
+
+    candle: IndicatorState.last of the last completed bar.
+    """
+    is_lowest_vol = candle["volume"] <= candle["session_min_vol"]
+    is_green = candle["close"] > candle["open"]
+    is_red = candle["close"] < candle["open"]
+    if sentiment == "BULLISH" and is_red and is_lowest_vol:
+        signal, entry, sl = "BUY", candle["high"] + entry_buffer, candle["low"] - entry_buffer
+    elif sentiment == "BEARISH" and is_green and is_lowest_vol:
+        signal, entry, sl = "SHORT", candle["low"] - entry_buffer, candle["high"] + entry_buffer
+    else: return None
+    risk = abs(entry - sl)
+    if risk <= 0: return None
+    return {
+        "Stock": symbol, "Entry": as_price(entry), "LTP": as_price(candle["close"]),
+        "Signal": signal, "SL": as_price(sl), "T1": as_price(entry + (risk*t1_r) if signal=="BUY" else entry - (risk*t1_r)),
+        "T2(1:3)": as_price(entry + (risk*t2_r) if signal=="BUY" else entry - (risk*t2_r)),
+        "EMA_10": as_price(candle["ema"]), "Action": f"Book 50% @ 1:{t2_r:g}", "Time": fmt_ts(candle["ts"], tz, '%H:%M:%S')
+    }
+
+
+SENTIMENT_SIGNALS = {"BULLISH": "BUY", "BEARISH": "SHORT"}
+
+
+def scan_exhaustion(frames, states, sentiment="BULLISH", min_bars=15, min_session_bars=5, symbols=None):
+    """Exhaustion scan from streaming states; only today's session (the forming bar's day) counts.
+
+    sentiment may be a tuple: ("BULLISH", "BEARISH") finds both sides in one pass (a candle is one colour,
+    so a symbol gets at most one signal).
+    """
+    frames, signals = as_panel(frames), []
+    sentiments = (sentiment,) if isinstance(sentiment, str) else sentiment
+    for sym in (frames if symbols is None else symbols):
+        bars, state = frames[sym], states.get(sym)
+        if state is None or state.last is None or len(bars) < min_bars: continue
+        candle = state.last
+        # today's bars = completed ones in the forming bar's session plus the forming bar itself
+        if candle["session"] != session_keys(bars.timestamps(-1))[0] or candle["session_bars"] + 1 < min_session_bars: continue
+        for side in sentiments:
+            sig = exhaustion_signal(sym, candle, side, tz=bars.tz or None)
+            if sig: signals.append(sig)
+    return signals
+
+
+def ha_bb_signal(coin, prev, alert, ltp, buffer_pct=0.001, tz=None, target_r=3.0):
+    """HA high/low re-entering the Bollinger band on the alert candle after piercing it on the previous one."""
+    buffer = alert["close"] * buffer_pct
+    if prev["ha_high"] >= prev["upper"] and alert["ha_high"] < alert["upper"]:
+        signal, entry, sl, target_bb = "SHORT", alert["low"] - buffer, alert["high"] + buffer, alert["lower"]
+    elif prev["ha_low"] <= prev["lower"] and alert["ha_low"] > alert["lower"]:
+        signal, entry, sl, target_bb = "BUY", alert["high"] + buffer, alert["low"] - buffer, alert["upper"]
+    else: return None
+    risk = abs(entry - sl)
+    if risk <= 0: return None
+    return {
+        "Coin": coin, "Signal": signal, "Entry": as_price(entry), "LTP": as_price(ltp),
+        "SL": as_price(sl), "Target(BB)": as_price(target_bb), "Target(1:3)": as_price(entry - (risk*target_r) if signal=="SHORT" else entry + (risk*target_r)),
+        "Time": fmt_ts(alert["ts"], tz, '%d %b, %H:%M')
+    }
+
+
+def scan_ha_bb_incremental(frames, states, min_bars=25, buffer_pct=0.001, symbols=None):
+    """HA+BB scan from streaming states: per refresh only newly closed bars were computed."""
+    frames, signals = as_panel(frames), []
+    for coin in (frames if symbols is None else symbols):
+        bars, state = frames[coin], states.get(coin)
+        if state is None or state.prev is None or len(bars) < min_bars: continue
+        sig = ha_bb_signal(coin, state.prev, state.last, bars.close[-1], buffer_pct, tz=bars.tz or None)
+        if sig: signals.append(sig)
+    return signals
+
+
+def scan_ha_bb(frames, symbols=None, window=20, num_std=2.0, buffer_pct=0.001, min_bars=25):
+    """1H Heikin-Ashi + Bollinger re-entry scan over the whole universe in one panel pass."""
+    frames = as_panel(frames)
+    symbols, counts, p = stack_panel(frames, symbols)
+    if not symbols or p["Close"].shape[0] < 3: return []
+    o, h, l, c = p["Open"], p["High"], p["Low"], p["Close"]
+    _, ha_high, ha_low, _ = heikin_ashi(o, h, l, c)
+    _, upper, lower = bollinger(c, window, num_std)
+
+    # row -2 = last completed (alert) candle, row -3 = the one before it, row -1 = still forming
+    a, b = -2, -3
+    short = (ha_high[b] >= upper[b]) & (ha_high[a] < upper[a])
+    buy = ~short & (ha_low[b] <= lower[b]) & (ha_low[a] > lower[a])
+    buffer = c[a] * buffer_pct
+    entry = np.where(short, l[a] - buffer, h[a] + buffer)
+    sl = np.where(short, h[a] + buffer, l[a] - buffer)
+    target_bb = np.where(short, lower[a], upper[a])
+    risk = np.abs(entry - sl)
+    target_3r = np.where(short, entry - risk * 3, entry + risk * 3)
+    hits = (counts >= min_bars) & (short | buy) & (risk > 0)
+
+    signals = []
+    for j in np.flatnonzero(hits):
+        coin = symbols[j]
+        signals.append({
+            "Coin": coin, "Signal": "SHORT" if short[j] else "BUY", "Entry": as_price(entry[j]), "LTP": as_price(c[-1, j]),
+            "SL": as_price(sl[j]), "Target(BB)": as_price(target_bb[j]), "Target(1:3)": as_price(target_3r[j]),
+            "Time": fmt_ts(frames[coin].ts[-2], frames[coin].tz or None, '%d %b, %H:%M')
+        })
+    return signals
+
+
+def scan_daily_movers(frames, top=5, symbols=None):
+    """Top gainers/losers on the last daily bar plus 3-day same-colour trends -> (gainers, losers, trends)."""
+    frames, gainers, losers, trends = as_panel(frames), [], [], []
+    for ticker in (frames if symbols is None else [s for s in symbols if s in frames]):
+        bars = frames[ticker]
+        try:
+            if len(bars) >= 3:
+                (c3, c2, c1), (o3, o2, o1) = bars.close[-3:].tolist(), bars.open[-3:].tolist()
+
+                if c2 == 0 or pd.isna(c1): continue
+
+                pct_chg = ((c1 - c2) / c2) * 100
+                obj = {"Stock": ticker, "LTP": as_price(c1), "Pct": round(pct_chg, 2)}
+
+                if pct_chg > 0: gainers.append(obj)
+                elif pct_chg < 0: losers.append(obj)
+                if c1 > o1 and c2 > o2 and c3 > o3: trends.append({"Stock": ticker, "Status": "৩ দিন উত্থান", "Color": "green"})
+                elif c1 < o1 and c2 < o2 and c3 < o3: trends.append({"Stock": ticker, "Status": "৩ দিন পতন", "Color": "red"})
+        except: pass
+    return sorted(gainers, key=lambda x: x['Pct'], reverse=True)[:top], sorted(losers, key=lambda x: x['Pct'])[:top], trends
+
+
+def scan_oi_proxy(frames, spike=1.5):
+    """Volume spike on the last bar read as an OI proxy: build-up / short covering / unwinding."""
+    setups = []
+    for ticker, bars in as_panel(frames).items():
+        try:
+            if len(bars) >= 3:
+                (c3, c2, c1), (_, v2, v1) = bars.close[-3:].tolist(), bars.volume[-3:].tolist()
+                if v1 > (v2 * spike):
+                    oi_status = "🔥 High (Spike)"
+                    if c1 > c2:
+                        signal = "Short Covering 🚀" if c2 < c3 else "Long Buildup 📈"
+                        color = "green"
+                    else:
+                        signal = "Long Unwinding ⚠️" if c2 > c3 else "Short Buildup 📉"
+                        color = "red"
+                    setups.append({"Stock": ticker, "Signal": signal, "OI": oi_status, "Color": color})
+        except: pass
+    return setups
+
+
+# median daily traded value a name needs before the intraday scans spend time on it (₹ for NSE;
+# Yahoo quotes crypto volume in USD already)
+MIN_DAILY_TURNOVER = {"nse": 5e7, "crypto": 1e6}
+
+
+def liquid_symbols(frames, symbols, min_turnover=None, lookback=5):
+    """Liquidity pre-filter on daily bars: drops `symbols` whose median turnover over the last `lookback`
+    completed sessions is below the threshold. Names without daily bars are kept, since nothing is known about them."""
+    panel, keep = as_panel(frames), []
+    for sym in symbols:
+        bars = panel.get(sym)
+        if bars is not None and len(bars) >= 2:
+            rows = slice(max(0, len(bars) - 1 - lookback), len(bars) - 1)
+            crypto = is_crypto(sym)
+            value = bars.volume[rows].astype(float) * (1.0 if crypto else bars.close[rows])
+            floor = min_turnover if min_turnover is not None else MIN_DAILY_TURNOVER["crypto" if crypto else "nse"]
+            if not np.nanmedian(value) >= floor: continue
+        keep.append(sym)
+    return keep
+
+
+TRADE_COLUMNS = ["Date", "Setup", "Signal", "Entry", "Exit", "P&L %"]
+
+
+def three_day_reversal_signals(o, c, streak=3):
+    """Fade `streak` same-colour daily candles: enter at the next open, exit at that day's close.
+
+    Array version of the bar loop, every bar evaluated at once from shifted colour masks
+    -> (bar positions, short mask, entry, exit, P&L %) of the bars that trade.
+    """
+    n = len(o)
+    if n <= streak: return np.empty(0, int), np.empty(0, bool), np.empty(0), np.empty(0), np.empty(0)
+    green, red = c > o, c < o
+    # row j <-> bar i = j + streak; candles i-1 .. i-streak must all share a colour
+    all_green, all_red = np.ones(n - streak, bool), np.ones(n - streak, bool)
+    for k in range(1, streak + 1):
+        all_green &= green[streak - k:n - k]
+        all_red &= red[streak - k:n - k]
+    entry, exit_price = o[streak:], c[streak:]
+    hits = np.flatnonzero((all_green | all_red) & (entry > 0))
+    short, entry, exit_price = all_green[hits], entry[hits], exit_price[hits]
+    pnl = np.where(short, entry - exit_price, exit_price - entry) / entry * 100
+    return hits + streak, short, entry, exit_price, np.round(pnl, 2)
+
+
+def trade_frame(dates, short, entry, exit_price, pnl, streak=3):
+    return pd.DataFrame({
+        "Date": dates, "Setup": np.where(short, f"{streak} Days GREEN", f"{streak} Days RED"), "Signal": np.where(short, "SHORT", "BUY"),
+        "Entry": entry, "Exit": exit_price, "P&L %": pnl,
+    }, columns=TRADE_COLUMNS)
+
+
+def three_day_reversal_trades(bt_data, streak=3):
+    pos, short, entry, exit_price, pnl = three_day_reversal_signals(bt_data['Open'].to_numpy(dtype=float), bt_data['Close'].to_numpy(dtype=float), streak)
+    return trade_frame(bt_data.index[pos].strftime('%Y-%m-%d'), short, entry, exit_price, pnl, streak)
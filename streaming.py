@@ -0,0 +1,163 @@
+"""Incremental per-symbol indicator state, updated in O(1) as each bar closes."""
+import json
+import math
+import os
+import threading
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from bar_panel import as_panel
+
+# a backlog this large (a cold start over a whole universe) is worth spreading over worker processes
+SHARD_MIN_BARS, SHARD_MIN_SYMBOLS = 50_000, 32
+
+
+class IndicatorState:
+    """EMA, sliding-window mean/variance (Bollinger), Heikin-Ashi and running session volume minimum.
+
+    `last` / `prev` hold the indicator values of the two most recently closed bars, which is all the
+    live strategies look at.
+    """
+
+    def __init__(self, ema_span=10, bb_window=20, num_std=2.0):
+        self.ema_span, self.bb_window, self.num_std = ema_span, bb_window, num_std
+        self.reset()
+
+    def reset(self):
+        self.last_ts = None
+        self.bars = 0
+        self.ema = None
+        self.window = deque()
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.ha_open = self.ha_close = None
+        self.session = None
+        self.session_bars = 0
+        self.session_min_vol = math.inf
+        self.prev = self.last = None
+
+    def _push_window(self, x):
+        # sliding Welford update: numerically stable even for large prices with tiny variance
+        self.window.append(x)
+        if len(self.window) <= self.bb_window:
+            n = len(self.window)
+            delta = x - self.mean
+            self.mean += delta / n
+            self.m2 += delta * (x - self.mean)
+        else:
+            old = self.window.popleft()
+            new_mean = self.mean + (x - old) / self.bb_window
+            self.m2 += (x - old) * (x - new_mean + old - self.mean)
+            self.mean = new_mean
+
+    def update(self, ts, o, h, l, c, v, session):
+        alpha = 2 / (self.ema_span + 1)
+        self.ema = c if self.ema is None else alpha * c + (1 - alpha) * self.ema
+        self._push_window(c)
+        ha_close = (o + h + l + c) / 4
+        ha_open = o if self.ha_open is None else (self.ha_open + self.ha_close) / 2
+        self.ha_open, self.ha_close = ha_open, ha_close
+        if session != self.session:
+            self.session, self.session_bars, self.session_min_vol = session, 0, math.inf
+        self.session_bars += 1
+        self.session_min_vol = min(self.session_min_vol, v)
+        self.bars += 1
+        self.last_ts = int(ts)
+
+        full = len(self.window) == self.bb_window
+        std = math.sqrt(max(self.m2, 0.0) / (self.bb_window - 1)) if full else math.nan
+        sma = self.mean if full else math.nan
+        self.prev, self.last = self.last, {
+            "ts": int(ts), "session": session, "open": o, "high": h, "low": l, "close": c, "volume": v,
+            "ema": self.ema, "sma": sma, "upper": sma + self.num_std * std, "lower": sma - self.num_std * std,
+            "ha_open": ha_open, "ha_close": ha_close, "ha_high": max(h, ha_open, ha_close), "ha_low": min(l, ha_open, ha_close),
+            "session_bars": self.session_bars, "session_min_vol": self.session_min_vol, "bars": self.bars,
+        }
+
+    def to_json(self):
+        data = {k: v for k, v in self.__dict__.items() if k != "window"}
+        data["window"] = list(self.window)
+        return json.dumps(data)
+
+    @classmethod
+    def from_json(cls, text):
+        data = json.loads(text)
+        state = cls(data["ema_span"], data["bb_window"], data["num_std"])
+        state.__dict__.update({k: v for k, v in data.items() if k != "window"})
+        state.window = deque(data["window"])
+        return state
+
+
+def session_keys(index):
+    # exchange-local calendar day of each bar (IST for NSE, UTC for crypto)
+    # format each distinct day once: strftime per bar dominated long intraday replays
+    codes, days = pd.factorize(pd.DatetimeIndex(index).normalize())
+    return days.strftime("%Y-%m-%d").to_numpy(dtype=object)[codes].tolist()
+
+
+def _fold_chunk(items):
+    """[(symbol, state, bars view, start)] -> [(symbol, advanced state)] in a worker process."""
+    for _, state, bars, start in items: IndicatorEngine._fold(state, bars, start)
+    return [(sym, state) for sym, state, _, _ in items]
+
+
+class IndicatorEngine:
+    """Keeps one IndicatorState per symbol for an interval and folds in only newly closed bars.
+
+    The last bar of each frame is treated as still forming and is never folded in. States are
+    checkpointed into the BarStore next to the bars they were built from. A large backlog (a cold
+    start over a whole universe) is sharded over the executor; steady-state updates stay in-process.
+    """
+
+    def __init__(self, interval, store=None, ema_span=10, bb_window=20, num_std=2.0):
+        self.interval = interval
+        self.store = store
+        self.params = {"ema_span": ema_span, "bb_window": bb_window, "num_std": num_std}
+        self.key = f"ema{ema_span}_bb{bb_window}x{num_std}"
+        self.states = {}
+        self._lock = threading.Lock()
+
+    def update(self, frames, executor=None, workers=None):
+        with self._lock:
+            missing = [s for s in frames if s not in self.states]
+            if self.store is not None and missing:
+                self.states.update(self.store.load_states(missing, self.interval, self.key))
+            pending = []
+            for sym, bars in as_panel(frames).items():
+                state = self.states.setdefault(sym, IndicatorState(**self.params))
+                start = self._pending(state, bars)
+                if start is not None: pending.append((sym, state, bars, start))
+            backlog = sum(len(bars) - 1 - start for _, _, bars, start in pending)
+            workers = workers or min(8, os.cpu_count() or 1)
+            if executor is not None and workers > 1 and backlog >= SHARD_MIN_BARS and len(pending) >= SHARD_MIN_SYMBOLS:
+                size = math.ceil(len(pending) / workers)
+                for chunk in executor.map(_fold_chunk, [pending[i:i + size] for i in range(0, len(pending), size)]):
+                    self.states.update(chunk)
+            else:
+                for _, state, bars, start in pending: self._fold(state, bars, start)
+            dirty = {sym: self.states[sym] for sym, _, _, _ in pending}
+            if self.store is not None and dirty:
+                self.store.save_states(dirty, self.interval, self.key)
+            return {sym: self.states[sym] for sym in frames}
+
+    @staticmethod
+    def _pending(state, bars):
+        """Index of the first closed bar the state has not seen, or None when it is up to date."""
+        closed = len(bars) - 1
+        if closed <= 0: return None
+        # history gap larger than what we hold (or a fresh state): rebuild from the bars
+        if state.last_ts is None or state.last_ts < bars.ts[0]:
+            state.reset()
+            return 0
+        start = int(np.searchsorted(bars.ts[:closed], state.last_ts, side="right"))
+        return start if start < closed else None
+
+    @staticmethod
+    def _fold(state, bars, start):
+        closed = len(bars) - 1
+        sessions = session_keys(bars.timestamps(start, closed))
+        ts, o, h, l, c, v = (a[start:closed].tolist() for a in (bars.ts, bars.open, bars.high, bars.low, bars.close, bars.volume))
+        for i in range(closed - start):
+            state.update(ts[i], o[i], h[i], l[i], c[i], v[i], sessions[i])
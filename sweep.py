@@ -0,0 +1,196 @@
+"""Parameter sweeps over the live strategies' constants, ranked by their walk-forward results.
+
+Setups for every combination come from indicator arrays computed once per (symbol, window) and
+shared by all combinations that use them; fills go through walkforward.execute, the same engine as
+the intraday backtest. Symbols are sharded over the process pool, so each worker builds a symbol's
+indicators once and runs the whole grid against them.
+"""
+import itertools
+import math
+
+import numpy as np
+import pandas as pd
+
+from backtest import DEFAULT_WORKERS, max_drawdown
+from bar_panel import as_panel
+from markets import is_crypto
+from indicators import heikin_ashi
+from walkforward import STRATEGIES, execute, frame_arrays, trade_result
+
+# strategy -> {parameter: candidate values}; each list includes the live constant
+PARAM_GRIDS = {
+    "exhaustion": {"entry_buffer": [0.25, 0.50, 0.75, 1.0], "t1_r": [1.5, 2.0, 2.5], "t2_r": [2.5, 3.0, 4.0], "ema_span": [0, 10, 20]},
+    "ha_bb": {"bb_window": [14, 20, 26], "num_std": [1.5, 2.0, 2.5], "buffer_pct": [0.0005, 0.001, 0.002], "target_r": [2.0, 3.0, 4.0]},
+    "oi_proxy": {"spike": [1.25, 1.5, 2.0, 2.5, 3.0], "hold": [1, 2, 4]},
+}
+INTERVALS = {"exhaustion": "5m", "ha_bb": "1h", "oi_proxy": "15m"}
+# oi_proxy: trade the spike bar's direction from the next open for `hold` bars (get_oi_simulation's 1.5x)
+LIVE_PARAMS = {**{name: defaults for name, (_, _, defaults) in STRATEGIES.items()}, "oi_proxy": {"spike": 1.5, "hold": 1}}
+RESULT_COLUMNS = ["Trades", "Win Rate %", "Total P&L %", "Avg P&L %", "Avg R", "Max Drawdown %"]
+
+
+def grid_combos(grid):
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*grid.values())]
+
+
+def random_combos(grid, n, seed=0):
+    """`n` distinct combinations drawn uniformly from the grid without enumerating it."""
+    keys, sizes = list(grid), [len(v) for v in grid.values()]
+    total = math.prod(sizes)
+    picks = np.random.default_rng(seed).choice(total, size=min(n, total), replace=False)
+    return [{k: grid[k][i] for k, i in zip(keys, idx)} for idx in zip(*np.unravel_index(np.sort(picks), sizes))]
+
+
+class SymbolBars:
+    """One symbol's bar arrays with indicator arrays memoized per window for every combination."""
+
+    def __init__(self, sym, bars):
+        self.sym, self.bars = sym, bars
+        self.memo = {}
+        self.computed = 0
+
+    def _cached(self, key, compute):
+        if key not in self.memo:
+            self.memo[key] = compute()
+            self.computed += 1
+        return self.memo[key]
+
+    def ema(self, span):
+        # adjust=False seeded with the first close: IndicatorState's recursion
+        return self._cached(("ema", span), lambda: pd.Series(self.bars["close"]).ewm(span=span, adjust=False).mean().to_numpy())
+
+    def bands(self, window):
+        """(sma, sample std); num_std only scales the std, so every width shares one rolling pass."""
+        def compute():
+            roll = pd.Series(self.bars["close"]).rolling(window)
+            return roll.mean().to_numpy(), roll.std().to_numpy()
+        return self._cached(("bands", window), compute)
+
+    def heikin_ashi(self):
+        def compute():
+            b = self.bars
+            _, ha_high, ha_low, _ = heikin_ashi(*(b[f][:, None] for f in ("open", "high", "low", "close")))
+            return ha_high[:, 0], ha_low[:, 0]
+        return self._cached(("ha",), compute)
+
+    def sessions(self):
+        """(bars so far in the session, lowest volume of the session so far, next bar in the same session)."""
+        def compute():
+            codes = pd.factorize(pd.Index(self.bars["session"]))[0]
+            starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+            count = np.arange(len(codes)) - starts[np.searchsorted(starts, np.arange(len(codes)), side="right") - 1] + 1
+            vol = self.bars["volume"]
+            lowest = vol <= pd.Series(vol).groupby(codes).cummin().to_numpy()
+            return count, lowest, np.r_[codes[1:] == codes[:-1], False]
+        return self._cached(("sessions",), compute)
+
+
+def _plans(ok, signal, entry, sl, t1, t2):
+    idx = np.flatnonzero(ok)
+    sig = signal[idx] if isinstance(signal, np.ndarray) else [signal] * len(idx)
+    return list(zip(idx.tolist(), sig, entry[idx].tolist(), sl[idx].tolist(), t1[idx].tolist(), t2[idx].tolist()))
+
+
+def exhaustion_plans(sb, p):
+    """Vectorized _exhaustion_setup over every bar for one parameter set."""
+    b = sb.bars
+    o, h, l, c = b["open"], b["high"], b["low"], b["close"]
+    count, lowest, next_same = sb.sessions()
+    buy = p["sentiment"] == "BULLISH"
+    ok = (np.arange(len(c)) + 2 >= p["min_bars"]) & next_same & (count + 1 >= p["min_session_bars"]) & lowest & ((c < o) if buy else (c > o))
+    entry, sl = (h + p["entry_buffer"], l - p["entry_buffer"]) if buy else (l - p["entry_buffer"], h + p["entry_buffer"])
+    risk = np.abs(entry - sl)
+    ok &= risk > 0
+    if p["ema_span"]: ok &= ((c - sb.ema(p["ema_span"])) * (1 if buy else -1)) > 0
+    t1, t2 = (entry + risk * p["t1_r"], entry + risk * p["t2_r"]) if buy else (entry - risk * p["t1_r"], entry - risk * p["t2_r"])
+    return _plans(ok, "BUY" if buy else "SHORT", entry, sl, t1, t2)
+
+
+def ha_bb_plans(sb, p):
+    """Vectorized _ha_bb_setup: HA extreme back inside the band on bar i after piercing it on i-1."""
+    b = sb.bars
+    h, l, c = b["high"], b["low"], b["close"]
+    ha_high, ha_low = sb.heikin_ashi()
+    sma, std = sb.bands(p["bb_window"])
+    upper, lower = sma + p["num_std"] * std, sma - p["num_std"] * std
+    short = np.r_[False, (ha_high[:-1] >= upper[:-1]) & (ha_high[1:] < upper[1:])]
+    buy = ~short & np.r_[False, (ha_low[:-1] <= lower[:-1]) & (ha_low[1:] > lower[1:])]
+    i = np.arange(len(c))
+    buffer = c * p["buffer_pct"]
+    entry = np.where(short, l - buffer, h + buffer)
+    sl = np.where(short, h + buffer, l - buffer)
+    risk = np.abs(entry - sl)
+    ok = (short | buy) & (risk > 0) & (i + 2 >= p["min_bars"]) & (i + 1 < len(c))
+    return _plans(ok, np.where(short, "SHORT", "BUY"), entry, sl, np.where(short, lower, upper),
+                  np.where(short, entry - risk * p["target_r"], entry + risk * p["target_r"]))
+
+
+def _replay(plans_fn, square_off):
+    def evaluate(sb, p):
+        trades = execute(sb.bars, plans_fn(sb, p), square_off, p.get("partial", 0.5), p.get("order_ttl", 1), p.get("max_hold"))
+        rows = [(*trade_result(1 if plan[1] == "BUY" else -1, fill, plan[3], legs)[1:], exit_bar) for plan, _, fill, exit_bar, legs in trades]
+        pnl, r, exit_bar = (np.array(col, dtype=float) for col in zip(*rows)) if rows else (np.empty(0),) * 3
+        return pnl, r, sb.bars["ts"][exit_bar.astype(int)]
+    return evaluate
+
+
+def oi_proxy_trades(sb, p):
+    """scan_oi_proxy's volume spike on bar i, traded in the bar's direction from the next open for `hold` bars."""
+    b = sb.bars
+    o, c, v = b["open"], b["close"], b["volume"]
+    n, hold = len(c), int(p["hold"])
+    i = np.arange(2, max(2, n - hold))
+    ok = v[i] > v[i - 1] * p["spike"]
+    if not is_crypto(sb.sym): ok &= b["session_end"][i + 1] >= i + hold  # NSE: flat by the close
+    i = i[ok & (o[i + 1] > 0)]
+    side = np.where(c[i] > c[i - 1], 1.0, -1.0)
+    pnl = np.round(side * (c[i + hold] - o[i + 1]) / o[i + 1] * 100, 2)
+    return pnl, np.full(len(i), np.nan), b["ts"][i + hold]
+
+
+EVALUATORS = {"exhaustion": _replay(exhaustion_plans, STRATEGIES["exhaustion"][1]), "ha_bb": _replay(ha_bb_plans, STRATEGIES["ha_bb"][1]),
+              "oi_proxy": oi_proxy_trades}
+
+
+def _sweep_chunk(items, strategy, combos, options):
+    """items: [(symbol, bar arrays)] -> ([(P&L %, R, exit ts) per combination], indicator arrays computed)."""
+    evaluate, base = EVALUATORS[strategy], {**LIVE_PARAMS[strategy], **options}
+    parts, computed = [[] for _ in combos], 0
+    for sym, bars in items:
+        sb = SymbolBars(sym, bars)
+        for k, combo in enumerate(combos): parts[k].append(evaluate(sb, {**base, **combo}))
+        computed += sb.computed
+    return [tuple(np.concatenate(col) for col in zip(*p)) if p else (np.empty(0),) * 3 for p in parts], computed
+
+
+def score(pnl, r, ts):
+    """Sweep row for one combination; drawdown runs on the portfolio curve summed per exit bar."""
+    if not len(pnl): return dict.fromkeys(RESULT_COLUMNS, 0.0) | {"Trades": 0}
+    uniq, inv = np.unique(ts, return_inverse=True)
+    curve = np.bincount(inv, weights=pnl, minlength=len(uniq))
+    return {"Trades": len(pnl), "Win Rate %": round(float((pnl > 0).mean() * 100), 2), "Total P&L %": round(float(pnl.sum()), 2),
+            "Avg P&L %": round(float(pnl.mean()), 2), "Avg R": round(float(np.nanmean(r)), 2) if not np.isnan(r).all() else np.nan,
+            "Max Drawdown %": round(max_drawdown(curve), 2)}
+
+
+def run_sweep(frames, strategy, combos, executor=None, workers=DEFAULT_WORKERS, rank_by="Total P&L %", min_trades=1, **options):
+    """Evaluate every combination over every symbol -> (ranked table, indicator arrays computed).
+
+    options: fixed strategy or execution settings (sentiment, partial, order_ttl, max_hold).
+    """
+    items = [(sym, frame_arrays(bars)) for sym, bars in as_panel(frames).items() if len(bars) > 2]
+    if executor is not None and workers > 1 and len(items) > 1:
+        size = math.ceil(len(items) / workers)
+        chunks = [items[i:i + size] for i in range(0, len(items), size)]
+        results = list(executor.map(_sweep_chunk, chunks, [strategy] * len(chunks), [combos] * len(chunks), [options] * len(chunks)))
+    else: results = [_sweep_chunk(items, strategy, combos, options)]
+    live = {k: LIVE_PARAMS[strategy][k] for k in PARAM_GRIDS[strategy]}
+    rows = []
+    for k, combo in enumerate(combos):
+        pnl, r, ts = (np.concatenate([parts[k][f] for parts, _ in results]) for f in range(3))
+        rows.append({**combo, **score(pnl, r, ts), "Live": "✅" if {key: combo.get(key, live[key]) for key in live} == live else ""})
+    table = pd.DataFrame(rows, columns=list(combos[0]) + RESULT_COLUMNS + ["Live"]) if rows else pd.DataFrame(columns=RESULT_COLUMNS + ["Live"])
+    table = table[table["Trades"] >= min_trades]
+    ascending = rank_by == "Max Drawdown %"
+    return table.sort_values(rank_by, ascending=ascending, ignore_index=True, kind="stable"), sum(n for _, n in results)
@@ -0,0 +1,7 @@
+import os
+import sys
+import tempfile
+
+# the modules live flat at the repo root; keep their on-disk state out of the working tree
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("HARIDAS_DATA_DIR", tempfile.mkdtemp(prefix="haridas-tests-"))
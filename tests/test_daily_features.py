@@ -0,0 +1,50 @@
+import pandas as pd
+import pytest
+
+import data_sources
+import engine
+import market_data
+import strategies
+import universe
+from bar_panel import BarPanel
+from daily_features import DailyFeatures
+from fetch_pipeline import FetchPipeline
+from markets import NSE_TZ
+
+
+@pytest.mark.parametrize("end", ["2026-10-16 08:50", "2026-10-16 11:02", "2026-10-16 16:30", "2026-10-17 11:00"])
+def test_movers_match_scan_daily_movers(end):
+    # NSE pre-market, NSE session, after the NSE close, and a weekend (crypto only has a forming bar)
+    src = data_sources.SyntheticSource(end=end)
+    markets = [universe.load_universe(m).symbols for m in ("nse", "crypto")]
+    symbols = [s for m in markets for s in m]
+    ten, five = BarPanel.from_frames(src(symbols, "10d", "1d")), BarPanel.from_frames(src(symbols, "5d", "1d"))
+    features = DailyFeatures.build(ten, now=pd.Timestamp(end, tz=NSE_TZ).to_pydatetime())
+    for subset in markets:
+        expected = strategies.scan_daily_movers(ten, symbols=subset)
+        assert any(expected)
+        assert features.movers(five, subset) == expected
+
+
+def test_symbols_missing_from_the_session_build_are_fetched_again(monkeypatch):
+    src, calls = data_sources.SyntheticSource(end="2026-10-16 11:02"), []
+
+    def flaky(symbols, period, interval, start=None):
+        calls.append(list(symbols))
+        return {s: df for s, df in src(symbols, period, interval, start).items() if len(calls) > 1 or s != "INFY.NS"}
+
+    monkeypatch.setattr(market_data, "PIPELINE", FetchPipeline(rate=1e9, burst=1e9))
+    monkeypatch.setattr(engine, "FEATURES_RETRY", 0)
+    market_data.set_source(flaky)
+    try:
+        eng = engine.Engine()
+        monkeypatch.setattr(eng, "symbols", lambda market=None: ["TCS.NS", "INFY.NS", "BTC-USD"])
+        assert eng.built_features is None
+        features = eng.daily_features(["TCS.NS"])
+        assert "INFY.NS" not in features.row and "TCS.NS" in features.row and eng.built_features is features
+        features = eng.daily_features(["TCS.NS", "INFY.NS"])
+        assert calls[-1] == ["INFY.NS"]
+        assert features.symbols == ["TCS.NS", "BTC-USD", "INFY.NS"]
+        assert features.frame().loc["INFY.NS"].equals(
+            type(features).build(market_data.fetch_bars(["INFY.NS"], "10d", "1d"), key=features.key).frame().loc["INFY.NS"])
+    finally: market_data.set_source(None)
@@ -0,0 +1,21 @@
+import json
+import os
+
+import bar_store
+import engine
+import market_data
+
+
+def _snapshot():
+    os.makedirs(bar_store.DATA_DIR, exist_ok=True)
+    return {e.name: e.stat().st_mtime_ns for e in os.scandir(bar_store.DATA_DIR)}
+
+
+def test_offline_source_leaves_the_terminal_data_alone(tmp_path):
+    before, out = _snapshot(), tmp_path / "signals.json"
+    try:
+        for argv in (["exhaustion"], ["movers", "--market", "crypto"]):
+            assert engine.main([*argv, "--source", "synthetic", "--out", str(out)]) == 0
+            assert isinstance(json.loads(out.read_text()), list)
+    finally: market_data.set_source(None)
+    assert _snapshot() == before
@@ -0,0 +1,51 @@
+import threading
+import time
+
+from fetch_pipeline import CircuitBreaker, FetchPipeline
+
+
+def _open(reset_seconds=0.05):
+    breaker = CircuitBreaker(threshold=1, reset_seconds=reset_seconds)
+    breaker.record(False)
+    assert breaker.state == "open" and not breaker.allow()
+    time.sleep(reset_seconds * 1.5)
+    assert breaker.state == "half-open"
+    return breaker
+
+
+def test_half_open_admits_a_single_probe():
+    breaker, admitted, start = _open(), [], threading.Barrier(16)
+
+    def caller():
+        start.wait()
+        admitted.append(breaker.allow())
+    threads = [threading.Thread(target=caller) for _ in range(16)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert admitted.count(True) == 1
+    breaker.record(True)
+    assert breaker.state == "closed" and all(breaker.allow() for _ in range(5))
+
+
+def test_failed_probe_reopens_and_a_lost_probe_expires():
+    breaker = _open()
+    assert breaker.allow() and not breaker.allow()
+    breaker.record(False)
+    assert breaker.state == "open" and not breaker.allow()
+    time.sleep(0.08)
+    assert breaker.allow() and not breaker.allow()  # this probe never records...
+    time.sleep(0.08)
+    assert breaker.allow()  # ...so another caller gets to probe after reset_seconds
+
+
+def test_recovering_host_gets_one_request_not_the_burst():
+    pipeline, calls = FetchPipeline(max_concurrency=8, rate=1e9, burst=1e9, retries=0, breaker_threshold=1, breaker_reset_seconds=0.05), []
+
+    def fetch(chunk):
+        calls.append(chunk)
+        time.sleep(0.02)
+        return {}
+    pipeline.run("host", fetch, [["A"]])
+    time.sleep(0.08)
+    pipeline.run("host", fetch, [[s] for s in "BCDEFGH"])
+    assert len(calls) == 2
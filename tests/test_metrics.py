@@ -0,0 +1,10 @@
+from metrics import Registry
+
+
+def test_label_values_and_help_are_escaped():
+    reg = Registry()
+    reg.inc("haridas_fetch_attempts_total", help_text="Chunk fetch\nattempts \\ outcome", host='a"b\\c\nd', result="ok")
+    text = reg.prometheus_text()
+    assert "# HELP haridas_fetch_attempts_total Chunk fetch\\nattempts \\\\ outcome\n" in text
+    assert 'haridas_fetch_attempts_total{host="a\\"b\\\\c\\nd",result="ok"} 1\n' in text
+    assert len(text.splitlines()) == 3
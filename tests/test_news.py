@@ -0,0 +1,105 @@
+import http.server
+import threading
+import time
+
+import pytest
+
+import news
+
+
+def rss(items):
+    return ("<?xml version='1.0'?><rss><channel>" + "".join(
+        f"<item><title>{title}</title><link>http://example.test/{guid}</link><guid>{guid}</guid>"
+        f"<pubDate>Fri, 16 Oct 2026 10:{i:02d}:00 +0530</pubDate></item>" for i, (guid, title) in enumerate(items)) + "</channel></rss>").encode()
+
+
+@pytest.fixture
+def server():
+    """Local feed server: routes maps path -> (status, headers, body, delay seconds); requests records (path, headers)."""
+    routes, requests = {}, []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args): pass
+
+        def do_GET(self):
+            requests.append((self.path, dict(self.headers)))
+            status, headers, body, delay = routes[self.path]
+            time.sleep(delay)
+            if status == 200 and "ETag" in headers and self.headers.get("If-None-Match") == headers["ETag"]: status, body = 304, b""
+            self.send_response(status)
+            for name, value in {**headers, "Content-Length": str(len(body))}.items(): self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    httpd.routes, httpd.requests, httpd.url = routes, requests, f"http://127.0.0.1:{httpd.server_port}"
+    yield httpd
+    httpd.shutdown()
+
+
+def test_slow_feed_is_indexed_after_refresh_times_out(server):
+    server.routes["/fast"] = (200, {"ETag": '"f1"'}, rss([("f1", "Infosys wins a large deal")]), 0)
+    server.routes["/slow"] = (200, {"ETag": '"s1"'}, rss([("s1", "Reliance shares jump")]), 1.0)
+    feed = news.NewsFeed([server.url + "/fast", server.url + "/slow"], symbols=["INFY.NS", "RELIANCE.NS"])
+    assert feed.refresh(timeout=0.3) == 1
+    deadline = time.time() + 5
+    while not feed.related("RELIANCE.NS") and time.time() < deadline: time.sleep(0.05)
+    assert [h[0] for h in feed.related("RELIANCE.NS")] == ["Reliance shares jump"]
+    assert {h[0] for h in feed.headlines(5)} == {"Infosys wins a large deal", "Reliance shares jump"}
+    # the slow feed's validators were saved with its items indexed: the next poll is a 304 and loses nothing
+    assert feed.refresh(timeout=5) == 0
+    assert feed.feeds[server.url + "/slow"].status == 304
+    assert len(feed.headlines(5)) == 2
+
+
+def test_relative_redirect_is_resolved_and_validators_stay_on_their_host(server):
+    other = http.server.ThreadingHTTPServer(("127.0.0.1", 0), server.RequestHandlerClass)  # same routes and request log
+    threading.Thread(target=other.serve_forever, daemon=True).start()
+    try:
+        server.routes["/feed"] = (200, {"ETag": '"v1"'}, rss([("a1", "Markets close flat")]), 0)
+        server.routes["/old"] = (301, {"Location": "/feed"}, b"", 0)
+        server.routes["/moved"] = (302, {"Location": f"http://127.0.0.1:{other.server_port}/feed"}, b"", 0)
+        feed = news.NewsFeed([server.url + "/old"])
+        assert feed.refresh() == 1
+        assert [path for path, _ in server.requests] == ["/old", "/feed"]
+        # same host: the second poll is conditional all the way through and costs a 304
+        assert feed.refresh() == 0 and feed.feeds[server.url + "/old"].status == 304
+        assert server.requests[-1][1].get("If-None-Match") == '"v1"'
+
+        state = news.FeedState(server.url + "/moved")
+        state.etag, state.modified = '"v1"', "Fri, 16 Oct 2026 04:30:00 GMT"
+        _, conn, resp = feed._get(state, state.url)
+        resp.read()
+        conn.close()
+        (_, moved), (_, target) = server.requests[-2:]
+        assert moved.get("If-None-Match") == '"v1"' and moved.get("If-Modified-Since")
+        assert target["Host"] == f"127.0.0.1:{other.server_port}"
+        assert "If-None-Match" not in target and "If-Modified-Since" not in target
+        assert resp.status == 200
+    finally:
+        other.shutdown()
+
+
+def test_stale_pooled_connection_retries_on_a_new_one(server):
+    server.routes["/feed"] = (200, {}, rss([("a1", "Markets close flat")]), 0)
+    feed = news.NewsFeed([server.url + "/feed"])
+    host = server.url.split("//")[1]
+    stale = []
+    for _ in range(2):
+        conn = feed.pool.connect("http", host)
+        conn.sock = _BrokenSocket()
+        stale.append(conn)
+    feed.pool.idle[("http", host)] = list(stale)
+    assert feed.refresh() == 1
+    # one stale connection was tried, the retry went to a new one, the other stale one was never handed out
+    idle = feed.pool.idle[("http", host)]
+    assert idle[0] is stale[0] and len(idle) == 2 and idle[1] not in stale
+
+
+class _BrokenSocket:
+    def sendall(self, data): raise BrokenPipeError("stale")
+
+    def close(self): pass
@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+import risk
+
+
+def test_zero_horizon_gives_flat_paths():
+    for pnl in ([], [0.01, -0.02]):
+        sim = risk.simulate(np.array(pnl), np.full(len(pnl), 0.015), paths=100, horizon=0)
+        assert all(len(v) == 100 for v in sim.values())
+        assert risk.summarize(sim) == {"Paths": 100, "Risk of Ruin %": 0.0, "Liquidation %": 0.0, "Median Max Drawdown %": 0.0,
+                                       "P95 Max Drawdown %": 0.0, "Median Return %": 0.0, "Loss Probability %": 0.0}
+
+
+def test_empty_trade_list_raises():
+    with pytest.raises(ValueError, match="no trades"):
+        risk.simulate(np.array([]), np.array([]), paths=100)
+    with pytest.raises(ValueError, match="no trades"):
+        risk.simulate(np.array([]), np.array([]), paths=100, horizon=10)
+
+
+def test_simulation_is_reproducible_and_sized_by_the_stop():
+    pnl, stop = np.array([0.02, -0.01, 0.015, -0.005]), np.full(4, 0.01)
+    a, b = risk.simulate(pnl, stop, paths=3000, horizon=20, seed=7), risk.simulate(pnl, stop, paths=3000, horizon=20, seed=7)
+    assert all(np.array_equal(a[k], b[k]) for k in a) and len(a["final"]) == 3000
+    # 2% risk at a 1% stop = 2x notional: a +2% trade is +4% of equity
+    returns, liquidated = risk.sized_returns(pnl, stop)
+    np.testing.assert_allclose(returns, [0.04, -0.02, 0.03, -0.01])
+    assert not liquidated.any() and not a["liquidated"].any()
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import data_sources
+import strategies
+import universe
+from bar_panel import BarPanel
+from indicators import bollinger, heikin_ashi
+from streaming import IndicatorEngine, IndicatorState, session_keys
+
+
+@pytest.fixture(scope="module")
+def panel():
+    src = data_sources.SyntheticSource(end="2026-10-16 11:02")
+    return BarPanel.from_frames(src(["SBIN.NS", "BTC-USD", "ETH-USD"], "5d", "5m"))
+
+
+def test_state_matches_batch_indicators_at_every_bar(panel):
+    for sym, bars in panel.items():
+        state, rows = IndicatorState(), []
+        sessions = session_keys(bars.timestamps(0, len(bars)))
+        for i in range(len(bars)):
+            state.update(bars.ts[i], float(bars.open[i]), float(bars.high[i]), float(bars.low[i]), float(bars.close[i]),
+                         float(bars.volume[i]), sessions[i])
+            rows.append(state.last)
+        got = pd.DataFrame(rows)
+        o, h, l, c = (np.asarray(a, dtype=float)[:, None] for a in (bars.open, bars.high, bars.low, bars.close))
+        ha_open, ha_high, ha_low, ha_close = heikin_ashi(o, h, l, c)
+        sma, upper, lower = bollinger(c)
+        ema = pd.Series(c[:, 0]).ewm(span=10, adjust=False).mean().to_numpy()
+        for name, expected in (("ema", ema), ("sma", sma), ("upper", upper), ("lower", lower), ("ha_open", ha_open),
+                               ("ha_high", ha_high), ("ha_low", ha_low), ("ha_close", ha_close)):
+            np.testing.assert_allclose(got[name].to_numpy(), np.ravel(expected), rtol=1e-9, err_msg=f"{sym} {name}")
+        days = pd.Series(sessions)
+        np.testing.assert_array_equal(got["session_min_vol"], pd.Series(bars.volume.astype(float)).groupby(days).cummin())
+
+
+def test_session_keys_match_per_bar_formatting(panel):
+    for sym, bars in panel.items():
+        index = bars.timestamps(0, len(bars))
+        assert session_keys(index) == [t.strftime("%Y-%m-%d") for t in index]
+
+
+def test_incremental_scan_matches_batch_scan():
+    src = data_sources.SyntheticSource(end="2026-10-16 11:02")
+    symbols = universe.load_universe("crypto").symbols
+    frames = BarPanel.from_frames(src(symbols, "30d", "1h"))
+    engine = IndicatorEngine("1h")
+    # fold all but the last 5 bars first, then catch up: the states end where a cold fold ends
+    engine.update(BarPanel.from_frames({s: frames[s].frame().iloc[:-5] for s in symbols}))
+    states = engine.update(frames)
+    assert all(states[s].last_ts == frames[s].ts[-2] for s in symbols)
+    expected = strategies.scan_ha_bb(frames, symbols)
+    got = strategies.scan_ha_bb_incremental(frames, states, symbols=symbols)
+    assert expected
+    assert [(s["Coin"], s["Signal"]) for s in got] == [(s["Coin"], s["Signal"]) for s in expected]
+    for a, b in zip(got, expected):
+        assert a["Entry"] == pytest.approx(b["Entry"]) and a["SL"] == pytest.approx(b["SL"])
+    # prices come from float32 bars: emitted as the decimals they stand for, not with float32 noise
+    for sig in got + expected:
+        for field in ("Entry", "LTP", "SL", "Target(BB)", "Target(1:3)"): assert repr(sig[field]) == str(np.float32(sig[field]))
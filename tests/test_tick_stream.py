@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import data_sources
+import engine
+import market_data
+import resample
+import tick_stream
+from fetch_pipeline import FetchPipeline
+from markets import NSE_OPEN_MINUTES, NSE_TZ, is_crypto
+
+SYMBOLS = ["SBIN.NS", "INFY.NS", "BTC-USD", "ETH-USD"]
+PRICES = ["Open", "High", "Low", "Close"]
+
+
+@pytest.fixture(scope="module")
+def replay():
+    src = data_sources.SyntheticSource(end=pd.Timestamp("2026-10-16 15:29", tz=NSE_TZ))
+    frames = src(SYMBOLS, "5d", "1m")
+    agg = tick_stream.TickAggregator(capacity={"1m": 400, "5m": 400, "15m": 200, "1h": 400, "1d": 30})
+    agg.on_ticks(tick_stream.ticks_from_bars(frames))
+    return frames, agg
+
+
+@pytest.mark.parametrize("interval", ["1m", "5m", "15m", "1h", "1d"])
+def test_tick_ring_bars_match_resample(replay, interval):
+    frames, agg = replay
+    panel = agg.panel(SYMBOLS, interval, "5d")
+    for sym in SYMBOLS:
+        tz, session_open = ("UTC", 0) if is_crypto(sym) else (NSE_TZ, NSE_OPEN_MINUTES)
+        expected = frames[sym] if interval == "1m" else resample.resample_bars(frames[sym], interval, tz, session_open)
+        got = panel[sym].frame()
+        assert len(got)
+        expected = expected.iloc[-len(got):]
+        assert got.index.equals(expected.index)
+        np.testing.assert_allclose(got[PRICES].to_numpy(), expected[PRICES].to_numpy(), rtol=1e-6)
+        np.testing.assert_allclose(got["Volume"].to_numpy(), expected["Volume"].to_numpy(), rtol=1e-5)
+
+
+def test_seeded_ring_continues_from_ticks(replay):
+    frames, _ = replay
+    src = data_sources.SyntheticSource(end=pd.Timestamp("2026-10-16 15:29", tz=NSE_TZ))
+    head = src(["SBIN.NS"], "5d", "5m")["SBIN.NS"].iloc[:-10]
+    agg = tick_stream.TickAggregator()
+    agg.seed({"SBIN.NS": head}, "5m", "5d", ["SBIN.NS", "EMPTY.NS"])
+    assert agg.missing(["SBIN.NS", "EMPTY.NS", "X.NS"], "5m", "5d") == ["X.NS"]
+    agg.on_ticks([t for t in tick_stream.ticks_from_bars({"SBIN.NS": frames["SBIN.NS"]}) if t[1] >= head.index[-1].timestamp()])
+    got = agg.panel(["SBIN.NS"], "5m", "5d")["SBIN.NS"].frame()
+    expected = resample.resample_bars(frames["SBIN.NS"], "5m", NSE_TZ, NSE_OPEN_MINUTES)
+    np.testing.assert_allclose(got[PRICES].iloc[-10:].to_numpy(), expected[PRICES].iloc[-10:].to_numpy(), rtol=1e-6)
+
+
+def test_symbols_without_ticks_are_polled_or_flagged_stale(monkeypatch):
+    src, served = data_sources.SyntheticSource(end="2026-10-16 11:02"), {"BTC-USD", "ETH-USD"}
+    monkeypatch.setattr(market_data, "PIPELINE", FetchPipeline(rate=1e9, burst=1e9))
+    market_data.set_source(lambda symbols, period, interval, start=None: {
+        s: df for s, df in src(symbols, period, interval, start).items() if s in served})
+    try:
+        stream = tick_stream.TickStream(feed=None)
+        eng = engine.Engine(stream=stream)
+        polled = market_data.fetch_quotes(["ETH-USD"])["ETH-USD"]  # what the terminal shows without a feed
+        quotes = eng.quotes(["BTC-USD", "ETH-USD"])
+        assert quotes["ETH-USD"] == polled and not quotes["BTC-USD"][3]
+        stream.aggregator.on_ticks([("BTC-USD", pd.Timestamp("2026-10-16 11:02", tz=NSE_TZ).timestamp(), 12345.0, 1.0)])
+        quotes = eng.quotes(["BTC-USD", "ETH-USD"])
+        assert quotes["BTC-USD"][0] == 12345.0 and not quotes["BTC-USD"][3]
+        assert quotes["ETH-USD"] == polled
+        served.discard("ETH-USD")  # upstream has nothing either: keep the last price, flagged stale
+        stale = eng.quotes(["ETH-USD"])["ETH-USD"]
+        assert stale[3] and stale[0] == pytest.approx(polled[0], rel=1e-6)
+    finally: market_data.set_source(None)
@@ -0,0 +1,377 @@
+"""Push-fed prices: trade/quote ticks aggregated into fixed-size per-symbol ring buffers of bars.
+
+A feed calls TickAggregator.on_ticks([(symbol, epoch s, price, size), ...]). Every configured
+interval's forming bar is updated in place, and a new bucket commits it to the symbol's ring, where
+it overwrites the oldest slot once the ring is full. Bins follow resample.py: 09:15 IST-anchored for
+NSE and 00:00 UTC for crypto, with daily bars at local midnight. Each (symbol, interval) ring is
+seeded once from the normal bar pipeline. From then on, panel() and quotes() read memory only:
+LTPs move with the last tick, and no history is downloaded per refresh.
+
+Feeds: SocketFeed reads newline-delimited JSON ticks from a quote server, and ReplayFeed replays a
+recorded tick file. `python tick_stream.py serve ticks.csv` runs a local replay server that stands in
+for a broker's websocket. `python tick_stream.py record ticks.csv` writes a tick file from bars.
+
+    HARIDAS_TICK_FEED=tcp://127.0.0.1:9009 streamlit run My_Intraday_Setup.py
+    HARIDAS_TICK_FEED=ticks.csv HARIDAS_TICK_SPEED=60 streamlit run My_Intraday_Setup.py
+"""
+import csv
+import json
+import math
+import os
+import socket
+import socketserver
+import threading
+import time
+
+import numpy as np
+
+import metrics
+from bar_panel import BarPanel
+from bar_store import FIELDS, period_days, to_epoch
+from markets import INTERVAL_MINUTES, NSE_OPEN_MINUTES, NSE_TZ, estimate_bars, is_crypto
+from resample import asset_class
+
+# bars kept per symbol: the live scans' windows (5d of 5m NSE, 2d of 15m, 15d of 1h crypto, 10d daily) fit
+CAPACITY = {"1m": 400, "5m": 400, "15m": 200, "1h": 400, "1d": 30}
+IST_OFFSET = 19800  # Asia/Kolkata has no DST
+
+
+def _clock(symbol):
+    """(tz, UTC offset s, session open s past local midnight) for a symbol's bins."""
+    asset = asset_class(symbol)
+    if asset == "nse": return NSE_TZ, IST_OFFSET, NSE_OPEN_MINUTES * 60
+    return "UTC", 0, 0
+
+
+class BarRing:
+    """One symbol's bars at one interval: committed bars in a ring plus the forming bar as Python floats."""
+
+    __slots__ = ("seconds", "offset", "open", "tz", "ts", "values", "pos", "count", "forming", "seeded")
+
+    def __init__(self, interval, capacity, tz, offset, session_open):
+        self.seconds, self.offset, self.open, self.tz = INTERVAL_MINUTES[interval] * 60, offset, session_open, tz
+        self.ts, self.values = np.zeros(capacity, dtype=np.int64), np.zeros((len(FIELDS), capacity), dtype=np.float32)
+        self.pos = self.count = 0
+        self.forming = None  # [start ts, open, high, low, close, volume]
+        self.seeded = 0  # days of history the ring was seeded with
+
+    def bucket(self, ts):
+        local = int(ts) + self.offset
+        day = local - local % 86400
+        if self.seconds >= 86400: return day - self.offset
+        return day + self.open + (local - day - self.open) // self.seconds * self.seconds - self.offset
+
+    def _commit(self, bar):
+        self.ts[self.pos], self.values[:, self.pos] = bar[0], bar[1:]
+        self.pos = (self.pos + 1) % len(self.ts)
+        self.count = min(self.count + 1, len(self.ts))
+
+    def add(self, ts, price, size):
+        start, bar = self.bucket(ts), self.forming
+        if bar is None or start > bar[0]:
+            if bar is not None: self._commit(bar)
+            self.forming = [start, price, price, price, price, size]
+        elif start == bar[0]:
+            if price > bar[2]: bar[2] = price
+            if price < bar[3]: bar[3] = price
+            bar[4] = price
+            bar[5] += size
+        # else: a late tick for a bar that has already closed
+
+    def seed(self, ts, values, days):
+        """Replace the history with the newest bars of (ts, [open, high, low, close, volume]); the last one keeps forming."""
+        self.pos = self.count = 0
+        self.forming = None
+        if len(ts):
+            keep = slice(max(0, len(ts) - len(self.ts) - 1), len(ts) - 1)
+            n = keep.stop - keep.start
+            self.ts[:n], self.values[:, :n] = ts[keep], np.asarray(values)[:, keep]
+            self.pos, self.count = n % len(self.ts), n
+            self.forming = [int(ts[-1]), *(float(v[-1]) for v in values)]
+        self.seeded = days
+
+    def arrays(self):
+        """(ts, values) oldest first, forming bar included."""
+        order = np.r_[self.pos:self.count, 0:self.pos] if self.count == len(self.ts) else slice(0, self.count)
+        ts, values = self.ts[order], self.values[:, order]
+        if self.forming is not None:
+            ts = np.append(ts, self.forming[0])
+            values = np.concatenate([values, np.array(self.forming[1:], dtype=np.float32)[:, None]], axis=1)
+        return ts, values
+
+
+def _keep_period(ts, period, offset):
+    # bar_store.trim_to_period on epoch seconds: "Nd" keeps the last N local days present, others a date window
+    if not len(ts): return 0
+    if str(period).endswith("d"):
+        days = np.unique((ts + offset) // 86400)[-period_days(period):]
+        return int(np.searchsorted((ts + offset) // 86400, days[0]))
+    return int(np.searchsorted(ts, ts[-1] - period_days(period) * 86400))
+
+
+class TickAggregator:
+    def __init__(self, capacity=None):
+        self.capacity = dict(capacity or CAPACITY)
+        self.rings = {}  # symbol -> {interval: BarRing}
+        self.version = 0  # bumped by every tick batch: cache key for anything derived from the buffers
+        self.ticks, self.last_tick = 0, None
+        self.seen = {}  # symbol -> wall time of its last tick
+        self._lock = threading.Lock()
+
+    def _rings(self, symbol):
+        rings = self.rings.get(symbol)
+        if rings is None:
+            clock = _clock(symbol)
+            rings = self.rings[symbol] = {iv: BarRing(iv, cap, *clock) for iv, cap in self.capacity.items()}
+        return rings
+
+    def on_ticks(self, ticks):
+        """ticks: [(symbol, epoch s, price, size)]."""
+        n, now = 0, time.time()
+        with self._lock:
+            for symbol, ts, price, size in ticks:
+                for ring in self._rings(symbol).values(): ring.add(ts, float(price), float(size or 0.0))
+                self.seen[symbol] = now
+                n += 1
+            if n:
+                self.version += 1
+                self.ticks += n
+                self.last_tick = now
+        if n: metrics.REGISTRY.inc("haridas_ticks_total", n, help_text="Ticks aggregated from the push feed")
+        return n
+
+    def covers(self, interval, period, symbols=()):
+        """The ring for interval is deep enough for period on every symbol."""
+        cap = self.capacity.get(interval)
+        return cap is not None and all(estimate_bars(period, interval, is_crypto(s)) <= cap for s in (symbols or ("",)))
+
+    def missing(self, symbols, interval, period):
+        days = period_days(period)
+        with self._lock:
+            return [s for s in symbols if s not in self.rings or self.rings[s][interval].seeded < days]
+
+    def seed(self, bars, interval, period, symbols=()):
+        """bars: {symbol: DataFrame or SymbolView}; symbols listed without bars are marked seeded (and empty)."""
+        days = period_days(period)
+        with self._lock:
+            for sym in dict.fromkeys([*symbols, *bars]):
+                b = bars.get(sym)
+                if b is None or len(b) == 0: ts, values = np.empty(0, dtype=np.int64), np.empty((len(FIELDS), 0))
+                elif hasattr(b, "ts"): ts, values = b.ts, [b[f] for f in FIELDS]
+                else: ts, values = to_epoch(b.index)[0], [b[f].to_numpy(dtype=np.float32) for f in FIELDS]
+                self._rings(sym)[interval].seed(ts, values, days)
+
+    def panel(self, symbols, interval, period):
+        """BarPanel of the buffered bars, trimmed to period, forming bar last."""
+        items = []
+        with self._lock:
+            for sym in dict.fromkeys(symbols):
+                ring = self.rings.get(sym, {}).get(interval)
+                if ring is None: continue
+                ts, values = ring.arrays()
+                start = _keep_period(ts, period, ring.offset)
+                if start < len(ts): items.append((sym, ring.tz, ts[start:], values[:, start:]))
+        offsets = np.zeros(len(items) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(ts) for _, _, ts, _ in items])
+        ts = np.concatenate([ts for _, _, ts, _ in items]) if items else np.empty(0, dtype=np.int64)
+        values = np.concatenate([v for _, _, _, v in items], axis=1) if items else np.empty((len(FIELDS), 0), dtype=np.float32)
+        return BarPanel([sym for sym, *_ in items], offsets, ts, [tz for _, tz, _, _ in items], {f: values[i].copy() for i, f in enumerate(FIELDS)})
+
+    def quiet(self, symbols, ttl):
+        """Symbols without a tick in the last ttl seconds (never ticked included): the feed doesn't carry them or has stalled."""
+        cutoff = time.time() - ttl
+        with self._lock: return [s for s in dict.fromkeys(symbols) if self.seen.get(s, -math.inf) < cutoff]
+
+    def quotes(self, symbols, ttl=None):
+        """{symbol: (ltp, change, pct, stale)} like market_data.fetch_quotes; previous close = the last closed daily bar.
+
+        With a ttl, a symbol that has not ticked within it is flagged stale: its price is from the seed or an old tick.
+        """
+        out, quiet = {}, set(self.quiet(symbols, ttl)) if ttl is not None else set()
+        with self._lock:
+            for sym in dict.fromkeys(symbols):
+                ring = self.rings.get(sym, {}).get("1d")
+                _, values = ring.arrays() if ring is not None else (None, np.empty((len(FIELDS), 0)))
+                closes = values[FIELDS.index("Close")]
+                if not len(closes): out[sym] = (0.0, 0.0, 0.0, False); continue
+                ltp, prev = float(closes[-1]), float(closes[-2]) if len(closes) > 1 else float(closes[-1])
+                out[sym] = (ltp, ltp - prev, (ltp - prev) / prev * 100, sym in quiet) if prev else (0.0, 0.0, 0.0, sym in quiet)
+        return out
+
+    def status(self):
+        return {"symbols": len(self.rings), "ticking": len(self.seen), "ticks": self.ticks, "version": self.version,
+                "last_tick_age_s": round(time.time() - self.last_tick, 1) if self.last_tick else None}
+
+
+# --- feeds ---
+def parse_tick(line):
+    """JSON {"s": symbol, "t": epoch s, "p": price, "v": size} or CSV "ts,symbol,price,size" -> tick tuple."""
+    line = line.strip()
+    if not line or line.startswith("ts,"): return None
+    if line.startswith("{"):
+        d = json.loads(line)
+        return d["s"], float(d["t"]), float(d["p"]), float(d.get("v", 0.0))
+    ts, sym, price, size = line.split(",")[:4]
+    return sym, float(ts), float(price), float(size or 0.0)
+
+
+def read_ticks(path):
+    with open(path, newline="") as fh:
+        return [t for t in map(parse_tick, fh) if t is not None]
+
+
+class ReplayFeed:
+    """Replays a tick file. Timestamps are shifted so the first tick lands at start time; speed 0 replays as fast as possible."""
+
+    def __init__(self, path, speed=1.0, shift=True, batch=500):
+        self.ticks, self.speed, self.shift, self.batch = read_ticks(path), speed, shift, batch
+
+    def run(self, aggregator, stop):
+        if not self.ticks: return
+        t0, wall0 = self.ticks[0][1], time.time()
+        delta = wall0 - t0 if self.shift else 0.0
+        for i in range(0, len(self.ticks), self.batch):
+            chunk = [(s, ts + delta, p, v) for s, ts, p, v in self.ticks[i:i + self.batch]]
+            if self.speed:
+                wait = (chunk[0][1] - delta - t0) / self.speed - (time.time() - wall0)
+                if wait > 0 and stop.wait(wait): return
+            if stop.is_set(): return
+            aggregator.on_ticks(chunk)
+
+
+class SocketFeed:
+    """Newline-delimited ticks from a TCP quote server, reconnecting with backoff."""
+
+    def __init__(self, host, port, timeout=5.0):
+        self.host, self.port, self.timeout = host, int(port), timeout
+        self.connected = False
+
+    def run(self, aggregator, stop):
+        backoff = 1.0
+        while not stop.is_set():
+            try:
+                with socket.create_connection((self.host, self.port), timeout=self.timeout) as sock:
+                    self.connected, backoff, buffer = True, 1.0, b""
+                    sock.settimeout(1.0)
+                    while not stop.is_set():
+                        try: data = sock.recv(1 << 16)
+                        except socket.timeout: continue
+                        if not data: break
+                        *lines, buffer = (buffer + data).split(b"\n")
+                        aggregator.on_ticks([t for t in (parse_tick(l.decode()) for l in lines) if t is not None])
+            except OSError: pass
+            self.connected = False
+            if stop.wait(backoff): return
+            backoff = min(backoff * 2, 30.0)
+
+
+def make_feed(spec, speed=1.0):
+    """'tcp://host:port' or a tick file path."""
+    if spec.startswith("tcp://"):
+        host, port = spec[len("tcp://"):].rsplit(":", 1)
+        return SocketFeed(host, port)
+    return ReplayFeed(spec, speed=speed)
+
+
+class TickStream:
+    """A feed running on a daemon thread into one aggregator."""
+
+    def __init__(self, feed, aggregator=None):
+        self.feed, self.aggregator = feed, aggregator or TickAggregator()
+        self._stop, self._thread = threading.Event(), None
+
+    @classmethod
+    def from_env(cls):
+        spec = os.environ.get("HARIDAS_TICK_FEED")
+        return cls(make_feed(spec, float(os.environ.get("HARIDAS_TICK_SPEED", "1")))).start() if spec else None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.feed.run, args=(self.aggregator, self._stop), name="tick-feed", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None: self._thread.join(timeout=5)
+
+    def status(self):
+        return {"feed": type(self.feed).__name__, "running": bool(self._thread and self._thread.is_alive()),
+                **({"connected": self.feed.connected} if hasattr(self.feed, "connected") else {}), **self.aggregator.status()}
+
+
+# --- replay tooling ---
+def ticks_from_bars(frames):
+    """Four ticks per bar (open, then low/high in the bar's direction, close), merged across symbols by time."""
+    ticks = []
+    for sym, df in frames.items():
+        ts, _ = to_epoch(df.index)
+        s = max(int(np.diff(ts).min()) // 4, 1) if len(ts) > 1 else 15  # a quarter of the bar interval
+        for t, o, h, l, c, v in zip(ts.tolist(), *(df[f].tolist() for f in FIELDS)):
+            mid = (l, h) if c >= o else (h, l)
+            ticks += [(sym, t, o, v / 4), (sym, t + s, mid[0], v / 4), (sym, t + 2 * s, mid[1], v / 4), (sym, t + 3 * s, c, v / 4)]
+    return sorted(ticks, key=lambda t: t[1])
+
+
+def write_ticks(path, ticks):
+    with open(path, "w", newline="") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(["ts", "symbol", "price", "size"])
+        writer.writerows((f"{ts:.3f}", sym, f"{p:.6g}", f"{v:.6g}") for sym, ts, p, v in ticks)
+
+
+def serve(path, host="127.0.0.1", port=9009, speed=1.0):
+    """Local replay server: every client gets the tick file as JSON lines, paced by speed (0 = as fast as possible)."""
+    ticks = read_ticks(path)
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            t0, wall0 = ticks[0][1], time.time()
+            delta = wall0 - t0
+            for sym, ts, price, size in ticks:
+                if speed:
+                    wait = (ts - t0) / speed - (time.time() - wall0)
+                    if wait > 0: time.sleep(wait)
+                try: self.wfile.write((json.dumps({"s": sym, "t": round(ts + delta, 3), "p": price, "v": size}) + "\n").encode())
+                except OSError: return
+
+    server = socketserver.ThreadingTCPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Tick replay tooling for the push feed.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    s = sub.add_parser("serve", help="replay a tick file to every client over TCP")
+    s.add_argument("path")
+    s.add_argument("--host", default="127.0.0.1")
+    s.add_argument("--port", type=int, default=9009)
+    s.add_argument("--speed", type=float, default=1.0, help="replay speed multiple; 0 = as fast as possible")
+    r = sub.add_parser("record", help="write a tick file from bars (four ticks per bar)")
+    r.add_argument("path")
+    r.add_argument("--market", choices=["nse", "crypto"], default="crypto")
+    r.add_argument("--period", default="1d")
+    r.add_argument("--interval", default="1m")
+    r.add_argument("--source", default="synthetic", help="'synthetic', 'yahoo' or a fixture pickle")
+    args = parser.parse_args(argv)
+    if args.cmd == "serve":
+        server = serve(args.path, args.host, args.port, args.speed)
+        print(f"replaying {args.path} on tcp://{args.host}:{args.port}")
+        try: server.serve_forever()
+        except KeyboardInterrupt: server.shutdown()
+        return 0
+    import engine
+    import market_data
+    import universe
+    source = engine.make_source(args.source)
+    if source is not None: market_data.set_source(source)
+    frames = market_data.fetch_bars(universe.load_universe(args.market).symbols, period=args.period, interval=args.interval)
+    ticks = ticks_from_bars(frames)
+    write_ticks(args.path, ticks)
+    print(f"{len(ticks)} ticks for {len(frames)} symbols -> {args.path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,62 @@
+"""Symbol universes (watchlists with sector tags) loaded from local CSV or JSON files.
+
+A CSV has a `symbol` column and optional `watchlist` and `kind` columns, one row per membership; a
+JSON file maps each watchlist to its symbols. Lists of kind "index" (NIFTY 50, NIFTY NEXT 50) only
+widen the universe: they are not watchlists, so they never show up as sectors. Symbols are canonicalised through ALIASES and deduplicated,
+and a file is parsed and indexed once per change on disk, not on every Streamlit rerun.
+"""
+import csv
+import functools
+import json
+import os
+
+UNIVERSE_DIR = os.environ.get("HARIDAS_UNIVERSE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "universes"))
+# retired or mistyped tickers -> the listing Yahoo quotes today
+ALIASES = {"HUL.NS": "HINDUNILVR.NS", "BOB.NS": "BANKBARODA.NS", "MACROTECH.NS": "LODHA.NS", "MCDOWELL-N.NS": "UNITDSPR.NS",
+           "ZOMATO.NS": "ETERNAL.NS"}
+
+
+def canonical(symbol):
+    symbol = symbol.strip().upper()
+    return ALIASES.get(symbol, symbol)
+
+
+class Universe:
+    """watchlists / indices: {name: [symbols]}, symbols: every symbol once in file order, tags: {symbol: [list names]}."""
+
+    def __init__(self, watchlists, indices=None):
+        self.watchlists, self.indices, self.tags = {}, {}, {}
+        for target, lists in ((self.watchlists, watchlists), (self.indices, indices or {})):
+            for name, symbols in lists.items():
+                members = list(dict.fromkeys(canonical(s) for s in symbols if s and s.strip()))
+                target[name] = members
+                for sym in members: self.tags.setdefault(sym, []).append(name)
+        self.symbols = list(self.tags)
+
+    def __contains__(self, symbol):
+        return canonical(symbol) in self.tags
+
+
+def read_universe(path):
+    if path.endswith(".json"):
+        with open(path, encoding="utf-8") as fh: return Universe(json.load(fh))
+    watchlists, indices = {}, {}
+    with open(path, newline="", encoding="utf-8") as fh:
+        for row in csv.DictReader(fh):
+            target = indices if (row.get("kind") or "").strip().lower() == "index" else watchlists
+            target.setdefault((row.get("watchlist") or "ALL").strip(), []).append(row["symbol"])
+    return Universe(watchlists, indices)
+
+
+@functools.lru_cache(maxsize=8)
+def _load(path, mtime):
+    return read_universe(path)
+
+
+def load_universe(market, directory=None):
+    """Universe for "nse" / "crypto" from <directory>/<market>.csv (or .json); reparsed only when the file changes."""
+    directory = directory or UNIVERSE_DIR
+    for ext in (".csv", ".json"):
+        path = os.path.join(directory, market + ext)
+        if os.path.exists(path): return _load(path, os.stat(path).st_mtime_ns)
+    raise FileNotFoundError(f"no {market}.csv or {market}.json in {directory}")
@@ -0,0 +1,182 @@
+"""Event-driven intraday replay of the live strategies, fed bar by bar through their own signal functions.
+
+Each closed bar is folded into a streaming.IndicatorState as the live engine does, and the scanner's
+signal function is asked about it while the next bar forms. A signal places a stop order at Entry,
+live for `order_ttl` bars (the scanner shows it for one). Fills walk forward: SL, T1 moves the stop
+to break-even, T2 books 50% ("Book 50% @ 1:3"), the rest rides until the NSE 15:30 square-off,
+`max_hold` bars or the end of data. A bar touching both stop and target counts as stopped out.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+from backtest import DEFAULT_WORKERS, SUMMARY_COLUMNS, symbol_summary
+from bar_panel import as_panel, as_price
+from strategies import exhaustion_signal, fmt_ts, ha_bb_signal
+from streaming import IndicatorState, session_keys
+
+TRADE_COLUMNS = ["Symbol", "Signal", "Setup Time", "Entry Time", "Entry", "SL", "T1", "T2", "Exit Time", "Exit", "Outcome", "R", "P&L %"]
+
+# strategy -> (bar interval, square off at session end, replay defaults)
+# ema_span > 0 adds a trend filter to the exhaustion setup (the live scanner only displays its EMA)
+STRATEGIES = {
+    "exhaustion": ("5m", True, {"sentiment": "BULLISH", "entry_buffer": 0.50, "t1_r": 2.0, "t2_r": 3.0, "ema_span": 0,
+                                "min_bars": 15, "min_session_bars": 5}),
+    "ha_bb": ("1h", False, {"bb_window": 20, "num_std": 2.0, "buffer_pct": 0.001, "target_r": 3.0, "min_bars": 25}),
+}
+
+
+def _exhaustion_setup(sym, state, i, bars, params):
+    # live: len(df) >= min_bars with df ending in the forming bar i+1, today's session = forming bar's
+    candle = state.last
+    if i + 2 < params["min_bars"] or candle["session"] != bars["session"][i + 1] or candle["session_bars"] + 1 < params["min_session_bars"]:
+        return None
+    sig = exhaustion_signal(sym, candle, params["sentiment"], params["entry_buffer"], tz=bars["tz"] or None, t1_r=params["t1_r"], t2_r=params["t2_r"])
+    if not sig or (params["ema_span"] and (candle["close"] - candle["ema"]) * (1 if sig["Signal"] == "BUY" else -1) <= 0): return None
+    return sig["Signal"], sig["Entry"], sig["SL"], sig["T1"], sig["T2(1:3)"]
+
+
+def _ha_bb_setup(sym, state, i, bars, params):
+    if state.prev is None or i + 2 < params["min_bars"]: return None
+    # the forming bar's price is unknown at its open: quote the open as LTP
+    sig = ha_bb_signal(sym, state.prev, state.last, bars["open"][i + 1], params["buffer_pct"], tz=bars["tz"] or None, target_r=params["target_r"])
+    return sig and (sig["Signal"], sig["Entry"], sig["SL"], sig["Target(BB)"], sig["Target(1:3)"])
+
+
+SETUPS = {"exhaustion": _exhaustion_setup, "ha_bb": _ha_bb_setup}
+
+
+def session_ends(sessions):
+    """Index of the last bar of each bar's session (NSE square-off bar)."""
+    codes = pd.factorize(pd.Index(sessions))[0]
+    ends = np.flatnonzero(np.append(codes[1:] != codes[:-1], True))
+    return ends[np.searchsorted(ends, np.arange(len(codes)))]
+
+
+def frame_arrays(bars):
+    """Picklable float64 arrays of one panel symbol for the replay workers."""
+    cols = {f: bars[f].astype(float) for f in ("open", "high", "low", "close", "volume")}
+    sessions = session_keys(bars.timestamps())
+    return {"ts": bars.ts, "tz": bars.tz, "session": sessions, "session_end": session_ends(sessions), **cols}
+
+
+def _first(mask, offset):
+    if not len(mask): return None
+    k = int(mask.argmax())
+    return offset + k if mask[k] else None
+
+
+def _trade(bars, plan, side, fill, f, limit, limit_reason, partial):
+    """Manage one filled position from bar f -> (exit bar, [(qty, price, reason)]).
+
+    The stop sits at SL until the first bar that reaches T1 or T2, then at the fill (break-even);
+    targets only count if they lie beyond the fill, and only from the bar after the fill.
+    """
+    o, h, l, c = bars["open"], bars["high"], bars["low"], bars["close"]
+    _, _, sl, t1, t2 = plan
+    t1 = t1 if (t1 - fill) * side > 0 else None
+    t2 = t2 if (t2 - fill) * side > 0 else None
+    lo, hi = l[f:limit + 1], h[f:limit + 1]
+    reach = hi if side == 1 else -lo
+    stop_hit = (lo <= sl) if side == 1 else (hi >= sl)
+    hit_sl = _first(stop_hit, f)
+    targets = [t for t in (t1, t2) if t is not None]
+    hit_tgt = _first(reach[1:] >= min(t * side for t in targets), f + 1) if targets else None
+    stop_price = lambda b, stop: min(stop, o[b]) if side == 1 else max(stop, o[b])
+    if hit_sl is not None and (hit_tgt is None or hit_sl <= hit_tgt): return hit_sl, [(1.0, stop_price(hit_sl, sl), "SL")]
+    if hit_tgt is None: return limit, [(1.0, c[limit], limit_reason)]
+    legs, qty = [], 1.0
+    hit_t2 = _first(reach[hit_tgt - f:] >= t2 * side, hit_tgt) if t2 is not None else None
+    rest = slice(hit_tgt + 1 - f, None)
+    hit_be = _first(((lo <= fill) if side == 1 else (hi >= fill))[rest], hit_tgt + 1)
+    if hit_t2 is not None and (hit_t2 == hit_tgt or hit_be is None or hit_t2 < hit_be):
+        legs.append((min(partial, qty), t2, "T2"))
+        qty -= min(partial, qty)
+        if qty <= 1e-12: return hit_t2, legs
+    if hit_be is not None: return hit_be, legs + [(qty, stop_price(hit_be, fill), "BE")]
+    return limit, legs + [(qty, c[limit], limit_reason)]
+
+
+def execute(bars, plans, square_off, partial=0.5, order_ttl=1, max_hold=None):
+    """Fill and manage setups one position at a time.
+
+    plans: [(bar, signal, entry, sl, t1, t2)] in bar order, a setup seen at the close of `bar`.
+    A newer setup replaces a pending order; setups seen while a position is open are ignored.
+    Returns [(plan, fill bar, fill price, exit bar, legs)].
+    """
+    o, h, l = bars["open"], bars["high"], bars["low"]
+    n = len(o)
+    ends = bars["session_end"]
+    trades, flat_from = [], 0
+    for j, plan in enumerate(plans):
+        p, signal, entry = plan[0], plan[1], plan[2]
+        if p < flat_from or p + 1 >= n: continue
+        side = 1 if signal == "BUY" else -1
+        # the order is checked from the next bar until it expires, is replaced or the session closes
+        last = min(p + order_ttl, plans[j + 1][0] if j + 1 < len(plans) else n - 1, n - 1)
+        if square_off: last = min(last, ends[p + 1])
+        window = h[p + 1:last + 1] >= entry if side == 1 else l[p + 1:last + 1] <= entry
+        f = _first(window, p + 1)
+        if f is None: continue
+        fill = max(entry, o[f]) if side == 1 else min(entry, o[f])
+        limit, reason = (ends[f], "EOD") if square_off else (n - 1, "END")
+        if max_hold and f + max_hold <= limit: limit, reason = f + max_hold, "TIME"
+        exit_bar, legs = _trade(bars, plan[1:], side, fill, f, limit, reason, partial)
+        trades.append((plan, f, fill, exit_bar, legs))
+        flat_from = exit_bar
+    return trades
+
+
+def trade_result(side, fill, sl, legs):
+    """-> (average exit, P&L %, R multiple) of a closed position."""
+    qty = sum(q for q, _, _ in legs)
+    pnl = sum(q * (p - fill) * side for q, p, _ in legs)
+    risk = abs(fill - sl)
+    return sum(q * p for q, p, _ in legs) / qty, round(pnl / fill * 100, 2), round(pnl / risk, 2) if risk else 0.0
+
+
+def _trade_row(sym, bars, trade):
+    (p, signal, _, sl, t1, t2), f, fill, exit_bar, legs = trade
+    avg_exit, pnl, r = trade_result(1 if signal == "BUY" else -1, fill, sl, legs)
+    tz = bars["tz"] or None
+    return {
+        "Symbol": sym, "Signal": signal, "Setup Time": fmt_ts(bars["ts"][p], tz, '%Y-%m-%d %H:%M'),
+        "Entry Time": fmt_ts(bars["ts"][f], tz, '%Y-%m-%d %H:%M'), "Entry": as_price(fill), "SL": as_price(sl),
+        "T1": as_price(t1), "T2": as_price(t2), "Exit Time": fmt_ts(bars["ts"][exit_bar], tz, '%Y-%m-%d %H:%M'),
+        "Exit": as_price(avg_exit), "Outcome": "+".join(reason for _, _, reason in legs), "R": r, "P&L %": pnl,
+    }
+
+
+def replay_symbol(sym, bars, strategy, partial=0.5, order_ttl=1, max_hold=None, **params):
+    """Replay one symbol's bars -> list of trade rows."""
+    _, square_off, defaults = STRATEGIES[strategy]
+    params = {**defaults, **params}
+    setup = SETUPS[strategy]
+    o, h, l, c, v, ts, sessions = bars["open"], bars["high"], bars["low"], bars["close"], bars["volume"], bars["ts"], bars["session"]
+    state = IndicatorState(ema_span=params.get("ema_span") or 10, bb_window=params.get("bb_window", 20), num_std=params.get("num_std", 2.0))
+    plans = []
+    for i in range(len(ts) - 1):
+        state.update(ts[i], o[i], h[i], l[i], c[i], v[i], sessions[i])
+        plan = setup(sym, state, i, bars, params)
+        if plan: plans.append((i, *plan))
+    return [_trade_row(sym, bars, t) for t in execute(bars, plans, square_off, partial, order_ttl, max_hold)]
+
+
+def _run_chunk(items, strategy, options):
+    return [t for sym, bars in items for t in replay_symbol(sym, bars, strategy, **options)]
+
+
+def run_walkforward(frames, strategy, executor=None, workers=DEFAULT_WORKERS, **options):
+    """Replay every symbol -> (per-symbol summary, all trades); symbols fan out over the executor."""
+    items = [(sym, frame_arrays(bars)) for sym, bars in as_panel(frames).items() if len(bars) > 2]
+    # every symbol is thousands of bars of Python, so even a short watchlist is worth fanning out
+    if executor is not None and workers > 1 and len(items) > 1:
+        size = max(1, math.ceil(len(items) / workers))
+        chunks = [items[i:i + size] for i in range(0, len(items), size)]
+        rows = [t for result in executor.map(_run_chunk, chunks, [strategy] * len(chunks), [options] * len(chunks)) for t in result]
+    else: rows = _run_chunk(items, strategy, options)
+    trades = pd.DataFrame(rows, columns=TRADE_COLUMNS)
+    if trades.empty: return pd.DataFrame(columns=SUMMARY_COLUMNS), trades
+    summary = pd.DataFrame([symbol_summary(sym, g["P&L %"].to_numpy()) for sym, g in trades.groupby("Symbol", sort=False)], columns=SUMMARY_COLUMNS)
+    return summary.sort_values("Total P&L %", ascending=False, ignore_index=True), trades